@@ -0,0 +1,136 @@
+"""Read-through cache for serialized blog post details.
+
+Entries are keyed by slug and a per-slug version token kept in the shared
+Django cache. Invalidating a post replaces its token, so every worker misses on
+its next read without having to delete anything. A small in-process LRU sits in
+front of the shared cache: a hit there costs one lookup of the version token
+instead of fetching and unpickling the whole payload.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+KEY_PREFIX = 'blog:post'
+
+
+class LRUCache:
+    """Thread-safe, size-bounded mapping evicting the least recently used entry."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard_slug(self, slug):
+        with self._lock:
+            for key in [key for key in self._data if key[0] == slug]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class PostDetailCache:
+
+    def __init__(self):
+        self.local = LRUCache(settings.BLOG_POST_CACHE_LRU_SIZE)
+        self._lock = threading.Lock()
+        self._counts = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    @staticmethod
+    def _version_key(slug):
+        return f'{KEY_PREFIX}:version:{slug}'
+
+    @staticmethod
+    def _data_key(slug, version):
+        return f'{KEY_PREFIX}:data:{slug}:{version}'
+
+    def _version(self, slug):
+        key = self._version_key(slug)
+        version = cache.get(key)
+        if version is None:
+            # add() keeps the token another worker may have just created
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            version = cache.get(key)
+        return version
+
+    def get_or_build(self, slug, build):
+        """Return the cached representation of `slug`, calling `build()` on a miss."""
+        version = self._version(slug)
+        local_key = (slug, version)
+        data = self.local.get(local_key)
+        if data is not None:
+            self._count('local_hits')
+            return data
+        data_key = self._data_key(slug, version)
+        data = cache.get(data_key)
+        if data is not None:
+            self._count('shared_hits')
+        else:
+            self._count('misses')
+            data = build()
+            cache.set(data_key, data, timeout=settings.BLOG_POST_CACHE_TIMEOUT)
+        self.local.set(local_key, data)
+        return data
+
+    def invalidate(self, *slugs):
+        """Drop the cached representation of `slugs` once the transaction commits."""
+        slugs = {slug for slug in slugs if slug}
+        if not slugs:
+            return
+
+        def bump():
+            for slug in slugs:
+                cache.set(self._version_key(slug), uuid.uuid4().hex, timeout=None)
+                self.local.discard_slug(slug)
+
+        transaction.on_commit(bump)
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = sum(counts.values())
+        hits = counts['local_hits'] + counts['shared_hits']
+        return {
+            **counts,
+            'lookups': lookups,
+            'hit_ratio': round(hits / lookups, 4) if lookups else None,
+            'local_entries': len(self.local),
+        }
+
+    def reset(self):
+        """Forget the in-process entries and counters (the shared cache is left alone)."""
+        self.local.clear()
+        with self._lock:
+            self._counts = dict.fromkeys(self._counts, 0)
+
+
+post_detail_cache = PostDetailCache()
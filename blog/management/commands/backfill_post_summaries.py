@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post, SUMMARY_FIELDS
+
+
+class Command(BaseCommand):
+    help = "Compute excerpt, word count and reading time for existing blog posts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help="Posts updated per query.")
+        parser.add_argument('--all', action='store_true',
+                            help="Recompute every post, not only those without a summary yet.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = Post.objects.only('pk', 'content', *SUMMARY_FIELDS).order_by('pk')
+        if not options['all']:
+            posts = posts.filter(word_count=0)
+
+        batch, updated = [], 0
+        for post in posts.iterator(chunk_size=batch_size):
+            post.refresh_summary()
+            batch.append(post)
+            if len(batch) >= batch_size:
+                Post.objects.bulk_update(batch, SUMMARY_FIELDS)
+                updated += len(batch)
+                batch = []
+        if batch:
+            Post.objects.bulk_update(batch, SUMMARY_FIELDS)
+            updated += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"{updated} posts updated."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog import related
+
+
+class Command(BaseCommand):
+    help = "Recompute the related posts of every blog post."
+
+    def handle(self, *args, **options):
+        count = related.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Related posts computed for {count} posts."))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog import related
+
+
+class Command(BaseCommand):
+    help = ("Refresh the related blog posts of the posts queued by saves and deletions. "
+            "Keeps the corpus in memory: the first change after start recomputes every post, "
+            "later ones only the affected posts.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Queued changes applied per iteration.")
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            refreshed = related.process_pending(options['batch_size'])
+            if refreshed:
+                self.stdout.write(f"Related posts refreshed for {refreshed} posts")
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
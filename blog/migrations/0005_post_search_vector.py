@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:15
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+from core.search import create_search_index, drop_search_index
+
+SEARCH_COLUMNS = (('title', 'A'), ('content', 'B'))
+
+
+def create_index(apps, schema_editor):
+    create_search_index(schema_editor, 'blog_post', SEARCH_COLUMNS)
+
+
+def drop_index(apps, schema_editor):
+    drop_search_index(schema_editor, 'blog_post', SEARCH_COLUMNS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_keyset_ordering_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_image_status'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='image',
+            options={'ordering': ['order']},
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='order',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
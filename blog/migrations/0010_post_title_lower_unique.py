@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:32
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='title',
+            field=models.CharField(max_length=200),
+        ),
+        migrations.AddConstraint(
+            model_name='post',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('title'), name='post_title_lower_uniq'),
+        ),
+    ]
@@ -1,30 +1,75 @@
+import math
+
+from django.conf import settings
 from django.db import models
-from django.utils.text import slugify
+from django.db.models.functions import Lower
+from django.utils.html import strip_tags
+from django.utils.text import slugify, Truncator
+from django.contrib.postgres.search import SearchVectorField
 from cloudinary.models import CloudinaryField
+from core.models import MEDIA_STATUS_CHOICES, MEDIA_READY
+
+EXCERPT_LENGTH = 280
+WORDS_PER_MINUTE = 200
+SUMMARY_FIELDS = ('excerpt', 'word_count', 'reading_time')
 
 
 class Post(models.Model):
-    title = models.CharField(max_length=200, unique=True)
+    title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # derived from content in save(), so listings never have to load it
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH + 1, blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=0, editable=False)  # minutes
+    # weighted title/content tsvector maintained on save (see blog.search)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
-        ordering = ["-created_at"]
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            # matches the default ordering; backs keyset pagination
+            models.Index(fields=["-created_at", "-id"], name="post_created_id_idx"),
+        ]
+        constraints = [
+            # titles are unique regardless of case; the serializer relies on it instead of a pre-check
+            models.UniqueConstraint(Lower("title"), name="post_title_lower_uniq"),
+        ]
 
     def __str__(self):
         return self.title
 
+    def refresh_summary(self):
+        """Recompute excerpt, word count and reading time from content."""
+        text = ' '.join(strip_tags(self.content or '').split())
+        self.word_count = len(text.split())
+        self.reading_time = math.ceil(self.word_count / WORDS_PER_MINUTE) if self.word_count else 0
+        self.excerpt = Truncator(text).chars(EXCERPT_LENGTH)
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        # a row loaded with .defer('content') keeps its stored summary
+        if 'content' not in self.get_deferred_fields():
+            self.refresh_summary()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'content' in update_fields:
+                kwargs['update_fields'] = {*update_fields, *SUMMARY_FIELDS}
         super().save(*args, **kwargs)
 
 
 class Image(models.Model):
     post = models.ForeignKey(Post, related_name='images', on_delete=models.CASCADE)
-    image = CloudinaryField('image')  # Remplacement par CloudinaryField
+    image = CloudinaryField('image', folder=settings.MEDIA_UPLOAD_FOLDER)  # Remplacement par CloudinaryField
     caption = models.CharField(max_length=200, blank=True)
+    order = models.PositiveSmallIntegerField(default=0)
+    # pending rows have no image yet; they are hidden until the ingestion worker is done
+    status = models.CharField(max_length=20, choices=MEDIA_STATUS_CHOICES, default=MEDIA_READY)
+
+    class Meta:
+        ordering = ['order']
 
     def __str__(self):
         return f"Image for {self.post.title}"
@@ -41,3 +86,40 @@ class Link(models.Model):
 
     def __str__(self):
         return f"Link for {self.post.title}: {self.text}"
+
+
+class RelatedPost(models.Model):
+    """One of the top-k most similar posts of `post`, precomputed by blog.related."""
+    post = models.ForeignKey(Post, related_name='related_entries', on_delete=models.CASCADE)
+    related = models.ForeignKey(Post, related_name='+', on_delete=models.CASCADE)
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['rank']
+        constraints = [
+            # also the index serving the `related` action
+            models.UniqueConstraint(fields=['post', 'rank'], name='relatedpost_post_rank_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} -> {self.related_id} ({self.score:.3f})"
+
+
+
+class RelatedRefresh(models.Model):
+    """A post change whose related posts the `refresh_related_posts` process still has to refresh.
+
+    Written in the changing transaction (see blog.related.schedule_refresh).
+    `post_id` is a plain integer: the post may be gone. `referrers` lists the
+    posts that showed a deleted post, whose rows left with it.
+    """
+    post_id = models.BigIntegerField()
+    referrers = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['pk']
+
+    def __str__(self):
+        return f"refresh {self.post_id}"
@@ -0,0 +1,268 @@
+"""Precomputed "related posts".
+
+Posts are compared through the cosine similarity of their TF-IDF vectors
+(sublinear term frequency, smoothed idf, title counted twice) built over
+title and content with NumPy. The top RELATED_POSTS_COUNT neighbours of each
+post are stored in `RelatedPost`, so serving them is one indexed lookup.
+
+Only terms found in at least two posts can make two posts similar, so the
+matrix is restricted to those columns (row norms still account for every
+term); it stays small enough to be dense.
+
+Requests only queue the posts that changed (`RelatedRefresh`, written in the
+same transaction). The `refresh_related_posts` process keeps the corpus in
+memory and applies the queue: it re-vectorizes the changed posts alone and computes
+the dot products of the rows that can change. The idf weights and columns are
+fixed when the corpus is built, so fresh scores stay comparable with the
+stored ones. They are rebuilt, with every stored row, when another process
+rebuilt them (`rebuild_related_posts`) or once a tenth of the posts changed.
+"""
+import logging
+import math
+import re
+import uuid
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Min
+
+from .models import Post, RelatedPost, RelatedRefresh
+
+logger = logging.getLogger(__name__)
+
+# shared cache key naming the weighting the stored rows were computed with
+WEIGHTS_KEY = 'blog:related:weights'
+# share of the posts that may change before the weighting is recomputed
+REWEIGHT_AFTER = 0.1
+
+_TOKEN_RE = re.compile(r'[^\W\d_]{2,}', re.UNICODE)
+
+STOP_WORDS = frozenset('''
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+au aux avec ce ces dans de des du elle en et il ils je la le les leur mais ne nous on ou par pas pour
+qu que qui sa se ses son sur un une vous est sont été être
+'''.split())
+
+
+def tokenize(text):
+    return [token for token in _TOKEN_RE.findall((text or '').lower()) if token not in STOP_WORDS]
+
+
+def _terms(title, content):
+    # the title counts twice: it says more about the subject than any body sentence
+    return Counter(tokenize(title) * 2 + tokenize(content))
+
+
+class Corpus:
+    """L2-normalized TF-IDF vectors of every post, as a dense (posts x terms) matrix.
+
+    The weighting (idf and shared-term columns) is fixed at construction;
+    `update` and `remove` keep the rows in step with later post changes.
+    """
+
+    def __init__(self, rows):
+        rows = list(rows)
+        counts = [_terms(title, content) for _, title, content in rows]
+
+        n = len(counts)
+        df = Counter(term for doc in counts for term in doc)
+        self.idf = {term: math.log((1 + n) / (1 + freq)) + 1 for term, freq in df.items()}
+        # a term none of these posts had counts as found in one post
+        self.new_term_idf = math.log((1 + n) / 2) + 1
+        shared = sorted(term for term, freq in df.items() if freq >= 2)
+        self.column = {term: j for j, term in enumerate(shared)}
+
+        self.ids = np.array([pk for pk, _, _ in rows], dtype=np.int64)
+        self.matrix = np.zeros((n, len(shared)), dtype=np.float32)
+        for i, doc in enumerate(counts):
+            self.matrix[i] = self._vector(doc)
+        self._index()
+        self.changes = 0
+        self.token = None
+
+    def _index(self):
+        self.position = {int(pk): i for i, pk in enumerate(self.ids)}
+
+    def _vector(self, counts):
+        vector = np.zeros(len(self.column), dtype=np.float32)
+        norm = 0.0
+        for term, tf in counts.items():
+            weight = (1 + math.log(tf)) * self.idf.get(term, self.new_term_idf)
+            norm += weight * weight
+            j = self.column.get(term)
+            if j is not None:
+                vector[j] = weight
+        if norm:
+            vector /= math.sqrt(norm)
+        return vector
+
+    def update(self, rows):
+        """Add or replace the vectors of (pk, title, content) rows."""
+        added_ids, added = [], []
+        for pk, title, content in rows:
+            vector = self._vector(_terms(title, content))
+            if pk in self.position:
+                self.matrix[self.position[pk]] = vector
+            else:
+                added_ids.append(pk)
+                added.append(vector)
+            self.changes += 1
+        if added:
+            self.ids = np.concatenate([self.ids, np.array(added_ids, dtype=np.int64)])
+            self.matrix = np.vstack([self.matrix, np.array(added, dtype=np.float32)])
+            self._index()
+
+    def remove(self, pks):
+        drop = [self.position[pk] for pk in pks if pk in self.position]
+        if drop:
+            self.ids = np.delete(self.ids, drop)
+            self.matrix = np.delete(self.matrix, drop, axis=0)
+            self._index()
+            self.changes += len(drop)
+
+    @classmethod
+    def load(cls):
+        return cls(Post.objects.order_by('pk').values_list('pk', 'title', 'content'))
+
+    def similarities(self, positions):
+        """Cosine similarity of the posts at `positions` to every post, self excluded."""
+        positions = np.asarray(positions, dtype=np.int64)
+        scores = self.matrix[positions] @ self.matrix.T
+        scores[np.arange(len(positions)), positions] = -1.0
+        return scores
+
+    def top_k(self, scores, k):
+        """[(post id, score)] of the k best positive scores of one row, best first."""
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(int(self.ids[j]), float(scores[j])) for j in best if scores[j] > 0]
+
+
+def _write_rows(neighbours):
+    """Replace the stored neighbours of every post in `neighbours` ({post id: [(id, score)]})."""
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=list(neighbours)).delete()
+        RelatedPost.objects.bulk_create([
+            RelatedPost(post_id=post_id, related_id=related_id, rank=rank, score=score)
+            for post_id, rows in neighbours.items()
+            for rank, (related_id, score) in enumerate(rows)
+        ])
+
+
+# this process's corpus, in step with the stored rows (see _current_corpus)
+_corpus = None
+
+
+def rebuild(batch_size=256):
+    """Recompute the weighting and the neighbours of every post. Returns the number of posts."""
+    global _corpus
+    queued = RelatedRefresh.objects.aggregate(last=Max('pk'))['last']
+    corpus = Corpus.load()
+    k = settings.RELATED_POSTS_COUNT
+    neighbours = {}
+    for start in range(0, len(corpus.ids), batch_size):
+        positions = range(start, min(start + batch_size, len(corpus.ids)))
+        for i, scores in zip(positions, corpus.similarities(list(positions))):
+            neighbours[int(corpus.ids[i])] = corpus.top_k(scores, k)
+    with transaction.atomic():
+        RelatedPost.objects.all().delete()
+        _write_rows(neighbours)
+        if queued is not None:
+            # covered by this rebuild
+            RelatedRefresh.objects.filter(pk__lte=queued).delete()
+    corpus.token = uuid.uuid4().hex
+    cache.set(WEIGHTS_KEY, corpus.token, timeout=None)
+    _corpus = corpus
+    return len(neighbours)
+
+
+def _current_corpus():
+    """(corpus, rebuilt): this process's corpus, rebuilt with every row when its weighting is not current."""
+    corpus = _corpus
+    if (
+        corpus is None or corpus.token != cache.get(WEIGHTS_KEY)
+        or corpus.changes > REWEIGHT_AFTER * max(len(corpus.ids), 10)
+    ):
+        rebuild()
+        return _corpus, True
+    return corpus, False
+
+
+def refresh(post_ids, also=()):
+    """Refresh the rows affected by changes to `post_ids` (saved or deleted posts).
+
+    Affected rows: the changed posts themselves, posts that listed one of them,
+    posts whose k-th best score one of them now beats, and `also` (e.g. the
+    posts that listed a deleted post, whose rows are gone with it).
+    """
+    post_ids = set(post_ids)
+    corpus, rebuilt = _current_corpus()
+    if rebuilt:
+        return len(corpus.ids)
+    k = settings.RELATED_POSTS_COUNT
+
+    rows = list(Post.objects.filter(pk__in=post_ids).values_list('pk', 'title', 'content'))
+    corpus.remove(post_ids - {pk for pk, _, _ in rows})
+    corpus.update(rows)
+
+    affected = set(RelatedPost.objects.filter(related_id__in=post_ids).values_list('post_id', flat=True))
+    affected |= post_ids | set(also)
+    best = {}
+    if rows:
+        # similarity is symmetric: column q of these rows is sim(q, changed post)
+        for scores in corpus.similarities([corpus.position[pk] for pk, _, _ in rows]):
+            for j in np.flatnonzero(scores > 0):
+                pk = int(corpus.ids[j])
+                if pk not in affected:
+                    best[pk] = max(best.get(pk, 0.0), float(scores[j]))
+    if best:
+        stored = RelatedPost.objects.filter(post_id__in=list(best)).order_by().values('post_id').annotate(
+            count=Count('pk'), lowest=Min('score'),
+        ).values_list('post_id', 'count', 'lowest')
+        kth = {pk: (count, lowest) for pk, count, lowest in stored}
+        for pk, score in best.items():
+            count, lowest = kth.get(pk, (0, None))
+            if count < k or score > lowest:
+                affected.add(pk)
+
+    affected = [pk for pk in affected if pk in corpus.position]
+    neighbours = {}
+    if affected:
+        scores = corpus.similarities([corpus.position[pk] for pk in affected])
+        neighbours = {pk: corpus.top_k(row, k) for pk, row in zip(affected, scores)}
+    _write_rows(neighbours)
+    return len(neighbours)
+
+
+def schedule_refresh(post_ids, also=()):
+    """Queue a refresh of the related posts, in the current transaction (see process_pending)."""
+    RelatedRefresh.objects.bulk_create(
+        [RelatedRefresh(post_id=pk, referrers=list(also)) for pk in post_ids]
+    )
+
+
+def process_pending(limit=1000):
+    """Apply the queued changes (see refresh_related_posts). Returns the number of rows refreshed."""
+    global _corpus
+    pending = list(RelatedRefresh.objects.values_list('pk', 'post_id', 'referrers')[:limit])
+    if not pending:
+        return 0
+    changed, also = set(), set()
+    for _, post_id, referrers in pending:
+        changed.add(post_id)
+        also.update(referrers)
+    try:
+        count = refresh(changed, also=also)
+    except IntegrityError:
+        # a post deleted meanwhile was written as a neighbour: start over from the database
+        _corpus = None
+        logger.warning("Related posts refresh raced with a deletion; rebuilding on the next run.")
+        return 0
+    RelatedRefresh.objects.filter(pk__in=[pk for pk, _, _ in pending]).delete()
+    return count
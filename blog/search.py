@@ -0,0 +1,7 @@
+from core.search import FullTextIndex
+
+post_search = FullTextIndex(
+    'blog.Post',
+    fields=(('title', 'A'), ('content', 'B')),
+    snippet_field='content',
+)
@@ -1,7 +1,24 @@
 import json
 from django.db import transaction, IntegrityError
 from rest_framework import serializers
-from .models import Post, Image, Link
+from .models import Post, Image, Link, RelatedPost
+from core.media import upload_before_commit
+from core.serializers import ReadyMediaListSerializer
+from core.fieldsets import DynamicFieldsMixin
+
+
+def caption_from_meta(images_meta, index):
+    """Caption sent in images_meta for the index-th uploaded image, if any."""
+    if index < len(images_meta) and isinstance(images_meta[index], dict):
+        return images_meta[index].get('caption', '')
+    return ''
+
+
+def duplicate_title_error(exc):
+    """Turn a unique violation on lower(title) or on the derived slug into a validation error."""
+    if 'slug' in str(exc):
+        return serializers.ValidationError({"title": ["Un article avec un titre équivalent existe déjà."]})
+    return serializers.ValidationError({"title": ["Un article avec ce titre existe déjà."]})
 
 
 class ImageSerializer(serializers.ModelSerializer):
@@ -9,8 +26,9 @@ class ImageSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Image
-        fields = ('id', 'image', 'caption', 'post')
+        fields = ('id', 'image', 'caption', 'order', 'post')
         read_only_fields = ('post',)
+        list_serializer_class = ReadyMediaListSerializer
 
     def get_image(self, obj):
         """Return a Cloudinary URL only if it looks safe. Avoid returning malformed public IDs that would
@@ -29,34 +47,8 @@ class ImageSerializer(serializers.ModelSerializer):
             return None
 
     def delete(self, instance):
-        # Delete the image from Cloudinary using the public_id
-        try:
-            public_id = None
-            # CloudinaryField yields a CloudinaryResource with public_id attribute
-            if hasattr(instance.image, 'public_id') and instance.image.public_id:
-                public_id = instance.image.public_id
-            # fall back: if image is a string URL, try to extract public_id from it (best-effort)
-            if not public_id and isinstance(instance.image, str) and instance.image:
-                # URL may contain /upload/<version>/<public_id>.<ext> - attempt simple extraction
-                try:
-                    parts = instance.image.split('/upload/')
-                    if len(parts) > 1:
-                        tail = parts[1]
-                        # strip any transformations and extension
-                        tail = tail.split('/')[-1]
-                        public_id = tail.split('.')[0]
-                except Exception:
-                    public_id = None
-            if public_id:
-                try:
-                    import cloudinary.uploader
-                    cloudinary.uploader.destroy(public_id, invalidate=True)
-                except Exception:
-                    # ignore errors from Cloudinary delete
-                    pass
-        finally:
-            # Delete the database record regardless
-            instance.delete()
+        # The Cloudinary asset is destroyed in bulk once the deletion commits (see core.deletion)
+        instance.delete()
         return instance
 
 
@@ -68,7 +60,7 @@ class LinkSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     images = ImageSerializer(many=True, read_only=True)
     links = LinkSerializer(many=True, read_only=True)
 
@@ -83,14 +75,19 @@ class PostSerializer(serializers.ModelSerializer):
     images_meta = serializers.CharField(write_only=True, required=False)
     # accept a JSON string via multipart/form-data; we will parse it manually in create/update
     links_data = serializers.CharField(write_only=True, required=False)
+    # only present on ?search= results
+    search_rank = serializers.FloatField(read_only=True)
+    search_snippet = serializers.CharField(read_only=True)
 
     class Meta:
         model = Post
         fields = (
-            'id', 'title', 'slug', 'content', 'created_at',
-            'images', 'links', 'uploaded_images', 'images_meta', 'links_data'
+            'id', 'title', 'slug', 'content', 'excerpt', 'word_count', 'reading_time', 'created_at',
+            'images', 'links', 'uploaded_images', 'images_meta', 'links_data',
+            'search_rank', 'search_snippet'
         )
-        read_only_fields = ('slug', 'created_at')
+        read_only_fields = ('slug', 'created_at', 'excerpt', 'word_count', 'reading_time')
+        expandable_fields = ('images', 'links')
 
     def validate_title(self, value):
         """Ensure blog title is unique (case-insensitive). Return validation error with useful message."""
@@ -99,13 +96,7 @@ class PostSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Le titre est requis.")
         if len(title) > 200:
             raise serializers.ValidationError("Le titre ne peut pas dépasser 200 caractères.")
-        qs = Post.objects.filter(title__iexact=title)
-        # exclude current instance when updating
-        instance = getattr(self, 'instance', None)
-        if instance is not None:
-            qs = qs.exclude(pk=instance.pk)
-        if qs.exists():
-            raise serializers.ValidationError("Un article avec ce titre existe déjà.")
+        # uniqueness is enforced by the post_title_lower_uniq index, see duplicate_title_error
         return title
         
     def validate_content(self, value):
@@ -124,26 +115,30 @@ class PostSerializer(serializers.ModelSerializer):
         # Update post fields
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        try:
-            instance.save()
-        except IntegrityError:
-            raise serializers.ValidationError({"title": ["A blog post with this title already exists."]})
-
-        # Handle image uploads if provided
         if uploaded_images is not None:
             try:
                 images_meta = json.loads(images_meta) if isinstance(images_meta, str) else (images_meta or [])
             except (json.JSONDecodeError, TypeError):
                 images_meta = []
 
+        # Files are uploaded concurrently before the transaction; the post and its new images
+        # are then saved together, so the post cache is dropped once both are visible.
+        with upload_before_commit(uploaded_images or []) as resources, transaction.atomic():
+            try:
+                with transaction.atomic():
+                    instance.save()
+            except IntegrityError as exc:
+                raise duplicate_title_error(exc)
+
             # Add new images without deleting existing ones. The frontend should perform explicit
             # DELETE requests for any existing images the user has removed, so we only need to
             # append newly uploaded files here.
-            for i, image_file in enumerate(uploaded_images):
-                caption = ''
-                if i < len(images_meta) and isinstance(images_meta[i], dict) and 'caption' in images_meta[i]:
-                    caption = images_meta[i]['caption']
-                Image.objects.create(post=instance, image=image_file, caption=caption)
+            if resources:
+                offset = instance.images.count()
+                Image.objects.bulk_create([
+                    Image(post=instance, image=resource, caption=caption_from_meta(images_meta, i), order=offset + i)
+                    for i, resource in enumerate(resources)
+                ])
 
         # Handle links if provided
         if links_data is not None:
@@ -194,19 +189,19 @@ class PostSerializer(serializers.ModelSerializer):
         except (json.JSONDecodeError, TypeError):
             links_data = []
 
-        with transaction.atomic():
+        # Upload every image concurrently first, then write all rows in one short transaction
+        with upload_before_commit(uploaded_images) as resources, transaction.atomic():
             try:
-                post = Post.objects.create(**validated_data)
-            except IntegrityError as e:
-                # Convert DB uniqueness error into serializer validation error
-                raise serializers.ValidationError({"title": ["A blog post with this title already exists."]})
+                with transaction.atomic():
+                    post = Post.objects.create(**validated_data)
+            except IntegrityError as exc:
+                raise duplicate_title_error(exc)
 
             # Handle image uploads
-            for i, image_file in enumerate(uploaded_images):
-                caption = ''
-                if i < len(images_meta) and 'caption' in images_meta[i]:
-                    caption = images_meta[i]['caption']
-                Image.objects.create(post=post, image=image_file, caption=caption)
+            Image.objects.bulk_create([
+                Image(post=post, image=resource, caption=caption_from_meta(images_meta, i), order=i)
+                for i, resource in enumerate(resources)
+            ])
 
             # Handle links
             for link_data in links_data:
@@ -233,3 +228,35 @@ class PostSerializer(serializers.ModelSerializer):
 
             return post
         return instance
+
+
+class PostSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Teaser representation used by the post list: everything but `content`."""
+    images = ImageSerializer(many=True, read_only=True)
+    links = LinkSerializer(many=True, read_only=True)
+    # only present on ?search= results
+    search_rank = serializers.FloatField(read_only=True)
+    search_snippet = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Post
+        fields = (
+            'id', 'title', 'slug', 'excerpt', 'word_count', 'reading_time', 'created_at',
+            'images', 'links', 'search_rank', 'search_snippet'
+        )
+        read_only_fields = fields
+        expandable_fields = ('images', 'links')
+
+
+class RelatedPostSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='related.id', read_only=True)
+    title = serializers.CharField(source='related.title', read_only=True)
+    slug = serializers.CharField(source='related.slug', read_only=True)
+    excerpt = serializers.CharField(source='related.excerpt', read_only=True)
+    reading_time = serializers.IntegerField(source='related.reading_time', read_only=True)
+
+    class Meta:
+        model = RelatedPost
+        fields = ('id', 'title', 'slug', 'excerpt', 'reading_time', 'score')
+        read_only_fields = fields
+
@@ -0,0 +1,82 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from core.signals import bulk_changed
+from core.conditional import touch_parent_on_change
+from core.deletion import delete_media_on_delete
+from core import feeds
+from .cache import post_detail_cache
+from . import related
+from .models import Post, Image, Link, RelatedPost
+from .search import post_search
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw=False, **kwargs):
+    if not raw:
+        post_search.refresh(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    post_search.remove(instance.pk)
+
+
+def _slug_of(post_id):
+    return Post.objects.filter(pk=post_id).values_list('slug', flat=True).first()
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_slug(sender, instance, raw=False, **kwargs):
+    # the detail cache is keyed by slug: an edited slug must evict the old key too
+    instance._previous_slug = _slug_of(instance.pk) if instance.pk and not raw else None
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_detail(sender, instance, **kwargs):
+    post_detail_cache.invalidate(instance.slug, getattr(instance, '_previous_slug', None))
+
+
+@receiver(post_save, sender=Image)
+@receiver(post_delete, sender=Image)
+@receiver(post_save, sender=Link)
+@receiver(post_delete, sender=Link)
+def invalidate_parent_post_detail(sender, instance, **kwargs):
+    post_detail_cache.invalidate(_slug_of(instance.post_id))
+
+
+@receiver(bulk_changed, sender=Image)
+@receiver(bulk_changed, sender=Link)
+def invalidate_post_detail_after_bulk(sender, owner=None, **kwargs):
+    if owner is not None:
+        post_detail_cache.invalidate(_slug_of(owner.pk))
+
+
+# images and links have no updated_at of their own
+touch_parent_on_change(Image, 'post')
+touch_parent_on_change(Link, 'post')
+
+# cascaded deletes included: the assets go in one bulk call after commit
+delete_media_on_delete(Image)
+
+
+@receiver(post_save, sender=Post)
+def refresh_related_posts(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not {'title', 'content'} & set(update_fields)):
+        return
+    related.schedule_refresh([instance.pk])
+
+
+@receiver(pre_delete, sender=Post)
+def remember_related_referrers(sender, instance, **kwargs):
+    # their rows pointing at this post go with the cascade
+    instance._related_referrers = list(RelatedPost.objects.filter(related=instance).values_list('post_id', flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def refresh_related_after_delete(sender, instance, **kwargs):
+    related.schedule_refresh([instance.pk], also=getattr(instance, '_related_referrers', []))
+
+
+feeds.track(Post)
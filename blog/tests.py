@@ -1,19 +1,28 @@
 import json
-from io import BytesIO
+from unittest import mock
+from io import BytesIO, StringIO
 from PIL import Image as PILImage
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db import transaction
 
-from .models import Post, Image
+from .models import Post, Image, Link, RelatedRefresh
+from . import related
+from .cache import post_detail_cache
 
 User = get_user_model()
 
 
 class BlogPostViewSetTests(APITestCase):
     def setUp(self):
+        cache.clear()
+        post_detail_cache.reset()
+
         # Create a regular user
         self.user = User.objects.create_user(username='testuser', password='password123')
 
@@ -116,3 +125,159 @@ class BlogPostViewSetTests(APITestCase):
         self.post1.refresh_from_db()
         self.assertEqual(self.post1.title, 'Updated Title')
 
+
+    def test_list_posts_cursor_pagination(self):
+        """Ensure ?pagination=cursor pages through posts newest first."""
+        url = reverse('post-list')
+        response = self.client.get(url, {'pagination': 'cursor', 'page_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['title'] for p in response.data['results']], ['Second Post'])
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([p['title'] for p in response.data['results']], ['First Post'])
+        self.assertIsNone(response.data['next'])
+
+    def test_search_posts(self):
+        """Ensure ?search= returns ranked, highlighted full-text matches."""
+        Post.objects.create(title='Django tips', content='Caching querysets in Django views.')
+        url = reverse('post-list')
+        response = self.client.get(url, {'search': 'django'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['title'] for p in response.data], ['Django tips'])
+        self.assertIn('<mark>', response.data[0]['search_snippet'])
+
+        response = self.client.get(url, {'search': 'post'})
+        self.assertEqual(len(response.data), 2)
+
+    def test_reorder_and_replace_links(self):
+        """Ensure links can be reordered and replaced in bulk."""
+        self.client.force_authenticate(user=self.superuser)
+        first = Link.objects.create(post=self.post1, url='https://a.example.com', text='A', order=0)
+        second = Link.objects.create(post=self.post1, url='https://b.example.com', text='B', order=1)
+
+        url = reverse('post-reorder-links', kwargs={'slug': self.post1.slug})
+        response = self.client.post(url, {'ids': [second.id, first.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([l['text'] for l in response.data], ['B', 'A'])
+        self.assertEqual(list(self.post1.links.values_list('text', flat=True)), ['B', 'A'])
+
+        # Every link of the post must be listed
+        response = self.client.post(url, {'ids': [first.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        url = reverse('post-replace-links', kwargs={'slug': self.post1.slug})
+        data = [{'url': 'https://c.example.com', 'text': 'C'}, {'url': 'https://d.example.com', 'text': 'D'}]
+        response = self.client.put(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(self.post1.links.values_list('text', 'order')), [('C', 0), ('D', 1)])
+
+    def test_reorder_links_requires_superuser(self):
+        """Ensure regular users cannot reorder links."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('post-reorder-links', kwargs={'slug': self.post1.slug})
+        response = self.client.post(url, {'ids': [1]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_post_summary_computed_on_save(self):
+        """Ensure excerpt, word count and reading time are derived from content."""
+        post = Post.objects.create(title='Long read', content='<p>' + 'word ' * 450 + '</p>')
+        self.assertEqual(post.word_count, 450)
+        self.assertEqual(post.reading_time, 3)
+        self.assertTrue(post.excerpt.startswith('word word'))
+        self.assertLessEqual(len(post.excerpt), 280)
+        self.assertNotIn('<p>', post.excerpt)
+
+    def test_list_posts_returns_summaries(self):
+        """Ensure the list serializes teasers and never loads content."""
+        url = reverse('post-list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('content', response.data[0])
+        self.assertEqual(response.data[0]['excerpt'], 'This is the second post.')
+
+        response = self.client.get(url, {'full': '1'})
+        self.assertEqual(response.data[0]['content'], 'This is the second post.')
+
+    def test_backfill_post_summaries(self):
+        """Ensure the backfill command fills summaries of older rows."""
+        Post.objects.filter(pk=self.post1.pk).update(excerpt='', word_count=0, reading_time=0)
+        call_command('backfill_post_summaries', stdout=StringIO())
+        self.post1.refresh_from_db()
+        self.assertEqual(self.post1.word_count, 5)
+        self.assertEqual(self.post1.reading_time, 1)
+
+    def test_retrieve_post_is_cached_until_changed(self):
+        """Ensure post details are served from cache and invalidated by child changes."""
+        url = reverse('post-detail', kwargs={'slug': self.post1.slug})
+        self.client.get(url)
+        # only the conditional GET validators hit the database
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data['links'], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Link.objects.create(post=self.post1, url='https://example.com', text='Demo')
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['links']), 1)
+
+        stats = post_detail_cache.stats()
+        self.assertEqual((stats['local_hits'], stats['misses']), (1, 2))
+
+    def test_retrieve_post_after_slug_change(self):
+        """Ensure the old slug stops resolving once the slug is edited."""
+        old_url = reverse('post-detail', kwargs={'slug': self.post1.slug})
+        self.client.get(old_url)
+        self.post1.slug = 'renamed-post'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post1.save()
+        self.assertEqual(self.client.get(old_url).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('post-detail', kwargs={'slug': 'renamed-post'}))
+        self.assertEqual(response.data['slug'], 'renamed-post')
+
+
+    def test_update_post_duplicate_title_case_insensitive(self):
+        """Ensure the lower(title) unique index rejects titles differing only by case."""
+        self.client.force_authenticate(user=self.superuser)
+        url = reverse('post-detail', kwargs={'slug': self.post2.slug})
+        response = self.client.patch(url, {'title': 'FIRST post'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['title'], ['Un article avec ce titre existe déjà.'])
+        self.post2.refresh_from_db()
+        self.assertEqual(self.post2.title, 'Second Post')
+
+        # keeping its own title is not a conflict
+        response = self.client.patch(url, {'title': 'Second Post'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_related_posts(self):
+        """Ensure similar posts are precomputed by the worker and served by the related action."""
+        django = Post.objects.create(title='Django caching', content='Caching Django querysets and views with Redis.')
+        Post.objects.create(title='Redis tips', content='Using Redis as a Django cache backend.')
+        Post.objects.create(title='Gardening', content='Growing tomatoes on a balcony.')
+        self.assertEqual(RelatedRefresh.objects.count(), 5)
+        related.process_pending()
+        self.assertFalse(RelatedRefresh.objects.exists())
+
+        url = reverse('post-related', kwargs={'slug': django.slug})
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['title'] for p in response.data], ['Redis tips'])
+
+        # editing a post only refreshes the rows it affects, with the same weighting
+        gardening = Post.objects.get(title='Gardening')
+        gardening.content = 'Caching Django views with Redis while growing tomatoes.'
+        gardening.save()
+        with mock.patch.object(related.Corpus, 'load', side_effect=AssertionError('no rebuild')):
+            self.assertEqual(related.process_pending(), 3)
+        response = self.client.get(url)
+        self.assertEqual({p['title'] for p in response.data}, {'Redis tips', 'Gardening'})
+
+        self.assertEqual(self.client.get(reverse('post-related', kwargs={'slug': 'missing'})).status_code, 404)
+
+        gardening.delete()
+        call_command('refresh_related_posts', '--once', stdout=StringIO())
+        self.assertFalse(RelatedRefresh.objects.exists())
+        response = self.client.get(url)
+        self.assertEqual([p['title'] for p in response.data], ['Redis tips'])
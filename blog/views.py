@@ -3,18 +3,79 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 
-from .models import Post, Image, Link
-from .serializers import PostSerializer, ImageSerializer, LinkSerializer
+from .models import Post, Image, Link, RelatedPost
+from .serializers import (
+    PostSerializer, PostSummarySerializer, ImageSerializer, LinkSerializer, RelatedPostSerializer, caption_from_meta,
+)
 from core.permissions import IsSuperUser
+from core.models import MEDIA_PENDING, MEDIA_READY
+from core.serializers import MediaIngestJobSerializer
+from core import ingest
+from core.fieldsets import DynamicPrefetchMixin, FIELDS_PARAM, EXPAND_PARAM
+from core.conditional import ConditionalGetMixin
+from core.bulk import ReorderSerializer, get_parent_or_404, reorder, replace_children
+from django.db import transaction
+import json
+from core.pagination import CreatedAtKeysetPagination
+from core.search import FullTextSearchFilter
+from .search import post_search
+from .cache import post_detail_cache
 
 
-class BlogPostViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.prefetch_related("images", "links").all()
+class BlogPostViewSet(ConditionalGetMixin, DynamicPrefetchMixin, viewsets.ModelViewSet):
+    queryset = Post.objects.all()
+    prefetch_map = {'images': 'images', 'links': 'links'}
     serializer_class = PostSerializer
     lookup_field = 'slug'
+    pagination_class = CreatedAtKeysetPagination
+    filter_backends = [FullTextSearchFilter]
+    search_index = post_search
+
+    def _wants_summary(self):
+        # The list returns teasers unless ?full=1 asks for the whole posts
+        return self.action == 'list' and self.request.query_params.get('full') not in ('1', 'true', 'True')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self._wants_summary():
+            queryset = queryset.defer('content')
+        return queryset
+
+    def get_serializer_class(self):
+        if self._wants_summary():
+            return PostSummarySerializer
+        return super().get_serializer_class()
+
+    def retrieve(self, request, *args, **kwargs):
+        # Sparse variants are rare: serve them uncached rather than multiplying keys
+        if FIELDS_PARAM in request.query_params or EXPAND_PARAM in request.query_params:
+            return super().retrieve(request, *args, **kwargs)
+        slug = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return self.respond_conditionally(
+            self.get_conditional_queryset(),
+            lambda: Response(post_detail_cache.get_or_build(slug, lambda: self.get_serializer(self.get_object()).data)),
+        )
+
+    @action(detail=False, methods=['get'], url_path='cache-stats', permission_classes=[IsSuperUser])
+    def cache_stats(self, request):
+        """Hit ratio of the post detail cache in this worker process."""
+        return Response(post_detail_cache.stats())
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny])
+    def related(self, request, slug=None):
+        """Most similar posts, precomputed by blog.related."""
+        entries = list(
+            RelatedPost.objects.filter(post__slug=slug)
+            .select_related('related')
+            .only('score', 'related__id', 'related__title', 'related__slug', 'related__excerpt', 'related__reading_time')
+        )
+        if not entries:
+            # tell an unknown slug apart from a post without neighbours
+            get_object_or_404(Post.objects.only('pk'), slug=slug)
+        return Response(RelatedPostSerializer(entries, many=True).data)
 
     def get_permissions(self):
-        if self.action in ["list", "retrieve"]:
+        if self.action in ["list", "retrieve", "related"]:
             return [permissions.AllowAny()]
         return [IsSuperUser()]
 
@@ -30,6 +91,8 @@ class BlogPostViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], permission_classes=[IsSuperUser])
     def add_images(self, request, slug=None):
         post = self.get_object()
+        if ingest.wants_async(request):
+            return self._add_images_async(request, post)
         serializer = ImageSerializer(data=request.data, many=True)
         if serializer.is_valid():
             images = []
@@ -46,6 +109,28 @@ class BlogPostViewSet(viewsets.ModelViewSet):
             )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def _add_images_async(self, request, post):
+        """Spool the files, create pending images and let the worker upload them."""
+        files = request.FILES.getlist('uploaded_images') or request.FILES.getlist('image')
+        if not files:
+            return Response({"uploaded_images": ["No file was submitted."]}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            images_meta = json.loads(request.data.get('images_meta') or '[]')
+        except (json.JSONDecodeError, TypeError):
+            images_meta = []
+        with transaction.atomic():
+            offset = post.images.count()
+            images = Image.objects.bulk_create([
+                Image(post=post, image='', status=MEDIA_PENDING, caption=caption_from_meta(images_meta, i),
+                      order=offset + i)
+                for i, _ in enumerate(files)
+            ])
+            jobs = ingest.enqueue(zip(images, files))
+        return Response(
+            {"jobs": MediaIngestJobSerializer(jobs, many=True).data},
+            status=status.HTTP_202_ACCEPTED
+        )
+
     @action(detail=True, methods=['put', 'patch'], url_path=r'images/(?P<image_id>\\d+)', 
             permission_classes=[IsSuperUser])
     def update_image(self, request, slug=None, image_id=None):
@@ -68,6 +153,19 @@ class BlogPostViewSet(viewsets.ModelViewSet):
             status=status.HTTP_204_NO_CONTENT
         )
 
+    @action(detail=True, methods=['post'], url_path='images/reorder', permission_classes=[IsSuperUser])
+    def reorder_images(self, request, slug=None):
+        """Set the display order of all images at once: {"ids": [3, 1, 2]}.
+
+        Only the images shown are listed; those still being uploaded stay after them.
+        """
+        post = get_parent_or_404(self)
+        serializer = ReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        shown = Image.objects.filter(post=post, status=MEDIA_READY)
+        images = reorder(shown, serializer.validated_data['ids'], owner=post)
+        return Response({"ids": [image.pk for image in images]})
+
     @action(detail=True, methods=['get'], url_path='images', permission_classes=[permissions.AllowAny])
     def list_images(self, request, slug=None):
         post = self.get_object()
@@ -109,6 +207,24 @@ class BlogPostViewSet(viewsets.ModelViewSet):
         link.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=True, methods=['post'], url_path='links/reorder', permission_classes=[IsSuperUser])
+    def reorder_links(self, request, slug=None):
+        """Set the display order of all links at once: {"ids": [3, 1, 2]}."""
+        post = get_parent_or_404(self)
+        serializer = ReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        links = reorder(Link.objects.filter(post=post), serializer.validated_data['ids'], owner=post)
+        return Response(LinkSerializer(links, many=True).data)
+
+    @action(detail=True, methods=['put'], url_path='links/replace', permission_classes=[IsSuperUser])
+    def replace_links(self, request, slug=None):
+        """Replace every link with the submitted list, kept in list order."""
+        post = get_parent_or_404(self)
+        serializer = LinkSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        links = replace_children(Link, 'post', post, serializer.validated_data)
+        return Response(LinkSerializer(links, many=True).data)
+
     @action(detail=True, methods=['get'], url_path='links', permission_classes=[permissions.AllowAny])
     def list_links(self, request, slug=None):
         post = self.get_object()
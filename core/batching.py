@@ -0,0 +1,54 @@
+"""Collect work during a transaction and run it once, after commit."""
+import weakref
+
+from django.db import transaction
+
+
+class CommitBatch:
+    """on_commit callback accumulating the items scheduled at one savepoint level."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.items = []
+        self.closed = False
+
+    def __call__(self):
+        # items scheduled by the handler itself go to a new batch
+        self.closed = True
+        self.handler(self.items)
+
+
+def _pending_batches(connection):
+    """{(handler, savepoint ids): CommitBatch} of the batches still waiting for a commit.
+
+    Values are weak references: once Django has run a callback, or dropped it
+    with a rolled back savepoint or transaction, nothing else holds the batch
+    and its entry goes away.
+    """
+    pending = getattr(connection, 'pending_commit_batches', None)
+    if pending is None:
+        pending = connection.pending_commit_batches = weakref.WeakValueDictionary()
+    return pending
+
+
+def on_commit_batch(handler, items, using=None):
+    """Run `handler(all items)` once when the current transaction commits.
+
+    Calls made at the same savepoint level share one callback; items added
+    inside a savepoint that is rolled back are dropped with it. Outside of a
+    transaction `handler` runs immediately.
+    """
+    items = list(items)
+    if not items:
+        return
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        handler(items)
+        return
+    pending = _pending_batches(connection)
+    key = (handler, tuple(connection.savepoint_ids))
+    batch = pending.get(key)
+    if batch is None or batch.closed:
+        batch = pending[key] = CommitBatch(handler)
+        transaction.on_commit(batch, using=using, robust=True)
+    batch.items.extend(items)
@@ -0,0 +1,71 @@
+"""Bulk reorder/replace helpers for ordered child rows (media, images, links)."""
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from rest_framework import serializers
+
+from .signals import bulk_changed
+
+
+class ReorderSerializer(serializers.Serializer):
+    """Every child id of the parent, in the wanted display order."""
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+
+    def validate_ids(self, value):
+        if len(value) != len(set(value)):
+            raise serializers.ValidationError("Duplicate ids are not allowed.")
+        return value
+
+
+def get_parent_or_404(view):
+    """Fetch only the primary key of the view's object.
+
+    Enough to check that it exists and to scope child rows to it, without running
+    the view's prefetch-heavy queryset.
+    """
+    lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+    model = view.get_queryset().model
+    obj = get_object_or_404(model._default_manager.only('pk'), **{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+    view.check_object_permissions(view.request, obj)
+    return obj
+
+
+def reorder(queryset, ids, owner=None):
+    """Set `order` of every row in `queryset` to its position in `ids` with one bulk_update.
+
+    `ids` must list exactly the rows of `queryset`, which is what guarantees they
+    all belong to the parent.
+    """
+    rows = list(queryset.only('pk', 'order'))
+    known = {row.pk for row in rows}
+    unknown = [pk for pk in ids if pk not in known]
+    missing = sorted(known.difference(ids))
+    if unknown or missing:
+        errors = []
+        if unknown:
+            errors.append(f"Unknown ids: {', '.join(map(str, unknown))}.")
+        if missing:
+            errors.append(f"Missing ids: {', '.join(map(str, missing))}.")
+        raise serializers.ValidationError({'ids': errors})
+    position = {pk: i for i, pk in enumerate(ids)}
+    for row in rows:
+        row.order = position[row.pk]
+    queryset.model._default_manager.bulk_update(rows, ['order'])
+    bulk_changed.send(sender=queryset.model, owner=owner)
+    return sorted(rows, key=lambda row: row.order)
+
+
+def replace_children(model, owner_field, owner, items):
+    """Replace all of the owner's `model` rows by `items` (validated dicts).
+
+    One delete and one bulk_create in a single transaction; missing `order`
+    values default to the position in the list.
+    """
+    rows = [
+        model(**{owner_field: owner, 'order': i, **item})
+        for i, item in enumerate(items)
+    ]
+    with transaction.atomic():
+        model._default_manager.filter(**{owner_field: owner}).delete()
+        created = model._default_manager.bulk_create(rows)
+    bulk_changed.send(sender=model, owner=owner)
+    return created
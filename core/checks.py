@@ -0,0 +1,26 @@
+"""System checks for the deployment settings this project relies on."""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# in-memory backends shared by every process; the others are per process, or
+# turn every cache read into a database query (DatabaseCache, FileBasedCache)
+SHARED_CACHES = (
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """The cached copies (posts, feeds, timeline, skill catalog) are invalidated through the
+    default cache: with several workers it must be shared, or the others serve stale data.
+    Cached documents must also be served without a database query."""
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if settings.DEBUG or backend in SHARED_CACHES:
+        return []
+    return [Error(
+        f"The default cache ({backend}) is not an in-memory cache shared between processes.",
+        hint="Set CACHE_BACKEND and CACHE_LOCATION to a Redis or Memcached server.",
+        id='core.E001',
+    )]
@@ -0,0 +1,126 @@
+"""Conditional GET for read endpoints.
+
+Validators are built from one aggregate query, `MAX(updated_at), COUNT(*)`
+over the queryset a response is made of, so a matching `If-None-Match` (or a
+recent enough `If-Modified-Since`) is answered with 304 before any row is
+serialized. Child rows without their own `updated_at` (media, links, skill
+links) touch their parent's, see `touch_parent_on_change`.
+"""
+import hashlib
+
+from django.apps import apps
+from django.db.models import Count, Max
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from .signals import bulk_changed
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header value matches `etag`: `*` or any tag of
+    the list, compared weakly as GET allows (RFC 9110 13.1.2)."""
+    if if_none_match.strip() == '*':
+        return True
+    wanted = etag.removeprefix('W/')
+    return any(tag.removeprefix('W/') == wanted for tag in parse_etags(if_none_match))
+
+
+class ConditionalGetMixin:
+    """Adds ETag / Last-Modified validators to `list` and `retrieve`.
+
+    `conditional_dependencies` lists other model labels whose rows end up in the
+    representation (e.g. skill names rendered inside projects); their
+    `MAX(updated_at)` is folded into the validators as well.
+    """
+    conditional_field = 'updated_at'
+    conditional_dependencies = ()
+
+    def get_conditional_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg in self.kwargs:
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def get_validators(self, queryset):
+        """Return (etag, last_modified) for `queryset` and the current request."""
+        stats = queryset.order_by().aggregate(
+            last_modified=Max(self.conditional_field), count=Count('pk')
+        )
+        parts = [stats['last_modified'], stats['count']]
+        timestamps = [stats['last_modified']]
+        for label in self.conditional_dependencies:
+            model = apps.get_model(label)
+            last = model._default_manager.aggregate(last=Max(self.conditional_field))['last']
+            parts.append(last)
+            timestamps.append(last)
+        # the same rows render differently with another page, filter or field set
+        parts.append(self.request.get_full_path())
+        etag = 'W/"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()
+        timestamps = [ts for ts in timestamps if ts is not None]
+        return etag, max(timestamps) if timestamps else None
+
+    def respond_conditionally(self, queryset, respond):
+        """Answer 304 when the client's copy is current, else `respond()` with validators."""
+        etag, last_modified = self.get_validators(queryset)
+        if self._not_modified(etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = respond()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+    def _not_modified(self, etag, last_modified):
+        if_none_match = self.request.headers.get('If-None-Match')
+        if if_none_match:
+            return etag_matches(if_none_match, etag)
+        since = parse_http_date_safe(self.request.headers.get('If-Modified-Since') or '')
+        return since is not None and last_modified is not None and int(last_modified.timestamp()) <= since
+
+    def list(self, request, *args, **kwargs):
+        return self.respond_conditionally(
+            self.get_conditional_queryset(), lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.respond_conditionally(
+            self.get_conditional_queryset(), lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        )
+
+
+def touch(model, pk):
+    """Bump `updated_at` of one row without going through save()."""
+    if pk is not None:
+        model._default_manager.filter(pk=pk).update(updated_at=timezone.now())
+
+
+def touch_parent_on_change(child_model, parent_field, per_row=True):
+    """Keep the parent's `updated_at` current when `child_model` rows change.
+
+    Covers save/delete of single rows and `bulk_changed` sent after bulk writes
+    (with the parent as `owner`). Pass per_row=False for rows only ever written
+    in bulk, to touch the parent once per batch instead of once per row.
+    """
+    parent_model = child_model._meta.get_field(parent_field).related_model
+    attname = child_model._meta.get_field(parent_field).attname
+    label = child_model._meta.label_lower
+
+    def on_change(sender, instance, raw=False, **kwargs):
+        if not raw:
+            touch(parent_model, getattr(instance, attname))
+
+    def on_bulk_change(sender, owner=None, **kwargs):
+        if owner is not None:
+            touch(parent_model, owner.pk)
+
+    if per_row:
+        post_save.connect(on_change, sender=child_model, weak=False, dispatch_uid=f'touch_parent_save_{label}')
+        post_delete.connect(on_change, sender=child_model, weak=False, dispatch_uid=f'touch_parent_delete_{label}')
+    bulk_changed.connect(on_bulk_change, sender=child_model, weak=False, dispatch_uid=f'touch_parent_bulk_{label}')
@@ -0,0 +1,147 @@
+"""Batched deletion of Cloudinary assets.
+
+Deleting a media row (directly or through a cascade) only records its public
+id. Once the surrounding transaction commits, every id collected in it is
+stored as a `MediaDeletion` and destroyed with the bulk delete API, up to
+MEDIA_DELETION_BATCH_SIZE ids per call. Ids that could not be destroyed stay
+queued and are retried with exponential backoff by the `process_media_jobs`
+worker. `collect_media_garbage` catches whatever slipped through anyway.
+
+The API client is `settings.MEDIA_DELETION_BACKEND`, so tests can swap in a
+local fake (`core.testing.FakeCloudinaryBackend`).
+"""
+import logging
+from datetime import timedelta
+
+import cloudinary.api
+from django.conf import settings
+from django.db.models.signals import post_delete
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .batching import on_commit_batch
+from .models import MediaDeletion
+
+logger = logging.getLogger(__name__)
+
+
+class CloudinaryBackend:
+    """Talks to the Cloudinary Admin API."""
+
+    def delete(self, public_ids, resource_type='image'):
+        """Destroy `public_ids` and return the ids that are gone."""
+        result = cloudinary.api.delete_resources(
+            list(public_ids), resource_type=resource_type, type='upload', invalidate=True
+        )
+        # 'not_found' is as good as deleted
+        return {public_id for public_id, state in result.get('deleted', {}).items()
+                if state in ('deleted', 'not_found')}
+
+    def list_resources(self, prefix=None, resource_type='image'):
+        """Yield (public_id, created_at) for every uploaded asset, optionally under `prefix`."""
+        options = {'type': 'upload', 'resource_type': resource_type, 'max_results': 500}
+        if prefix:
+            options['prefix'] = prefix
+        while True:
+            page = cloudinary.api.resources(**options)
+            for resource in page.get('resources', []):
+                yield resource['public_id'], resource.get('created_at')
+            if not page.get('next_cursor'):
+                return
+            options['next_cursor'] = page['next_cursor']
+
+
+def get_backend():
+    return import_string(settings.MEDIA_DELETION_BACKEND)()
+
+
+def public_id_of(value):
+    """Public id of a CloudinaryField value (resource or stored string), or None."""
+    if not value:
+        return None
+    public_id = getattr(value, 'public_id', None)
+    if public_id:
+        return public_id
+    if isinstance(value, str):
+        # '.../image/upload/v123/folder/name.jpg' or 'folder/name'
+        tail = value.split('/upload/', 1)[-1]
+        parts = tail.split('/')
+        if parts and parts[0].startswith('v') and parts[0][1:].isdigit():
+            parts = parts[1:]
+        return '/'.join(parts).rsplit('.', 1)[0] or None
+    return None
+
+
+def schedule(public_ids):
+    """Queue assets for deletion once the current transaction commits.
+
+    All ids scheduled at the same savepoint level share one on_commit callback,
+    so a cascade deleting N rows costs one insert and N / batch size API calls.
+    Ids scheduled inside a savepoint that is rolled back are dropped with it.
+    """
+    on_commit_batch(flush, [public_id for public_id in public_ids if public_id])
+
+
+def flush(public_ids):
+    """Record `public_ids` as pending deletions and try to destroy them right away."""
+    public_ids = list(dict.fromkeys(public_ids))
+    if not public_ids:
+        return
+    MediaDeletion.objects.bulk_create(
+        [MediaDeletion(public_id=public_id) for public_id in public_ids], ignore_conflicts=True
+    )
+    process(MediaDeletion.objects.filter(public_id__in=public_ids))
+
+
+def process(deletions):
+    """Destroy the given pending deletions in batches; return how many are gone."""
+    backend = get_backend()
+    batch_size = settings.MEDIA_DELETION_BATCH_SIZE
+    deletions = list(deletions)
+    done = 0
+    for start in range(0, len(deletions), batch_size):
+        chunk = deletions[start:start + batch_size]
+        by_type = {}
+        for deletion in chunk:
+            by_type.setdefault(deletion.resource_type, []).append(deletion)
+        for resource_type, rows in by_type.items():
+            try:
+                gone = backend.delete([row.public_id for row in rows], resource_type=resource_type)
+                error = ''
+            except Exception as exc:
+                logger.warning("Bulk delete of %s Cloudinary assets failed: %s", len(rows), exc)
+                gone, error = set(), str(exc) or exc.__class__.__name__
+            MediaDeletion.objects.filter(public_id__in=gone).delete()
+            done += len(gone)
+            _postpone([row for row in rows if row.public_id not in gone], error or 'Not deleted.')
+    return done
+
+
+def _postpone(rows, error):
+    if not rows:
+        return
+    now = timezone.now()
+    for row in rows:
+        row.attempts += 1
+        row.error = error
+        delay = settings.MEDIA_DELETION_RETRY_DELAY * 2 ** min(row.attempts - 1, 10)
+        row.next_attempt_at = now + timedelta(seconds=delay)
+    MediaDeletion.objects.bulk_update(rows, ['attempts', 'error', 'next_attempt_at'])
+
+
+def retry_due(limit=None):
+    """Retry the pending deletions whose backoff has elapsed. Returns how many are gone."""
+    due = MediaDeletion.objects.filter(
+        next_attempt_at__lte=timezone.now(), attempts__lt=settings.MEDIA_DELETION_MAX_ATTEMPTS
+    )
+    return process(due[:limit or settings.MEDIA_DELETION_BATCH_SIZE * 10])
+
+
+def delete_media_on_delete(model, field_name='image'):
+    """Schedule the Cloudinary asset of every deleted `model` row for deletion."""
+    def on_delete(sender, instance, **kwargs):
+        schedule([public_id_of(getattr(instance, field_name))])
+
+    post_delete.connect(
+        on_delete, sender=model, weak=False, dispatch_uid=f'delete_media_{model._meta.label_lower}_{field_name}'
+    )
@@ -0,0 +1,276 @@
+"""RSS/Atom feeds and sitemap.xml, rendered ahead of time.
+
+Every published object is rendered once per document into a `FeedEntry` XML
+fragment. A document (`FeedDocument`) is its header, newest fragments and
+footer concatenated, stored raw and gzip-compressed. Model signals refresh the
+entries of the objects that changed and reassemble only the documents showing
+them, once per transaction.
+
+Reads go through the Django cache (FEEDS_CACHE_TIMEOUT); with a shared cache
+backend crawlers never reach the database, and refreshes overwrite the cached
+copy. With the per-process default, other workers catch up when it expires.
+"""
+import gzip
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from email.utils import format_datetime
+from operator import attrgetter
+from typing import Callable
+from xml.sax.saxutils import escape, quoteattr
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from .batching import on_commit_batch
+from .models import FeedEntry, FeedDocument
+
+CACHE_PREFIX = 'feeds:document'
+SUMMARY_LENGTH = 280
+
+
+def _as_datetime(value):
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.min)
+    return value if timezone.is_aware(value) else timezone.make_aware(value)
+
+
+@dataclass(frozen=True)
+class Source:
+    """How objects of one model appear in feeds."""
+    label: str
+    fields: tuple
+    path: str  # frontend path, formatted with the object's attributes
+    summary_field: str
+    published_field: str
+    title: Callable = attrgetter('title')  # object -> entry title
+
+    @property
+    def model(self):
+        return apps.get_model(self.label)
+
+    def objects(self, pks=None):
+        queryset = self.model._default_manager.only('pk', 'updated_at', *self.fields)
+        return queryset if pks is None else queryset.filter(pk__in=pks)
+
+    def url(self, obj):
+        return settings.FRONTEND_URL + self.path.format(obj=obj)
+
+    def summary(self, obj):
+        return Truncator(' '.join((getattr(obj, self.summary_field) or '').split())).chars(SUMMARY_LENGTH)
+
+    def published(self, obj):
+        return _as_datetime(getattr(obj, self.published_field))
+
+
+def _experience_title(experience):
+    return f"{experience.title} @ {experience.company}" if experience.company else experience.title
+
+
+SOURCES = {
+    source.label: source for source in (
+        Source('blog.Post', ('title', 'slug', 'excerpt', 'created_at'), '/blog/{obj.slug}', 'excerpt', 'created_at'),
+        Source('projects.Project', ('title', 'description', 'created_at'), '/projects/{obj.pk}',
+               'description', 'created_at'),
+        Source('experiences.Experience', ('title', 'company', 'description', 'start_date'),
+               '/experiences/{obj.pk}', 'description', 'start_date', title=_experience_title),
+    )
+}
+
+
+@dataclass(frozen=True)
+class Document:
+    key: str
+    format: str  # 'rss', 'atom' or 'sitemap'
+    title: str
+    sources: tuple
+    limit: int = None  # newest entries only; None keeps them all
+
+    @property
+    def content_type(self):
+        return {
+            'rss': 'application/rss+xml; charset=utf-8',
+            'atom': 'application/atom+xml; charset=utf-8',
+        }.get(self.format, 'application/xml; charset=utf-8')
+
+
+DOCUMENTS = {
+    document.key: document for document in (
+        Document('blog.rss', 'rss', 'Blog', ('blog.Post',), limit=50),
+        Document('blog.atom', 'atom', 'Blog', ('blog.Post',), limit=50),
+        Document('projects.rss', 'rss', 'Projets', ('projects.Project',), limit=50),
+        Document('sitemap.xml', 'sitemap', 'Sitemap', ('blog.Post', 'projects.Project', 'experiences.Experience')),
+    )
+}
+
+
+# -- rendering -------------------------------------------------------------
+
+def render_fragment(document, source, obj):
+    url = source.url(obj)
+    if document.format == 'sitemap':
+        return f"<url><loc>{escape(url)}</loc><lastmod>{obj.updated_at.date().isoformat()}</lastmod></url>"
+    if document.format == 'atom':
+        return (
+            f"<entry><title>{escape(source.title(obj))}</title><link href={quoteattr(url)}/>"
+            f"<id>{escape(url)}</id><published>{source.published(obj).isoformat()}</published>"
+            f"<updated>{obj.updated_at.isoformat()}</updated><summary>{escape(source.summary(obj))}</summary></entry>"
+        )
+    return (
+        f"<item><title>{escape(source.title(obj))}</title><link>{escape(url)}</link>"
+        f"<guid isPermaLink=\"true\">{escape(url)}</guid><pubDate>{format_datetime(source.published(obj))}</pubDate>"
+        f"<description>{escape(source.summary(obj))}</description></item>"
+    )
+
+
+def _wrap(document, fragments, last_modified):
+    site = settings.FRONTEND_URL + '/'
+    body = ''.join(fragments)
+    if document.format == 'sitemap':
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            f"<url><loc>{escape(site)}</loc></url>{body}</urlset>"
+        )
+    if document.format == 'atom':
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+            f"<title>{escape(document.title)}</title><link href={quoteattr(site)}/><id>{escape(site + document.key)}</id>"
+            f"<updated>{last_modified.isoformat()}</updated>{body}</feed>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>{escape(document.title)}</title><link>{escape(site)}</link><description>{escape(document.title)}</description>"
+        f"<lastBuildDate>{format_datetime(last_modified)}</lastBuildDate>{body}</channel></rss>"
+    )
+
+
+# -- building --------------------------------------------------------------
+
+def _store_entries(labels_to_pks):
+    """Re-render the entries of the given objects; objects that no longer exist are dropped.
+
+    `labels_to_pks` maps a source label to the pks that changed, or to None for all of them.
+    Returns the keys of the documents that show any of these objects.
+    """
+    touched = set()
+    for label, pks in labels_to_pks.items():
+        source = SOURCES[label]
+        documents = [document for document in DOCUMENTS.values() if label in document.sources]
+        objects = list(source.objects(pks))
+        entries = FeedEntry.objects.filter(source=label, document__in=[d.key for d in documents])
+        if pks is None:
+            entries.delete()
+        else:
+            entries.filter(object_id__in=set(pks) - {obj.pk for obj in objects}).delete()
+        FeedEntry.objects.bulk_create(
+            [
+                FeedEntry(
+                    document=document.key, source=label, object_id=obj.pk,
+                    fragment=render_fragment(document, source, obj),
+                    published_at=source.published(obj), updated_at=obj.updated_at,
+                )
+                for document in documents for obj in objects
+            ],
+            update_conflicts=True,
+            unique_fields=['document', 'source', 'object_id'],
+            update_fields=['fragment', 'published_at', 'updated_at'],
+        )
+        touched.update(document.key for document in documents)
+    return touched
+
+
+def assemble(key):
+    """Concatenate a document from its stored entries, save it and refresh the cached copy.
+
+    Last-Modified only moves forward: when the payload changes (an entry was
+    edited, added or deleted), it becomes now, at least one second past the
+    previous value, so that If-Modified-Since revalidations see the change.
+    """
+    document = DOCUMENTS[key]
+    entries = FeedEntry.objects.filter(document=key).order_by('-published_at', '-object_id')
+    previous = FeedDocument.objects.filter(key=key).first()
+    if previous is None:
+        last_modified = entries.aggregate(last=Max('updated_at'))['last'] or timezone.now()
+    else:
+        last_modified = previous.last_modified
+    if document.limit:
+        entries = entries[:document.limit]
+    fragments = list(entries.values_list('fragment', flat=True))
+    body = _wrap(document, fragments, last_modified).encode('utf-8')
+    if previous is not None and bytes(previous.payload) == body:
+        _cache(previous)
+        return previous
+    if previous is not None:
+        last_modified = max(timezone.now(), previous.last_modified + timedelta(seconds=1))
+        body = _wrap(document, fragments, last_modified).encode('utf-8')
+    stored, _ = FeedDocument.objects.update_or_create(key=key, defaults={
+        'payload': body,
+        'payload_gzip': gzip.compress(body),
+        'etag': hashlib.sha1(body).hexdigest(),
+        'last_modified': last_modified,
+    })
+    _cache(stored)
+    return stored
+
+
+def rebuild():
+    """Render every entry and document from scratch."""
+    with transaction.atomic():
+        _store_entries({label: None for label in SOURCES})
+        return [assemble(key) for key in DOCUMENTS]
+
+
+def refresh(changes):
+    """Re-render the (label, pk) objects in `changes` and reassemble the documents showing them."""
+    labels_to_pks = {}
+    for label, pk in changes:
+        labels_to_pks.setdefault(label, set()).add(pk)
+    with transaction.atomic():
+        for key in sorted(_store_entries(labels_to_pks)):
+            assemble(key)
+
+
+# -- reading ---------------------------------------------------------------
+
+def _cache(stored):
+    document = {
+        'payload': bytes(stored.payload),
+        'payload_gzip': bytes(stored.payload_gzip),
+        'etag': stored.etag,
+        'last_modified': stored.last_modified,
+    }
+    cache.set(f'{CACHE_PREFIX}:{stored.key}', document, timeout=settings.FEEDS_CACHE_TIMEOUT)
+    return document
+
+
+def get_document(key):
+    """Return the document as a dict (payload, payload_gzip, etag, last_modified), cache first."""
+    cached = cache.get(f'{CACHE_PREFIX}:{key}')
+    if cached is not None:
+        return cached
+    stored = FeedDocument.objects.filter(key=key).first()
+    if stored is None:
+        # first request ever: build every document at once
+        stored = next(doc for doc in rebuild() if doc.key == key)
+    return _cache(stored)
+
+
+# -- invalidation ----------------------------------------------------------
+
+def track(model):
+    """Refresh the feeds after `model` rows are saved or deleted."""
+    label = model._meta.label
+
+    def on_change(sender, instance, raw=False, **kwargs):
+        if not raw:
+            on_commit_batch(refresh, [(label, instance.pk)])
+
+    post_save.connect(on_change, sender=model, weak=False, dispatch_uid=f'feeds_save_{label}')
+    post_delete.connect(on_change, sender=model, weak=False, dispatch_uid=f'feeds_delete_{label}')
@@ -0,0 +1,81 @@
+"""Sparse fieldsets and optional expansions for read endpoints.
+
+    ?fields=id,title,slug   only these fields
+    ?expand=media,links     only these nested relations (empty: none at all)
+
+Without either parameter the full representation is returned. A nested
+relation is rendered when it is listed in `fields` or `expand`; the others are
+neither serialized nor prefetched. Write requests always get the full
+representation back.
+"""
+from rest_framework import permissions
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def _names(request, param):
+    """Names listed in a comma-separated query parameter, None when absent."""
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return None
+    raw = request.query_params.get(param)
+    if raw is None:
+        return None
+    return {name.strip() for name in raw.split(',') if name.strip()}
+
+
+def selected_relations(request, expandable):
+    """The subset of the `expandable` relation names to render for `request`."""
+    fields = _names(request, FIELDS_PARAM)
+    expand = _names(request, EXPAND_PARAM)
+    if fields is None and expand is None:
+        return set(expandable)
+    return set(expandable).intersection((fields or set()) | (expand or set()))
+
+
+class DynamicFieldsMixin:
+    """ModelSerializer mixin honouring ?fields= and ?expand=.
+
+    Nested relations are declared in `Meta.expandable_fields`. Only the root
+    serializer looks at the request: nested serializers never receive a
+    context at construction time, so they always render in full.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        fields = _names(request, FIELDS_PARAM)
+        expand = _names(request, EXPAND_PARAM)
+        if fields is None and expand is None:
+            return
+        expandable = set(getattr(self.Meta, 'expandable_fields', ()))
+        keep = selected_relations(request, expandable)
+        for name in list(self.fields):
+            if name in expandable:
+                drop = name not in keep
+            else:
+                drop = fields is not None and name not in fields
+            if drop:
+                self.fields.pop(name)
+
+
+class DynamicPrefetchMixin:
+    """ViewSet mixin trimming `prefetch_related` to the requested relations.
+
+    `prefetch_map` maps each expandable serializer field to the lookups (strings
+    or Prefetch objects) it needs, or to a callable returning them for the
+    current request; the viewset's `queryset` should not prefetch them itself.
+    """
+    prefetch_map = {}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        selected = selected_relations(self.request, self.prefetch_map)
+        lookups = []
+        for name, value in self.prefetch_map.items():
+            if name not in selected:
+                continue
+            if callable(value):
+                value = value()
+            lookups.extend(value if isinstance(value, (list, tuple)) else [value])
+        return queryset.prefetch_related(*lookups) if lookups else queryset
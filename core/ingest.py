@@ -0,0 +1,213 @@
+"""Asynchronous media ingestion.
+
+Web requests only spool uploaded files to local disk and record a
+`MediaIngestJob` per file, then answer 202. The `process_media_jobs` management
+command (the `worker` process in the Procfile) validates and normalizes each
+file, uploads it to Cloudinary and flips the target row to ready. The asset it
+replaces, if any, is queued for deletion (see core.deletion).
+
+MEDIA_INGEST_SPOOL_DIR must be a filesystem shared by the web and worker
+processes; separate dynos (as in the Procfile) each get their own disk, so
+there the spool needs a shared volume.
+"""
+import logging
+import os
+import uuid
+from datetime import timedelta
+
+import cloudinary.uploader
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image as PILImage, ImageOps
+
+from . import deletion
+from .models import MediaIngestJob, MEDIA_READY, MEDIA_FAILED
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP'}
+
+
+class IngestError(Exception):
+    """The spooled file cannot be turned into a media asset."""
+
+
+def wants_async(request):
+    """Whether the client opted into asynchronous ingestion with ?async=1."""
+    return request.query_params.get('async') in ('1', 'true', 'True')
+
+
+def spool(uploaded_file):
+    """Stream an uploaded file to the spool directory and return its path."""
+    spool_dir = settings.MEDIA_INGEST_SPOOL_DIR
+    os.makedirs(spool_dir, exist_ok=True)
+    _, ext = os.path.splitext(uploaded_file.name or '')
+    path = os.path.join(spool_dir, f'{uuid.uuid4().hex}{ext.lower()}')
+    with open(path, 'wb') as out:
+        for chunk in uploaded_file.chunks():
+            out.write(chunk)
+    return path
+
+
+def _discard(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def enqueue(targets_and_files, field_name='image'):
+    """Spool files and create one pending job per (target instance, file) pair.
+
+    Files are written to disk before the jobs are inserted; if the insert fails
+    the spooled files are removed again.
+    """
+    spooled = [(target, f, spool(f)) for target, f in targets_and_files]
+    try:
+        jobs = [
+            MediaIngestJob(
+                content_type=ContentType.objects.get_for_model(target),
+                object_id=target.pk,
+                field_name=field_name,
+                spool_path=path,
+                original_name=(f.name or '')[:255],
+            )
+            for target, f, path in spooled
+        ]
+        return MediaIngestJob.objects.bulk_create(jobs)
+    except Exception:
+        for _, _, path in spooled:
+            _discard(path)
+        raise
+
+
+def claim_jobs(limit):
+    """Atomically move up to `limit` pending jobs to processing and return them.
+
+    Each job is claimed with a conditional UPDATE, so several workers can poll the
+    same table without processing a job twice. Jobs stuck in processing (worker
+    crash) are put back in the queue after MEDIA_INGEST_STALE_AFTER seconds; that
+    counts as a failed attempt, so a job that keeps crashing the worker ends up failed.
+    """
+    now = timezone.now()
+    stale = MediaIngestJob.objects.filter(
+        status=MediaIngestJob.STATUS_PROCESSING,
+        updated_at__lt=now - timedelta(seconds=settings.MEDIA_INGEST_STALE_AFTER),
+    )
+    last_attempt = stale.filter(attempts__gte=settings.MEDIA_INGEST_MAX_ATTEMPTS - 1).select_related('content_type')
+    for job in last_attempt:
+        job.attempts += 1
+        job.status = MediaIngestJob.STATUS_FAILED
+        job.error = 'The worker stopped while processing this job.'
+        job.save(update_fields=['attempts', 'status', 'error', 'updated_at'])
+        _set_target_status(job, MEDIA_FAILED)
+        _discard(job.spool_path)
+    stale.update(status=MediaIngestJob.STATUS_PENDING, attempts=F('attempts') + 1, updated_at=now)
+
+    claimed = []
+    candidates = MediaIngestJob.objects.filter(
+        status=MediaIngestJob.STATUS_PENDING
+    ).values_list('pk', flat=True)[:limit]
+    for pk in list(candidates):
+        updated = MediaIngestJob.objects.filter(pk=pk, status=MediaIngestJob.STATUS_PENDING).update(
+            status=MediaIngestJob.STATUS_PROCESSING, updated_at=timezone.now()
+        )
+        if updated:
+            claimed.append(pk)
+    return list(MediaIngestJob.objects.filter(pk__in=claimed).select_related('content_type'))
+
+
+def prepare_image(path):
+    """Validate the spooled image and normalize it in place.
+
+    Rejects anything that is not a real JPEG/PNG/WEBP, applies the EXIF
+    orientation and downsizes images larger than MEDIA_INGEST_MAX_DIMENSION.
+    """
+    try:
+        with PILImage.open(path) as img:
+            img.verify()
+    except Exception as exc:
+        raise IngestError(f'Invalid image: {exc}')
+
+    with PILImage.open(path) as img:
+        fmt = img.format
+        if fmt not in ALLOWED_FORMATS:
+            raise IngestError(f'Unsupported image format {fmt}. Allowed: JPEG, PNG, WEBP.')
+        rotated = img.getexif().get(0x0112, 1) != 1
+        max_dimension = settings.MEDIA_INGEST_MAX_DIMENSION
+        oversized = max(img.size) > max_dimension
+        if not (rotated or oversized):
+            return
+        result = ImageOps.exif_transpose(img)
+        if oversized:
+            result.thumbnail((max_dimension, max_dimension))
+    result.save(path, format=fmt, quality=85)
+
+
+def _set_target_status(job, status):
+    model = job.content_type.model_class()
+    if any(f.name == 'status' for f in model._meta.concrete_fields):
+        model._default_manager.filter(pk=job.object_id).update(status=status)
+
+
+def process_job(job):
+    """Run one claimed job to completion or failure."""
+    try:
+        target = job.content_type.get_object_for_this_type(pk=job.object_id)
+    except Exception:
+        # The target was deleted while the job was queued.
+        job.status = MediaIngestJob.STATUS_FAILED
+        job.error = 'Target no longer exists.'
+        job.save(update_fields=['status', 'error', 'updated_at'])
+        _discard(job.spool_path)
+        return job
+
+    try:
+        prepare_image(job.spool_path)
+        resource = cloudinary.uploader.upload_resource(
+            job.spool_path, type='upload', resource_type='image', folder=settings.MEDIA_UPLOAD_FOLDER
+        )
+    except Exception as exc:
+        job.attempts += 1
+        job.error = str(exc)
+        permanent = isinstance(exc, IngestError) or job.attempts >= settings.MEDIA_INGEST_MAX_ATTEMPTS
+        job.status = MediaIngestJob.STATUS_FAILED if permanent else MediaIngestJob.STATUS_PENDING
+        job.save(update_fields=['attempts', 'error', 'status', 'updated_at'])
+        if permanent:
+            _set_target_status(job, MEDIA_FAILED)
+            _discard(job.spool_path)
+        logger.warning("Media job %s failed (attempt %s): %s", job.pk, job.attempts, exc)
+        return job
+
+    with transaction.atomic():
+        previous = deletion.public_id_of(getattr(target, job.field_name))
+        setattr(target, job.field_name, resource)
+        update_fields = [job.field_name]
+        if hasattr(target, 'status'):
+            target.status = MEDIA_READY
+            update_fields.append('status')
+        if any(f.name == 'updated_at' for f in target._meta.concrete_fields):
+            # auto_now is only applied to the fields listed: move the validators of conditional GETs
+            update_fields.append('updated_at')
+        target.save(update_fields=update_fields)
+        if previous != resource.public_id:
+            # the replaced asset goes once the new one is stored
+            deletion.schedule([previous])
+        job.status = MediaIngestJob.STATUS_READY
+        job.error = ''
+        job.save(update_fields=['status', 'error', 'updated_at'])
+    _discard(job.spool_path)
+    return job
+
+
+def job_progress(jobs):
+    """Summary of a batch of jobs, e.g. for polling several uploads at once."""
+    counts = {status: 0 for status, _ in MediaIngestJob.STATUS_CHOICES}
+    for job in jobs:
+        counts[job.status] += 1
+    total = sum(counts.values())
+    done = counts[MediaIngestJob.STATUS_READY] + counts[MediaIngestJob.STATUS_FAILED]
+    return {'total': total, **counts, 'progress': round(done / total, 2) if total else 1.0}
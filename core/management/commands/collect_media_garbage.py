@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core import deletion
+from core.models import HeroSection
+from blog.models import Image
+from projects.models import ProjectMedia
+
+# every model column holding a Cloudinary image
+MEDIA_FIELDS = (
+    (HeroSection, 'image'),
+    (ProjectMedia, 'image'),
+    (Image, 'image'),
+)
+
+
+def referenced_public_ids():
+    public_ids = set()
+    for model, field_name in MEDIA_FIELDS:
+        for row in model.objects.only('pk', field_name).iterator(chunk_size=2000):
+            public_ids.add(deletion.public_id_of(getattr(row, field_name)))
+    public_ids.discard(None)
+    return public_ids
+
+
+class Command(BaseCommand):
+    help = (
+        "List the Cloudinary images under MEDIA_UPLOAD_FOLDER that no row references anymore; "
+        "--delete destroys them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--prefix', action='append', dest='prefixes', default=None,
+            help="Only consider assets whose public id starts with this (repeatable). "
+                 "Defaults to MEDIA_UPLOAD_FOLDER; pass --prefix '' for assets uploaded outside of it.",
+        )
+        parser.add_argument('--older-than', type=float, default=24,
+                            help="Grace period in hours; younger assets may belong to an upload in flight.")
+        parser.add_argument('--delete', action='store_true',
+                            help="Delete the orphans. Without it the command only lists them.")
+
+    def handle(self, *args, **options):
+        prefixes = options['prefixes'] or [f"{settings.MEDIA_UPLOAD_FOLDER}/"]
+        cutoff = timezone.now() - timedelta(hours=options['older_than'])
+        # list the assets first: anything uploaded and attached meanwhile is then seen as referenced
+        backend = deletion.get_backend()
+        assets = {}
+        for prefix in prefixes:
+            assets.update(backend.list_resources(prefix=prefix or None))
+        referenced = referenced_public_ids()
+
+        orphans = []
+        for public_id, created_at in assets.items():
+            created = parse_datetime(created_at) if isinstance(created_at, str) else created_at
+            if public_id in referenced or (created is not None and created > cutoff):
+                continue
+            orphans.append(public_id)
+
+        for public_id in orphans:
+            self.stdout.write(public_id)
+        if not options['delete']:
+            self.stdout.write(f"{len(orphans)} orphaned assets (dry run; pass --delete to delete them).")
+            return
+        deletion.flush(orphans)
+        self.stdout.write(self.style.SUCCESS(f"{len(orphans)} orphaned assets scheduled for deletion."))
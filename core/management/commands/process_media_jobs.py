@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import deletion
+from core.ingest import claim_jobs, process_job
+
+
+class Command(BaseCommand):
+    help = ("Process spooled media uploads: validate, normalize, upload to Cloudinary and mark them ready. "
+            "Also retries pending Cloudinary deletions.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+        parser.add_argument('--batch-size', type=int, default=10, help="Jobs claimed per iteration.")
+        parser.add_argument('--interval', type=float, default=settings.MEDIA_INGEST_POLL_INTERVAL,
+                            help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            jobs = claim_jobs(options['batch_size'])
+            for job in jobs:
+                job = process_job(job)
+                self.stdout.write(f"{job.pk} {job.original_name}: {job.status}")
+            deleted = deletion.retry_due()
+            if deleted:
+                self.stdout.write(f"{deleted} Cloudinary assets deleted")
+            if jobs:
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core import feeds
+
+
+class Command(BaseCommand):
+    help = "Re-render every feed entry and rebuild the RSS/Atom feeds and the sitemap."
+
+    def handle(self, *args, **options):
+        for document in feeds.rebuild():
+            self.stdout.write(f"{document.key}: {len(document.payload)} bytes")
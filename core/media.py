@@ -0,0 +1,83 @@
+"""Cloudinary media helpers.
+
+Uploads are done before any database transaction is opened and run
+concurrently, so creating a record with several images takes roughly as long
+as the slowest upload and never holds a transaction open on network I/O.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import cloudinary.uploader
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _upload_one(file):
+    if hasattr(file, 'seekable') and file.seekable():
+        file.seek(0)
+    # Same call CloudinaryField.pre_save makes; returns a CloudinaryResource that
+    # can be assigned to the field without triggering another upload.
+    return cloudinary.uploader.upload_resource(
+        file, type='upload', resource_type='image', folder=settings.MEDIA_UPLOAD_FOLDER
+    )
+
+
+def _destroy_one(public_id):
+    try:
+        cloudinary.uploader.destroy(public_id, invalidate=True)
+    except Exception:
+        logger.warning("Could not delete Cloudinary asset %s", public_id, exc_info=True)
+
+
+def _pool(size):
+    return ThreadPoolExecutor(max_workers=max(1, min(size, settings.MEDIA_UPLOAD_WORKERS)))
+
+
+def upload_images(files):
+    """Upload `files` concurrently and return their CloudinaryResources in order.
+
+    If any upload fails, the ones that succeeded are destroyed and the first
+    error is raised.
+    """
+    files = list(files)
+    if not files:
+        return []
+    with _pool(len(files)) as pool:
+        futures = [pool.submit(_upload_one, f) for f in files]
+    resources, error = [], None
+    for future in futures:
+        try:
+            resources.append(future.result())
+        except Exception as exc:
+            error = error or exc
+    if error is not None:
+        destroy_images(resources)
+        raise error
+    return resources
+
+
+def destroy_images(resources):
+    """Best-effort concurrent deletion of uploaded CloudinaryResources."""
+    public_ids = [r.public_id for r in resources if getattr(r, 'public_id', None)]
+    if not public_ids:
+        return
+    with _pool(len(public_ids)) as pool:
+        list(pool.map(_destroy_one, public_ids))
+
+
+@contextmanager
+def upload_before_commit(files):
+    """Two-phase media commit.
+
+    Phase one uploads every file concurrently, outside of any transaction. The
+    body of the `with` block (phase two) should insert the media rows in a short
+    transaction; if it raises, the uploaded assets are destroyed.
+    """
+    resources = upload_images(files)
+    try:
+        yield resources
+    except Exception:
+        destroy_images(resources)
+        raise
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_about_hiring_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortfolioSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True)),
+                ('payload', models.BinaryField()),
+                ('payload_gzip', models.BinaryField()),
+                ('etag', models.CharField(blank=True, max_length=64)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('built_version', models.PositiveIntegerField(default=0)),
+                ('built_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_portfoliosnapshot'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='contactmessage',
+            options={'ordering': ['-created_at', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['-created_at', '-id'], name='contact_created_id_idx'),
+        ),
+    ]
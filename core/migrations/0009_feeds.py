@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_mediadeletion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True)),
+                ('payload', models.BinaryField()),
+                ('payload_gzip', models.BinaryField()),
+                ('etag', models.CharField(blank=True, max_length=64)),
+                ('last_modified', models.DateTimeField(blank=True, null=True)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document', models.CharField(max_length=50)),
+                ('source', models.CharField(max_length=50)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('fragment', models.TextField()),
+                ('published_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['document', '-published_at'], name='feedentry_document_pub_idx')],
+                'constraints': [models.UniqueConstraint(fields=('document', 'source', 'object_id'), name='feedentry_document_object_uniq')],
+            },
+        ),
+    ]
@@ -1,18 +1,36 @@
+import uuid
+
+from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.utils import timezone
 from cloudinary.models import CloudinaryField
 from cloudinary_storage.storage import RawMediaCloudinaryStorage
 
 
+# Lifecycle of uploaded media rows (ProjectMedia, blog Image). Rows created by the
+# asynchronous ingestion pipeline stay `pending` until the worker has uploaded them.
+MEDIA_PENDING = 'pending'
+MEDIA_READY = 'ready'
+MEDIA_FAILED = 'failed'
+MEDIA_STATUS_CHOICES = [
+	(MEDIA_PENDING, 'Pending'),
+	(MEDIA_READY, 'Ready'),
+	(MEDIA_FAILED, 'Failed'),
+]
+
+
 class HeroSection(models.Model):
 	headline = models.CharField(max_length=200)
 	subheadline = models.CharField(max_length=400, blank=True)
-	image = CloudinaryField('image', blank=True, null=True)  # Remplacement par CloudinaryField
+	image = CloudinaryField('image', folder=settings.MEDIA_UPLOAD_FOLDER, blank=True, null=True)  # Remplacement par CloudinaryField
 	instagram = models.URLField(blank=True)
 	linkedin = models.URLField(blank=True)
 	github = models.URLField(blank=True)
 	order = models.PositiveIntegerField(default=0)
 	is_active = models.BooleanField(default=True)
+	updated_at = models.DateTimeField(auto_now=True)
 
 	class Meta:
 		ordering = ['order']
@@ -60,5 +78,132 @@ class ContactMessage(models.Model):
 	created_at = models.DateTimeField(default=timezone.now)
 	is_read = models.BooleanField(default=False)
 
+	class Meta:
+		ordering = ['-created_at', '-id']
+		indexes = [
+			# matches the default ordering; backs keyset pagination
+			models.Index(fields=['-created_at', '-id'], name='contact_created_id_idx'),
+		]
+
 	def __str__(self):
 		return f"{self.email} - {self.subject or 'no-subject'}"
+
+
+class PortfolioSnapshot(models.Model):
+	"""Pre-serialized document holding every public section of the portfolio.
+
+	`version` is bumped whenever underlying content changes; the snapshot is
+	rebuilt lazily when `built_version` lags behind it.
+	"""
+	key = models.CharField(max_length=50, unique=True)
+	payload = models.BinaryField()
+	payload_gzip = models.BinaryField()
+	etag = models.CharField(max_length=64, blank=True)
+	version = models.PositiveIntegerField(default=1)
+	built_version = models.PositiveIntegerField(default=0)
+	built_at = models.DateTimeField(null=True, blank=True)
+
+	def __str__(self):
+		return f"Snapshot {self.key} (v{self.built_version})"
+
+	@property
+	def is_stale(self):
+		return self.built_version != self.version
+
+
+class MediaIngestJob(models.Model):
+	"""A spooled upload waiting for the `process_media_jobs` worker.
+
+	The worker validates and normalizes the file at `spool_path`, uploads it to
+	Cloudinary and stores the result in `field_name` on the target row.
+	"""
+	STATUS_PENDING = 'pending'
+	STATUS_PROCESSING = 'processing'
+	STATUS_READY = 'ready'
+	STATUS_FAILED = 'failed'
+	STATUS_CHOICES = [
+		(STATUS_PENDING, 'Pending'),
+		(STATUS_PROCESSING, 'Processing'),
+		(STATUS_READY, 'Ready'),
+		(STATUS_FAILED, 'Failed'),
+	]
+
+	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+	content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+	object_id = models.PositiveBigIntegerField()
+	target = GenericForeignKey('content_type', 'object_id')
+	field_name = models.CharField(max_length=50, default='image')
+	spool_path = models.CharField(max_length=500)
+	original_name = models.CharField(max_length=255, blank=True)
+	status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+	attempts = models.PositiveSmallIntegerField(default=0)
+	error = models.TextField(blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		ordering = ['created_at']
+		indexes = [
+			models.Index(fields=['status', 'created_at'], name='mediajob_status_created_idx'),
+		]
+
+	def __str__(self):
+		return f"{self.original_name or self.id} ({self.status})"
+
+
+class MediaDeletion(models.Model):
+	"""A Cloudinary asset whose row is gone and that still has to be destroyed.
+
+	Written after the deleting transaction commits (see core.deletion); rows left
+	behind by a failed bulk delete are retried by the `process_media_jobs` worker.
+	"""
+	public_id = models.CharField(max_length=255, unique=True)
+	resource_type = models.CharField(max_length=20, default='image')
+	attempts = models.PositiveSmallIntegerField(default=0)
+	error = models.TextField(blank=True)
+	next_attempt_at = models.DateTimeField(default=timezone.now)
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		ordering = ['next_attempt_at']
+		indexes = [
+			models.Index(fields=['next_attempt_at'], name='mediadeletion_next_idx'),
+		]
+
+	def __str__(self):
+		return self.public_id
+
+
+class FeedEntry(models.Model):
+	"""Pre-rendered XML fragment of one object in one feed or sitemap (see core.feeds)."""
+	document = models.CharField(max_length=50)
+	source = models.CharField(max_length=50)  # model label of the object
+	object_id = models.PositiveBigIntegerField()
+	fragment = models.TextField()
+	# newest first in feeds; also the entry's <lastmod> / <updated>
+	published_at = models.DateTimeField()
+	updated_at = models.DateTimeField()
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=['document', 'source', 'object_id'], name='feedentry_document_object_uniq'),
+		]
+		indexes = [
+			models.Index(fields=['document', '-published_at'], name='feedentry_document_pub_idx'),
+		]
+
+	def __str__(self):
+		return f"{self.document} #{self.object_id}"
+
+
+class FeedDocument(models.Model):
+	"""A whole feed or sitemap assembled from its entries, stored raw and gzip-compressed."""
+	key = models.CharField(max_length=50, unique=True)
+	payload = models.BinaryField()
+	payload_gzip = models.BinaryField()
+	etag = models.CharField(max_length=64, blank=True)
+	last_modified = models.DateTimeField(null=True, blank=True)
+	built_at = models.DateTimeField(auto_now=True)
+
+	def __str__(self):
+		return self.key
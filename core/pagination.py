@@ -0,0 +1,59 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Opt-in keyset (cursor) pagination.
+
+    Only used when the client asks for it with `?pagination=cursor` or follows a
+    `cursor` link, so existing clients keep their current responses. Otherwise the
+    request is handed to `fallback_class`, or left unpaginated when there is none.
+
+    `ordering` must match a composite index on the model (e.g. `-created_at, -id`)
+    so that every page, not just the first, is a bounded index range scan. A
+    client ordering (OrderingFilter's `?ordering=`) is rejected on keyset pages:
+    it would leave that index and cursors on non-unique columns are unstable.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    opt_in_query_param = 'pagination'
+    opt_in_value = 'cursor'
+    fallback_class = None
+
+    def __init__(self):
+        self.fallback = None
+
+    def is_requested(self, request):
+        params = request.query_params
+        return params.get(self.opt_in_query_param) == self.opt_in_value or self.cursor_query_param in params
+
+    def get_ordering(self, request, queryset, view):
+        for backend in getattr(view, 'filter_backends', ()):
+            param = getattr(backend, 'ordering_param', None)
+            if param and param in request.query_params:
+                raise ValidationError({param: ['Not available with cursor pagination.']})
+        return self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_requested(request):
+            return super().paginate_queryset(queryset, request, view)
+        if self.fallback_class is None:
+            return None
+        self.fallback = self.fallback_class()
+        return self.fallback.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.fallback is not None:
+            return self.fallback.to_html()
+        return super().to_html()
+
+
+class CreatedAtKeysetPagination(KeysetPagination):
+    """Newest first, for models indexed on (`created_at`, `id`)."""
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,186 @@
+"""Full-text search shared by projects and blog posts.
+
+PostgreSQL: each searchable model stores a weighted `tsvector` in
+`search_vector`, refreshed on save and indexed with GIN; queries are ranked with
+`ts_rank` and highlighted with `ts_headline`.
+
+SQLite (local development and tests): a companion FTS5 table
+`<db_table>_fts` keyed by the row id is kept in sync on save/delete; queries are
+ranked with `bm25` and highlighted with `snippet`.
+"""
+import re
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, When, Value, FloatField, CharField, F
+from rest_framework.filters import BaseFilterBackend
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_config():
+    return getattr(settings, 'FULL_TEXT_SEARCH_CONFIG', 'english')
+
+
+def _weighted_tsvector_sql(columns, config):
+    return ' || '.join(
+        f"setweight(to_tsvector('{config}', coalesce({column}, '')), '{weight}')"
+        for column, weight in columns
+    )
+
+
+def create_search_index(schema_editor, table, columns, vector_column='search_vector'):
+    """Create the backend-specific search structures for `table` and fill them.
+
+    `columns` is a sequence of (column, weight) pairs, weights being 'A'..'D'.
+    Meant to be called from a migration's RunPython.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f"UPDATE {table} SET {vector_column} = {_weighted_tsvector_sql(columns, search_config())}"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_{vector_column}_gin ON {table} USING gin ({vector_column})"
+        )
+    elif vendor == 'sqlite':
+        names = ', '.join(column for column, _ in columns)
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5("
+            f"{names}, tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(f"INSERT INTO {table}_fts (rowid, {names}) SELECT id, {names} FROM {table}")
+
+
+def drop_search_index(schema_editor, table, columns, vector_column='search_vector'):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f"DROP INDEX IF EXISTS {table}_{vector_column}_gin")
+    elif vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+
+
+class FullTextIndex:
+    """Search index over some text columns of a model.
+
+    fields: sequence of (field name, weight) pairs, most important first.
+    snippet_field: the field highlighted in `search_snippet`.
+    """
+    vector_field = 'search_vector'
+    # FTS5 results are mapped back onto the ORM queryset by id; cap how many.
+    max_sqlite_results = 500
+
+    def __init__(self, model_label, fields, snippet_field):
+        self.model_label = model_label
+        self.fields = tuple(fields)
+        self.snippet_field = snippet_field
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def fts_table(self):
+        return f'{self.model._meta.db_table}_fts'
+
+    def _columns(self):
+        return [self.model._meta.get_field(name).column for name, _ in self.fields]
+
+    # -- maintenance -------------------------------------------------------
+
+    def refresh(self, instance):
+        """Re-index one saved instance."""
+        if connection.vendor == 'postgresql':
+            from django.contrib.postgres.search import SearchVector
+
+            vector = None
+            for name, weight in self.fields:
+                part = SearchVector(name, weight=weight, config=search_config())
+                vector = part if vector is None else vector + part
+            self.model._default_manager.filter(pk=instance.pk).update(**{self.vector_field: vector})
+        elif connection.vendor == 'sqlite':
+            columns = self._columns()
+            placeholders = ', '.join(['%s'] * (len(columns) + 1))
+            values = [instance.pk] + [getattr(instance, name) or '' for name, _ in self.fields]
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {self.fts_table} WHERE rowid = %s", [instance.pk])
+                cursor.execute(
+                    f"INSERT INTO {self.fts_table} (rowid, {', '.join(columns)}) VALUES ({placeholders})",
+                    values,
+                )
+
+    def remove(self, pk):
+        """Drop a deleted row from the index (the tsvector goes with the row on PostgreSQL)."""
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {self.fts_table} WHERE rowid = %s", [pk])
+
+    # -- querying ----------------------------------------------------------
+
+    def search(self, queryset, query):
+        """Filter `queryset` to rows matching `query`, best match first.
+
+        Each row is annotated with `search_rank` (higher is better) and
+        `search_snippet` (an excerpt of `snippet_field` with matches wrapped in
+        <mark>).
+        """
+        if not _TOKEN_RE.search(query or ''):
+            return queryset
+        if connection.vendor == 'postgresql':
+            return self._search_postgresql(queryset, query)
+        return self._search_sqlite(queryset, query)
+
+    def _search_postgresql(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchHeadline
+
+        search_query = SearchQuery(query, search_type='websearch', config=search_config())
+        return queryset.filter(**{self.vector_field: search_query}).annotate(
+            search_rank=SearchRank(F(self.vector_field), search_query),
+            search_snippet=SearchHeadline(
+                self.snippet_field, search_query, config=search_config(),
+                start_sel=HIGHLIGHT_START, stop_sel=HIGHLIGHT_STOP,
+                max_words=35, min_words=15,
+            ),
+        ).order_by('-search_rank', '-pk')
+
+    def _search_sqlite(self, queryset, query):
+        # Quote every token so user input can never be parsed as FTS5 syntax.
+        match = ' '.join(f'"{token}"' for token in _TOKEN_RE.findall(query))
+        snippet_column = [name for name, _ in self.fields].index(self.snippet_field)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, bm25({self.fts_table}), "
+                f"snippet({self.fts_table}, {snippet_column}, %s, %s, '…', 24) "
+                f"FROM {self.fts_table} WHERE {self.fts_table} MATCH %s ORDER BY rank LIMIT %s",
+                [HIGHLIGHT_START, HIGHLIGHT_STOP, match, self.max_sqlite_results],
+            )
+            rows = cursor.fetchall()
+        if not rows:
+            return queryset.none()
+        # bm25() is lower-is-better; negate it so search_rank sorts like ts_rank.
+        return queryset.filter(pk__in=[pk for pk, _, _ in rows]).annotate(
+            search_rank=Case(
+                *[When(pk=pk, then=Value(-score)) for pk, score, _ in rows],
+                output_field=FloatField(),
+            ),
+            search_snippet=Case(
+                *[When(pk=pk, then=Value(snippet)) for pk, _, snippet in rows],
+                output_field=CharField(),
+            ),
+        ).order_by('-search_rank', '-pk')
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """DRF filter backend running `?search=` through the view's `search_index`."""
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        index = getattr(view, 'search_index', None)
+        query = request.query_params.get(self.search_param, '').strip()
+        if index is None or not query:
+            return queryset
+        return index.search(queryset, query)
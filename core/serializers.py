@@ -1,5 +1,27 @@
 from rest_framework import serializers
-from .models import HeroSection, About, ContactMessage
+from .models import HeroSection, About, ContactMessage, MediaIngestJob, MEDIA_READY
+
+
+class ReadyMediaListSerializer(serializers.ListSerializer):
+    """Drops media rows that the ingestion worker has not finished yet.
+
+    Filters in Python so prefetched relations are reused without extra queries.
+    """
+
+    def to_representation(self, data):
+        items = data.all() if hasattr(data, 'all') else data
+        ready = [item for item in items if getattr(item, 'status', MEDIA_READY) == MEDIA_READY]
+        return super().to_representation(ready)
+
+
+class MediaIngestJobSerializer(serializers.ModelSerializer):
+    target_type = serializers.CharField(source='content_type.model', read_only=True)
+
+    class Meta:
+        model = MediaIngestJob
+        fields = ['id', 'status', 'target_type', 'object_id', 'original_name', 'attempts', 'error',
+                  'created_at', 'updated_at']
+        read_only_fields = fields
 
 
 class HeroSectionSerializer(serializers.ModelSerializer):
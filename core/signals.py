@@ -0,0 +1,24 @@
+from django.db.models.signals import ModelSignal, post_save, post_delete
+
+from . import snapshot
+from .deletion import delete_media_on_delete
+from .models import HeroSection
+
+# Sent after bulk writes (bulk_create/bulk_update/queryset.update) that bypass
+# post_save, so caches derived from model signals can still be invalidated.
+# sender: the model class; kwargs: owner (the parent instance, when there is one),
+# plus whatever a sender documents (e.g. skill_ids from skills.services).
+bulk_changed = ModelSignal(use_caching=True)
+
+
+def invalidate_snapshot(sender, **kwargs):
+    snapshot.mark_stale()
+
+
+for _model in snapshot.SNAPSHOT_MODELS:
+    post_save.connect(invalidate_snapshot, sender=_model, dispatch_uid=f'snapshot_save_{_model}')
+    post_delete.connect(invalidate_snapshot, sender=_model, dispatch_uid=f'snapshot_delete_{_model}')
+    bulk_changed.connect(invalidate_snapshot, sender=_model, dispatch_uid=f'snapshot_bulk_{_model}')
+
+
+delete_media_on_delete(HeroSection)
@@ -0,0 +1,99 @@
+"""Public portfolio snapshot.
+
+All public sections (hero, about, skills, projects, experiences, posts) are
+serialized once with the regular API serializers and stored as raw and
+gzip-compressed JSON in a single `PortfolioSnapshot` row. Model signals only
+bump the row's version; the next read rebuilds it, so bursts of writes cost a
+single rebuild and reads are one primary-key lookup.
+"""
+import gzip
+import hashlib
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .models import PortfolioSnapshot
+
+SNAPSHOT_KEY = 'public'
+
+# Models whose changes must invalidate the snapshot.
+SNAPSHOT_MODELS = (
+    'core.HeroSection',
+    'core.About',
+    'skills.SkillReference',
+    'skills.Skill',
+    'projects.Project',
+    'projects.ProjectMedia',
+    'projects.ProjectSkillRef',
+    'projects.ProjectLink',
+    'experiences.Experience',
+    'experiences.ExperienceSkillRef',
+    'experiences.ExperienceLink',
+    'blog.Post',
+    'blog.Image',
+    'blog.Link',
+)
+
+
+def build_payload():
+    """Serialize every public section with the same serializers as the API."""
+    from .models import HeroSection, About
+    from .serializers import HeroSectionSerializer, AboutSerializer
+    from skills.models import Skill
+    from skills.serializers import SkillSerializer
+    from projects.models import Project
+    from projects.serializers import ProjectSerializer
+    from experiences.models import Experience
+    from experiences.serializers import ExperienceSerializer
+    from blog.models import Post
+    from blog.serializers import PostSerializer
+
+    about = About.objects.first()
+    return {
+        'hero': HeroSectionSerializer(HeroSection.objects.filter(is_active=True), many=True).data,
+        'about': AboutSerializer(about).data if about else None,
+        'skills': SkillSerializer(Skill.objects.select_related('reference'), many=True).data,
+        'projects': ProjectSerializer(
+            Project.objects.prefetch_related('projectskillref_set__skill_reference', 'media', 'links'),
+            many=True,
+        ).data,
+        'experiences': ExperienceSerializer(
+            Experience.objects.prefetch_related('experienceskillref_set__skill_reference', 'links'),
+            many=True,
+        ).data,
+        'posts': PostSerializer(Post.objects.prefetch_related('images', 'links'), many=True).data,
+        'generated_at': timezone.now(),
+    }
+
+
+def rebuild(key=SNAPSHOT_KEY):
+    """Serialize the portfolio and store it. Returns the up-to-date snapshot."""
+    snapshot, _ = PortfolioSnapshot.objects.get_or_create(key=key)
+    # Remember which version we are building: a write landing while we
+    # serialize bumps `version` again and leaves the snapshot stale.
+    version = snapshot.version
+    body = JSONRenderer().render(build_payload())
+    snapshot.payload = body
+    snapshot.payload_gzip = gzip.compress(body)
+    snapshot.etag = hashlib.sha1(body).hexdigest()
+    snapshot.built_version = version
+    snapshot.built_at = timezone.now()
+    snapshot.save(update_fields=['payload', 'payload_gzip', 'etag', 'built_version', 'built_at'])
+    return snapshot
+
+
+def get_snapshot(key=SNAPSHOT_KEY):
+    """Return the stored snapshot, rebuilding it first if it is missing or stale."""
+    snapshot = PortfolioSnapshot.objects.filter(key=key).first()
+    if snapshot is None or snapshot.is_stale:
+        snapshot = rebuild(key)
+    return snapshot
+
+
+def mark_stale(key=SNAPSHOT_KEY):
+    """Invalidate the snapshot once the current transaction commits."""
+    transaction.on_commit(
+        lambda: PortfolioSnapshot.objects.filter(key=key).update(version=F('version') + 1)
+    )
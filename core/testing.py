@@ -0,0 +1,57 @@
+"""Helpers shared by the API test suites."""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """Assertions guarding endpoints against N+1 query regressions."""
+
+    def assertConstantQueries(self, url, seed, sizes=(1, 10, 200)):
+        """Grow the dataset through `seed(count)` and check that GET `url` always
+        runs the same number of queries. Returns that number."""
+        counts = {}
+        total = 0
+        for size in sizes:
+            seed(size - total)
+            total = size
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            counts[size] = len(ctx.captured_queries)
+        self.assertEqual(
+            len(set(counts.values())), 1,
+            f"Query count grows with the number of rows: {counts}",
+        )
+        return counts[sizes[0]]
+
+
+class FakeCloudinaryBackend:
+    """In-memory stand-in for core.deletion.CloudinaryBackend.
+
+    State is kept on the class since the backend is instantiated per call; call
+    `reset()` in setUp. `failures` makes the next N delete calls raise.
+    """
+    assets = {}
+    delete_calls = []
+    failures = 0
+
+    @classmethod
+    def reset(cls, assets=None):
+        cls.assets = dict(assets or {})
+        cls.delete_calls = []
+        cls.failures = 0
+
+    def delete(self, public_ids, resource_type='image'):
+        cls = type(self)
+        cls.delete_calls.append(list(public_ids))
+        if cls.failures:
+            cls.failures -= 1
+            raise ConnectionError('Cloudinary unavailable')
+        for public_id in public_ids:
+            cls.assets.pop(public_id, None)
+        return set(public_ids)
+
+    def list_resources(self, prefix=None, resource_type='image'):
+        for public_id, created_at in list(type(self).assets.items()):
+            if not prefix or public_id.startswith(prefix):
+                yield public_id, created_at
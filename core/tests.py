@@ -1,3 +1,388 @@
-from django.test import TestCase
+import gzip
+import json
+import tempfile
+import time
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from PIL import Image as PILImage
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.utils.http import parse_http_date
+from datetime import timedelta
+
+from cloudinary import CloudinaryResource
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from blog.models import Post
+from projects.models import Project, ProjectMedia
+from blog.models import Image
+from .models import HeroSection, MediaIngestJob, MediaDeletion, FeedDocument, MEDIA_PENDING, MEDIA_READY, MEDIA_FAILED
+from .testing import FakeCloudinaryBackend
+from .batching import CommitBatch, on_commit_batch
+from . import checks, ingest, media, deletion, feeds
+
+
+class PortfolioSnapshotTests(APITestCase):
+    def setUp(self):
+        HeroSection.objects.create(headline='Hello')
+        Post.objects.create(title='First Post', content='Body')
+        self.url = reverse('portfolio_snapshot')
+
+    def test_snapshot_contains_public_sections(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.content)
+        for section in ('hero', 'about', 'skills', 'projects', 'experiences', 'posts'):
+            self.assertIn(section, data)
+        self.assertEqual(data['hero'][0]['headline'], 'Hello')
+        self.assertEqual([p['title'] for p in data['posts']], ['First Post'])
+
+    def test_snapshot_served_gzipped(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(data['hero'][0]['headline'], 'Hello')
+
+    def test_snapshot_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        for if_none_match in (etag, f'"other", W/{etag}', '*'):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=if_none_match)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"').status_code, status.HTTP_200_OK)
+
+    def test_snapshot_rebuilt_after_change(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(title='Second Post', content='Body')
+        data = json.loads(self.client.get(self.url).content)
+        self.assertEqual(len(data['posts']), 2)
+
+    def test_snapshot_read_is_single_query(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+
+class FeedTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Post.objects.create(title='Premier article', content='Bonjour le monde')
+        Project.objects.create(title='Portfolio', description='Site personnel')
+        self.url = reverse('feed_blog_rss')
+
+    def test_feeds_and_sitemap_served(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('application/rss+xml'))
+        self.assertIn(b'<title>Premier article</title>', response.content)
+        atom = self.client.get(reverse('feed_blog_atom'))
+        self.assertIn(b'<entry><title>Premier article</title>', atom.content)
+        sitemap = self.client.get(reverse('sitemap'))
+        self.assertIn(b'/blog/premier-article</loc>', sitemap.content)
+        self.assertIn(b'/projects/', sitemap.content)
+
+    def test_feed_served_gzipped(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'Premier article', gzip.decompress(response.content))
+
+    def test_feed_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"other", {response["ETag"]}').status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        # If-None-Match takes precedence over If-Modified-Since
+        self.assertEqual(
+            self.client.get(
+                self.url, HTTP_IF_NONE_MATCH='"other"', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            ).status_code,
+            status.HTTP_200_OK,
+        )
+
+    def test_cached_feed_read_runs_no_query(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_post_change_reassembles_only_its_documents(self):
+        self.client.get(self.url)
+        projects_built = FeedDocument.objects.get(key='projects.rss').built_at
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            Post.objects.create(title='Second article', content='Encore')
+        self.assertIn(b'Second article', self.client.get(self.url).content)
+        self.assertIn(b'Second article', self.client.get(reverse('feed_blog_atom')).content)
+        self.assertEqual(FeedDocument.objects.get(key='projects.rss').built_at, projects_built)
+
+    def test_deleted_post_leaves_feed(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            Post.objects.get(title='Premier article').delete()
+        self.assertNotIn(b'Premier article', self.client.get(self.url).content)
+
+    def test_deleting_newest_post_moves_last_modified_forward(self):
+        Post.objects.filter(title='Premier article').update(updated_at=timezone.now() - timedelta(days=2))
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            Post.objects.create(title='Second article', content='Encore')
+        before = self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            Post.objects.get(title='Second article').delete()
+        after = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=before['Last-Modified'])
+        self.assertEqual(after.status_code, status.HTTP_200_OK)
+        self.assertNotIn(b'Second article', after.content)
+        self.assertGreater(
+            FeedDocument.objects.get(key='blog.rss').last_modified.timestamp(),
+            parse_http_date(before['Last-Modified']),
+        )
+
+    def test_rebuild_feeds_command(self):
+        out = StringIO()
+        call_command('rebuild_feeds', stdout=out)
+        self.assertEqual(set(FeedDocument.objects.values_list('key', flat=True)), set(feeds.DOCUMENTS))
+        self.assertIn('sitemap.xml', out.getvalue())
+
+
+class UploadBeforeCommitTests(APITestCase):
+    def fake_upload(self, file, **options):
+        time.sleep(0.2)
+        return CloudinaryResource(public_id=file, format='jpg', version='1', type='upload', resource_type='image')
+
+    def test_uploads_run_concurrently(self):
+        files = [f'projects/img_{i}' for i in range(5)]
+        with mock.patch.object(media.cloudinary.uploader, 'upload_resource', side_effect=self.fake_upload):
+            started = time.monotonic()
+            resources = media.upload_images(files)
+            elapsed = time.monotonic() - started
+        self.assertEqual([r.public_id for r in resources], files)
+        self.assertLess(elapsed, 0.6)
+
+    def test_assets_destroyed_when_db_step_fails(self):
+        project = Project.objects.create(title='P')
+        with mock.patch.object(media.cloudinary.uploader, 'upload_resource', side_effect=self.fake_upload), \
+                mock.patch.object(media.cloudinary.uploader, 'destroy') as destroy:
+            with self.assertRaises(RuntimeError):
+                with media.upload_before_commit(['a', 'b']) as resources:
+                    ProjectMedia.objects.bulk_create([ProjectMedia(project=project, image=r) for r in resources])
+                    raise RuntimeError('db failure')
+        self.assertEqual(sorted(c.args[0] for c in destroy.call_args_list), ['a', 'b'])
+
+
+def _jpeg(name='photo.jpg', size=(40, 20)):
+    buffer = BytesIO()
+    PILImage.new('RGB', size, 'blue').save(buffer, 'jpeg')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class MediaIngestionTests(APITestCase):
+    def setUp(self):
+        self.spool_dir = tempfile.mkdtemp()
+        override = override_settings(MEDIA_INGEST_SPOOL_DIR=self.spool_dir, MEDIA_INGEST_MAX_DIMENSION=30)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = get_user_model().objects.create_user(username='tester', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(title='P')
+
+    def fake_upload(self, path, **options):
+        with PILImage.open(path) as img:
+            self.uploaded_sizes.append(img.size)
+        return CloudinaryResource(public_id='projects/x', format='jpg', version='1', type='upload', resource_type='image')
+
+    def test_async_upload_is_hidden_until_processed(self):
+        url = reverse('project-add-media', args=[self.project.id])
+        response = self.client.post(f'{url}?async=1', {'media_files': [_jpeg()]}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job_id = response.data['jobs'][0]['id']
+        self.assertEqual(ProjectMedia.objects.get().status, MEDIA_PENDING)
+        detail = self.client.get(reverse('project-detail', args=[self.project.id]))
+        self.assertEqual(detail.data['media'], [])
+
+        self.uploaded_sizes = []
+        with mock.patch('core.ingest.cloudinary.uploader.upload_resource', side_effect=self.fake_upload):
+            call_command('process_media_jobs', '--once', stdout=StringIO())
+
+        self.assertEqual(self.uploaded_sizes, [(30, 15)])
+        self.assertEqual(ProjectMedia.objects.get().status, MEDIA_READY)
+        job = self.client.get(reverse('media_job_detail', args=[job_id]))
+        self.assertEqual(job.data['status'], MediaIngestJob.STATUS_READY)
+        progress = self.client.get(reverse('media_job_list'), {'ids': job_id})
+        self.assertEqual(progress.data['progress'], 1.0)
+
+    @override_settings(MEDIA_DELETION_BACKEND='core.testing.FakeCloudinaryBackend')
+    def test_processed_job_touches_target(self):
+        FakeCloudinaryBackend.reset({'portfolio/old': None})
+        hero = HeroSection.objects.create(headline='Hello', image='portfolio/old')
+        HeroSection.objects.filter(pk=hero.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        ingest.enqueue([(hero, _jpeg())])
+        self.uploaded_sizes = []
+        upload = mock.patch('core.ingest.cloudinary.uploader.upload_resource', side_effect=self.fake_upload)
+        with upload, self.captureOnCommitCallbacks(execute=True):
+            call_command('process_media_jobs', '--once', stdout=StringIO())
+        hero.refresh_from_db()
+        self.assertEqual(hero.image.public_id, 'projects/x')
+        self.assertGreater(hero.updated_at, timezone.now() - timedelta(minutes=1))
+        # the replaced image is deleted
+        self.assertEqual(FakeCloudinaryBackend.delete_calls, [['portfolio/old']])
+
+    def test_pending_media_go_after_existing_and_skip_reorder(self):
+        shown = ProjectMedia.objects.create(project=self.project, image='projects/a')
+        url = reverse('project-add-media', args=[self.project.id])
+        self.client.post(f'{url}?async=1', {'media_files': [_jpeg()]}, format='multipart')
+        self.assertEqual(ProjectMedia.objects.get(status=MEDIA_PENDING).order, 1)
+        response = self.client.post(
+            reverse('project-reorder-media', args=[self.project.id]), {'ids': [shown.id]}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(MEDIA_INGEST_MAX_ATTEMPTS=3)
+    def test_stale_jobs_count_as_attempts(self):
+        rows = [ProjectMedia.objects.create(project=self.project, image='', status=MEDIA_PENDING) for _ in range(2)]
+        jobs = ingest.enqueue([(row, _jpeg()) for row in rows])
+        for job, attempts in zip(jobs, (0, 2)):
+            MediaIngestJob.objects.filter(pk=job.pk).update(
+                status=MediaIngestJob.STATUS_PROCESSING, attempts=attempts,
+                updated_at=timezone.now() - timedelta(days=1),
+            )
+        ingest.claim_jobs(0)
+        retried, crashed = (MediaIngestJob.objects.get(pk=job.pk) for job in jobs)
+        self.assertEqual((retried.status, retried.attempts), (MediaIngestJob.STATUS_PENDING, 1))
+        self.assertEqual((crashed.status, crashed.attempts), (MediaIngestJob.STATUS_FAILED, 3))
+        self.assertEqual(ProjectMedia.objects.get(pk=rows[1].pk).status, MEDIA_FAILED)
+
+    def test_invalid_file_fails_permanently(self):
+        media_row = ProjectMedia.objects.create(project=self.project, image='', status=MEDIA_PENDING)
+        bogus = SimpleUploadedFile('bogus.jpg', b'not an image', content_type='image/jpeg')
+        job = ingest.enqueue([(media_row, bogus)])[0]
+        call_command('process_media_jobs', '--once', stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, MediaIngestJob.STATUS_FAILED)
+
+
+class CommitBatchTests(TransactionTestCase):
+    def test_one_callback_per_transaction(self):
+        calls = []
+        try:
+            with transaction.atomic():
+                on_commit_batch(calls.append, [1])
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        with transaction.atomic():
+            on_commit_batch(calls.append, [2])
+            with transaction.atomic():
+                on_commit_batch(calls.append, [3])
+            on_commit_batch(calls.append, [4])
+        self.assertEqual(sorted(calls), [[2, 4], [3]])
+
+    def test_handler_scheduling_more_work(self):
+        calls = []
+
+        def handler(items):
+            calls.append(items)
+            if items == [1]:
+                with transaction.atomic():
+                    on_commit_batch(handler, [2])
+
+        with transaction.atomic():
+            on_commit_batch(handler, [1])
+        self.assertEqual(calls, [[1], [2]])
+
+
+@override_settings(MEDIA_DELETION_BACKEND='core.testing.FakeCloudinaryBackend', MEDIA_DELETION_BATCH_SIZE=100)
+class MediaDeletionTests(APITestCase):
+    def setUp(self):
+        self.post = Post.objects.create(title='Gallery', content='Body')
+        Image.objects.bulk_create([Image(post=self.post, image=f'blog/img_{i}') for i in range(150)])
+        FakeCloudinaryBackend.reset({f'blog/img_{i}': None for i in range(150)})
+
+    def test_cascaded_assets_deleted_in_batches_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Post.objects.all().delete()
+        self.assertEqual(FakeCloudinaryBackend.delete_calls, [])
+        self.assertEqual(
+            len([c for c in callbacks if isinstance(c, CommitBatch) and c.handler is deletion.flush]), 1
+        )
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual([len(ids) for ids in FakeCloudinaryBackend.delete_calls], [100, 50])
+        self.assertEqual(FakeCloudinaryBackend.assets, {})
+        self.assertFalse(MediaDeletion.objects.exists())
+
+    def test_failed_deletions_are_retried_by_the_worker(self):
+        FakeCloudinaryBackend.failures = 2
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.all().delete()
+        self.assertEqual(MediaDeletion.objects.filter(attempts=1).count(), 150)
+
+        # not due yet
+        call_command('process_media_jobs', '--once', stdout=StringIO())
+        self.assertEqual(MediaDeletion.objects.count(), 150)
+
+        MediaDeletion.objects.update(next_attempt_at=timezone.now())
+        call_command('process_media_jobs', '--once', stdout=StringIO())
+        self.assertFalse(MediaDeletion.objects.exists())
+        self.assertEqual(FakeCloudinaryBackend.assets, {})
+
+    def test_rolled_back_delete_keeps_assets(self):
+        from django.db import transaction
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                try:
+                    with transaction.atomic():
+                        self.post.delete()
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+        self.assertEqual(FakeCloudinaryBackend.delete_calls, [])
+        self.assertEqual(len(FakeCloudinaryBackend.assets), 150)
+
+    @override_settings(MEDIA_UPLOAD_FOLDER='blog')
+    def test_collect_media_garbage(self):
+        old = (timezone.now() - timedelta(days=2)).isoformat()
+        FakeCloudinaryBackend.assets.update({
+            'blog/orphan': old, 'blog/fresh': timezone.now().isoformat(), 'other-site/orphan': old,
+        })
+        out = StringIO()
+        call_command('collect_media_garbage', stdout=out)
+        self.assertIn('blog/orphan', out.getvalue())
+        self.assertIn('blog/orphan', FakeCloudinaryBackend.assets)
+
+        call_command('collect_media_garbage', '--delete', stdout=StringIO())
+        self.assertNotIn('blog/orphan', FakeCloudinaryBackend.assets)
+        self.assertIn('blog/fresh', FakeCloudinaryBackend.assets)
+        self.assertIn('blog/img_0', FakeCloudinaryBackend.assets)
+        # outside of the upload folder
+        self.assertIn('other-site/orphan', FakeCloudinaryBackend.assets)
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def caches(self, backend):
+        return {'default': {'BACKEND': backend, 'LOCATION': 'redis://localhost:6379/0'}}
+
+    def test_per_process_cache_fails_in_production(self):
+        with override_settings(DEBUG=False, CACHES=self.caches('django.core.cache.backends.locmem.LocMemCache')):
+            self.assertEqual([e.id for e in checks.check_shared_cache(None)], ['core.E001'])
+        with override_settings(DEBUG=True, CACHES=self.caches('django.core.cache.backends.locmem.LocMemCache')):
+            self.assertEqual(checks.check_shared_cache(None), [])
+        with override_settings(DEBUG=False, CACHES=self.caches('django.core.cache.backends.db.DatabaseCache')):
+            self.assertEqual([e.id for e in checks.check_shared_cache(None)], ['core.E001'])
+        with override_settings(DEBUG=False, CACHES=self.caches('django.core.cache.backends.redis.RedisCache')):
+            self.assertEqual(checks.check_shared_cache(None), [])
@@ -9,6 +9,8 @@ from .views import (
     ContactCreateView,
     ContactListAdminView,
     ContactDetailAdminView,
+    MediaIngestJobListView,
+    MediaIngestJobDetailView,
 )
 
 urlpatterns = [
@@ -24,4 +26,6 @@ urlpatterns = [
     path('admin/about/', AboutCreateView.as_view(), name='about_admin_create'),
     path('admin/contacts/', ContactListAdminView.as_view(), name='contact_admin_list'),
     path('admin/contacts/<int:pk>/', ContactDetailAdminView.as_view(), name='contact_admin_detail'),
+    path('admin/media-jobs/', MediaIngestJobListView.as_view(), name='media_job_list'),
+    path('admin/media-jobs/<uuid:pk>/', MediaIngestJobDetailView.as_view(), name='media_job_detail'),
 ]
@@ -1,10 +1,24 @@
-from rest_framework import generics, permissions
-from .models import HeroSection, About, ContactMessage
-from .serializers import HeroSectionSerializer, AboutSerializer, ContactMessageSerializer
+import uuid
+
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .models import HeroSection, About, ContactMessage, MediaIngestJob
+from .serializers import HeroSectionSerializer, AboutSerializer, ContactMessageSerializer, MediaIngestJobSerializer
+from . import ingest
 from .permissions import IsSuperUser
+from .pagination import CreatedAtKeysetPagination
+from . import snapshot
+from . import deletion
+from . import feeds
+from .conditional import ConditionalGetMixin, etag_matches
 
 
-class HeroListView(generics.ListAPIView):
+class HeroListView(ConditionalGetMixin, generics.ListAPIView):
     queryset = HeroSection.objects.filter(is_active=True)
     serializer_class = HeroSectionSerializer
     permission_classes = [permissions.AllowAny]
@@ -31,15 +45,55 @@ class HeroAdminDetailView(generics.RetrieveUpdateDestroyAPIView):
         # Support clearing the image from admin by passing image-clear=1 in form data
         instance = self.get_object()
         if request.data.get('image-clear') in ['1', 'true', 'True']:
-            try:
-                if instance.image:
-                    instance.image.delete(save=False)
-            except Exception:
-                pass
-            instance.image = None
-            instance.save()
+            with transaction.atomic():
+                deletion.schedule([deletion.public_id_of(instance.image)])
+                instance.image = None
+                instance.save()
+        if ingest.wants_async(request) and 'image' in request.FILES:
+            return self._update_async(request, instance, partial=kwargs.get('partial', False))
         return super().update(request, *args, **kwargs)
 
+    def _update_async(self, request, instance, partial):
+        """Save the other fields now; the new image is uploaded by the media worker."""
+        data = {key: request.data.get(key) for key in request.data if key != 'image'}
+        serializer = self.get_serializer(instance, data=data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        jobs = ingest.enqueue([(instance, request.FILES['image'])])
+        return Response(
+            {**serializer.data, 'jobs': MediaIngestJobSerializer(jobs, many=True).data},
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class MediaIngestJobDetailView(generics.RetrieveAPIView):
+    """Status of one asynchronous media upload."""
+    queryset = MediaIngestJob.objects.select_related('content_type')
+    serializer_class = MediaIngestJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+
+class MediaIngestJobListView(generics.ListAPIView):
+    """Status and overall progress of several uploads: ?ids=<uuid>,<uuid>"""
+    serializer_class = MediaIngestJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        raw_ids = [i.strip() for i in self.request.query_params.get('ids', '').split(',') if i.strip()]
+        try:
+            ids = [uuid.UUID(i) for i in raw_ids]
+        except ValueError:
+            from rest_framework.exceptions import ValidationError
+            raise ValidationError({'ids': ['Invalid job id.']})
+        return MediaIngestJob.objects.select_related('content_type').filter(pk__in=ids)
+
+    def list(self, request, *args, **kwargs):
+        jobs = list(self.get_queryset())
+        return Response({
+            **ingest.job_progress(jobs),
+            'jobs': self.get_serializer(jobs, many=True).data,
+        })
+
 
 class AboutDetailView(generics.RetrieveUpdateAPIView):
     queryset = About.objects.all()
@@ -59,7 +113,7 @@ class AboutCreateView(generics.CreateAPIView):
         serializer.save()
 
 
-class PublicAboutView(generics.RetrieveAPIView):
+class PublicAboutView(ConditionalGetMixin, generics.RetrieveAPIView):
     queryset = About.objects.all()
     serializer_class = AboutSerializer
     permission_classes = [permissions.AllowAny]
@@ -82,12 +136,64 @@ class ContactListAdminView(generics.ListAPIView):
     queryset = ContactMessage.objects.all()
     serializer_class = ContactMessageSerializer
     permission_classes = [IsSuperUser]
+    pagination_class = CreatedAtKeysetPagination
 
 
 class ContactDetailAdminView(generics.RetrieveDestroyAPIView):
     queryset = ContactMessage.objects.all()
     serializer_class = ContactMessageSerializer
     permission_classes = [IsSuperUser]
-from django.shortcuts import render
 
-# Create your views here.
+
+class PortfolioSnapshotView(APIView):
+    """Every public section of the portfolio in one pre-serialized document.
+
+    The body is served straight from the stored snapshot (gzip-compressed when the
+    client accepts it), so no serializer or content query runs on the read path.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def get(self, request, *args, **kwargs):
+        current = snapshot.get_snapshot()
+        etag = f'"{current.etag}"'
+        if etag_matches(request.headers.get('If-None-Match', ''), etag):
+            response = HttpResponse(status=304)
+        elif 'gzip' in request.headers.get('Accept-Encoding', ''):
+            response = HttpResponse(bytes(current.payload_gzip), content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(bytes(current.payload), content_type='application/json')
+        response['ETag'] = etag
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+
+class FeedDocumentView(APIView):
+    """A pre-rendered feed or sitemap (see core.feeds), served from cache."""
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    document_key = None
+
+    def get(self, request, *args, **kwargs):
+        document = feeds.DOCUMENTS[self.document_key]
+        current = feeds.get_document(self.document_key)
+        etag = f'"{current["etag"]}"'
+        last_modified = current['last_modified']
+        if_none_match = request.headers.get('If-None-Match')
+        since = parse_http_date_safe(request.headers.get('If-Modified-Since') or '')
+        if etag_matches(if_none_match, etag) if if_none_match else (
+            since is not None and last_modified is not None and int(last_modified.timestamp()) <= since
+        ):
+            response = HttpResponse(status=304)
+        elif 'gzip' in request.headers.get('Accept-Encoding', ''):
+            response = HttpResponse(current['payload_gzip'], content_type=document.content_type)
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(current['payload'], content_type=document.content_type)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0002_experiencelink'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='experience',
+            options={'ordering': ['-start_date', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['-start_date', '-id'], name='experience_start_id_idx'),
+        ),
+    ]
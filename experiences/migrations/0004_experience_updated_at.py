@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0003_keyset_ordering_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='experience',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -24,9 +24,14 @@ class Experience(models.Model):
     end_date = models.DateField(blank=True, null=True)  # Peut être vide si encore en cours
     description = models.TextField(blank=True)         # Description des missions ou réalisations
     is_current = models.BooleanField(default=False)    # Si c’est l’expérience actuelle
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ['-start_date']
+        ordering = ['-start_date', '-id']
+        indexes = [
+            # matches the default ordering; backs keyset pagination
+            models.Index(fields=['-start_date', '-id'], name='experience_start_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} @ {self.company or 'Indépendant'}"
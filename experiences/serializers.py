@@ -2,10 +2,14 @@ import json
 from django.db import transaction
 from rest_framework import serializers
 from .models import Experience, ExperienceSkillRef, ExperienceLink
+from skills.catalog import get_catalog
+from skills.serializers import SkillCatalogField
+from skills.services import attach_skills
+from core.fieldsets import DynamicFieldsMixin
 
 class ExperienceSkillRefSerializer(serializers.ModelSerializer):
-    name = serializers.CharField(source="skill_reference.name", read_only=True)
-    icon = serializers.URLField(source="skill_reference.icon", read_only=True)
+    name = SkillCatalogField("name")
+    icon = SkillCatalogField("icon")
     class Meta:
         model = ExperienceSkillRef
         fields = ("id", "experience", "skill_reference", "name", "icon")
@@ -18,7 +22,7 @@ class ExperienceLinkSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class ExperienceSerializer(serializers.ModelSerializer):
+class ExperienceSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     skills = ExperienceSkillRefSerializer(source="experienceskillref_set", many=True, read_only=True)
     skills_data = serializers.ListField(
         child=serializers.CharField(), write_only=True, required=False
@@ -32,6 +36,7 @@ class ExperienceSerializer(serializers.ModelSerializer):
         model = Experience
         fields = "__all__"
         read_only_fields = ("id",)
+        expandable_fields = ("skills", "links")
 
     def validate_skills_data(self, value):
         """
@@ -40,8 +45,6 @@ class ExperienceSerializer(serializers.ModelSerializer):
         - List of strings: ["React", "Python"] (new skill names)
         - Mixed list: [1, "New Skill"]
         """
-        from skills.models import SkillReference
-        
         if not isinstance(value, (list, tuple)):
             if isinstance(value, str):
                 try:
@@ -67,14 +70,10 @@ class ExperienceSerializer(serializers.ModelSerializer):
         if len(skill_names) != len(set(skill_names)):
             raise serializers.ValidationError("Duplicate skill names are not allowed")
 
-        # Check if all skill IDs exist
+        # Check if all skill IDs exist (one query, see skills.catalog)
         skill_ids = [s['value'] for s in skill_data if s['type'] == 'id']
         if skill_ids:
-            existing_skills = set(SkillReference.objects.filter(
-                id__in=skill_ids
-            ).values_list('id', flat=True))
-            
-            missing_skills = [sid for sid in skill_ids if sid not in existing_skills]
+            missing_skills = get_catalog().missing(skill_ids)
             if missing_skills:
                 raise serializers.ValidationError(
                     f"The following skill IDs do not exist: {', '.join(map(str, missing_skills))}"
@@ -83,32 +82,15 @@ class ExperienceSerializer(serializers.ModelSerializer):
         return skill_data
         
     def create(self, validated_data):
-        from skills.models import SkillReference
-        
         skills_data = validated_data.pop("skills_data", [])
         links_data = validated_data.pop("links_data", [])
         
         with transaction.atomic():
             experience = Experience.objects.create(**validated_data)
             
-            # Create skill references
-            for skill_item in skills_data:
-                if skill_item['type'] == 'id':
-                    # Existing skill reference
-                    ExperienceSkillRef.objects.create(
-                        experience=experience, 
-                        skill_reference_id=skill_item['value']
-                    )
-                else:
-                    # New skill reference
-                    skill_ref, created = SkillReference.objects.get_or_create(
-                        name=skill_item['value'],
-                        defaults={'icon': ''}
-                    )
-                    ExperienceSkillRef.objects.create(
-                        experience=experience,
-                        skill_reference=skill_ref
-                    )
+            # Create skill references (resolved and linked in bulk)
+            if skills_data:
+                attach_skills(experience, skills_data, ExperienceSkillRef, 'experience', created=True)
             
             # Create links
             if links_data:
@@ -118,46 +100,25 @@ class ExperienceSerializer(serializers.ModelSerializer):
             return experience
         
     def update(self, instance, validated_data):
-        from skills.models import SkillReference
-        
         skills_data = validated_data.pop("skills_data", None)
         links_data = validated_data.pop("links_data", None)
-        
-        # Update experience fields
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-        
-        # Update skills if provided
-        if skills_data is not None:
-            # Clear existing skills
-            instance.experienceskillref_set.all().delete()
-            
-            # Add new skills
-            for skill_item in skills_data:
-                if skill_item['type'] == 'id':
-                    # Existing skill reference
-                    ExperienceSkillRef.objects.create(
-                        experience=instance,
-                        skill_reference_id=skill_item['value']
-                    )
-                else:
-                    # New skill - create SkillReference first
-                    skill_ref = SkillReference.objects.create(
-                        name=skill_item['value'],
-                        icon=''  # You might want to handle this differently
-                    )
-                    ExperienceSkillRef.objects.create(
-                        experience=instance,
-                        skill_reference=skill_ref
-                    )
-                
-        # Update links if provided
-        if links_data is not None:
-            # Clear existing links
-            instance.links.all().delete()
-            # Add new links
-            for link_data in links_data:
-                ExperienceLink.objects.create(experience=instance, **link_data)
-                
+
+        with transaction.atomic():
+            # Update experience fields
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
+
+            # Update skills if provided: only the difference with the current links is written
+            if skills_data is not None:
+                attach_skills(instance, skills_data, ExperienceSkillRef, 'experience')
+
+            # Update links if provided
+            if links_data is not None:
+                # Clear existing links
+                instance.links.all().delete()
+                # Add new links
+                for link_data in links_data:
+                    ExperienceLink.objects.create(experience=instance, **link_data)
+
         return instance
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_save, post_delete
+
+from core import feeds
+from core.conditional import touch_parent_on_change
+from . import timeline
+from .models import Experience, ExperienceLink, ExperienceSkillRef
+
+
+# links and skill links have no updated_at of their own
+touch_parent_on_change(ExperienceLink, 'experience')
+# skill links are only written in bulk by skills.services
+touch_parent_on_change(ExperienceSkillRef, 'experience', per_row=False)
+
+feeds.track(Experience)
+
+
+def invalidate_timeline(sender, **kwargs):
+    timeline.invalidate()
+
+
+post_save.connect(invalidate_timeline, sender=Experience, dispatch_uid='experience_timeline_save')
+post_delete.connect(invalidate_timeline, sender=Experience, dispatch_uid='experience_timeline_delete')
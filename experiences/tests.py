@@ -1,3 +1,131 @@
-from django.test import TestCase
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.testing import QueryBudgetMixin
+from skills import catalog
+from skills.models import SkillReference
+from .models import Experience, ExperienceLink, ExperienceSkillRef
+
+
+class ExperienceTimelineTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Experience.objects.create(title='Dev', company='A', start_date=date(2021, 1, 10), end_date=date(2021, 12, 5))
+        Experience.objects.create(title='Lead', company='B', start_date=date(2023, 3, 1), is_current=True)
+        Experience.objects.create(
+            title='Stage', company='C', experience_type='internship',
+            start_date=date(2021, 6, 1), end_date=date(2021, 8, 31),
+        )
+        self.url = reverse('experience-timeline')
+
+    def get(self):
+        with mock.patch.object(timezone, 'localdate', return_value=date(2024, 2, 15)):
+            return self.client.get(self.url)
+
+    def test_grouped_by_year_and_type(self):
+        response = self.get()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        years = response.data['years']
+        self.assertEqual([year['year'] for year in years], [2023, 2021])
+        self.assertEqual([group['experience_type'] for group in years[1]['types']], ['internship', 'job'])
+        self.assertEqual(years[1]['types'][1]['experiences'][0]['title'], 'Dev')
+
+    def test_durations_and_totals(self):
+        years = self.get().data['years']
+        self.assertEqual(years[0]['types'][0]['experiences'][0]['duration_months'], 12)  # 2023-03 -> today
+        self.assertEqual(years[1]['types'][0]['experiences'][0]['duration_months'], 3)
+        totals = {total['experience_type']: total for total in self.get().data['totals']}
+        self.assertEqual(totals['job']['total_months'], 24)
+        self.assertEqual(totals['job']['count'], 2)
+        self.assertEqual(totals['internship']['total_months'], 3)
+
+    def test_single_query_then_cached(self):
+        with self.assertNumQueries(1):
+            self.get()
+        with self.assertNumQueries(0):
+            self.get()
+
+    def test_invalidated_on_change(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            Experience.objects.create(title='Freelance', experience_type='freelance', start_date=date(2022, 1, 1),
+                                      end_date=date(2022, 1, 20))
+        years = self.get().data['years']
+        self.assertEqual([year['year'] for year in years], [2023, 2022, 2021])
+
+
+class ExperienceQueryCountTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.skills = SkillReference.objects.bulk_create(
+            [SkillReference(name=f'Skill {i}', icon=f'https://example.com/{i}.svg') for i in range(3)]
+        )
+        # a warm worker: names and icons are rendered from its skill catalog
+        catalog.reload()
+
+    def seed(self, count):
+        experiences = Experience.objects.bulk_create(
+            [Experience(title=f'Experience {i}', start_date=date(2020, 1, 1)) for i in range(count)]
+        )
+        ExperienceLink.objects.bulk_create(
+            [ExperienceLink(experience=e, url='https://example.com', text='Site') for e in experiences]
+        )
+        ExperienceSkillRef.objects.bulk_create(
+            [ExperienceSkillRef(experience=e, skill_reference=s) for e in experiences for s in self.skills]
+        )
+        return experiences
+
+    def test_list_query_count_is_constant(self):
+        self.assertConstantQueries(reverse('experience-list'), self.seed)
+
+    def test_detail_query_count_is_bounded(self):
+        experience = self.seed(1)[0]
+        # 2 conditional GET validators (experience, skill references) + experience, skills, links
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('experience-detail', args=[experience.id]))
+        self.assertEqual([skill['name'] for skill in response.data['skills']], ['Skill 0', 'Skill 1', 'Skill 2'])
+        self.assertEqual(len(response.data['links']), 1)
+
+    def test_outdated_catalog_is_not_reloaded_by_reads(self):
+        experience = self.seed(1)[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            SkillReference.objects.filter(pk=self.skills[0].pk).update(name='Renamed')
+            catalog.references_changed()
+        # the same budget: the links are fetched joined to their references
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('experience-detail', args=[experience.id]))
+        self.assertEqual(response.data['skills'][0]['name'], 'Renamed')
+        self.assertNotEqual(catalog.skill_catalog.version, catalog.current_version())
+
+    def test_list_links_query_count(self):
+        experience = self.seed(1)[0]
+        self.client.force_authenticate(user=get_user_model().objects.create_user(username='u', password='pw'))
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('experience-list-links', args=[experience.id]))
+        self.assertEqual(response.data[0]['text'], 'Site')
+
+
+class ExperiencePaginationTests(APITestCase):
+    def setUp(self):
+        Experience.objects.bulk_create([
+            Experience(title=f'Experience {i}', company='Same', start_date=date(2020, 1, 1 + i)) for i in range(3)
+        ])
+        self.url = reverse('experience-list')
+
+    def test_cursor_pages_keep_the_index_order(self):
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual([e['title'] for e in response.data['results']], ['Experience 2', 'Experience 1'])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([e['title'] for e in response.data['results']], ['Experience 0'])
+
+        response = self.client.get(self.url, {'pagination': 'cursor', 'ordering': 'company'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # page-number pages still accept it
+        response = self.client.get(self.url, {'ordering': 'company'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
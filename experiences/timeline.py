@@ -0,0 +1,88 @@
+"""Experience timeline: experiences grouped by start year and type.
+
+Durations are computed by the database in the same query that reads the
+rows. An open experience (`is_current` or no `end_date`) runs until today.
+The months total per type comes from a window function, so the whole
+timeline takes one SQL query. The result is cached until an experience
+changes or the day rolls over, because open experiences grow with the date.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, DateField, F, IntegerField, Sum, Value, When, Window
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear, Greatest
+from django.utils import timezone
+
+from .models import Experience
+
+CACHE_KEY = 'experiences:timeline'
+
+ROW_FIELDS = ('id', 'title', 'company', 'location', 'start_date', 'end_date', 'is_current')
+
+
+def timeline_queryset(today):
+    """Experiences with `year`, `duration_months` and per-type `type_months` / `type_count`."""
+    end = Case(
+        When(is_current=True, then=Value(today)),
+        default=Coalesce('end_date', Value(today)),
+        output_field=DateField(),
+    )
+    # whole calendar months, both ends included: Jan -> Mar counts 3
+    months = Greatest(
+        (ExtractYear(end) - ExtractYear('start_date')) * 12
+        + ExtractMonth(end) - ExtractMonth('start_date') + 1,
+        Value(1),
+        output_field=IntegerField(),
+    )
+    return (
+        Experience.objects
+        .annotate(year=ExtractYear('start_date'), duration_months=months)
+        .annotate(
+            type_months=Window(Sum('duration_months'), partition_by=[F('experience_type')]),
+            type_count=Window(Count('id'), partition_by=[F('experience_type')]),
+        )
+        .values(*ROW_FIELDS, 'experience_type', 'year', 'duration_months', 'type_months', 'type_count')
+        .order_by('-year', 'experience_type', '-start_date', '-id')
+    )
+
+
+def build_timeline(today=None):
+    today = today or timezone.localdate()
+    labels = dict(Experience.EXPERIENCE_TYPE_CHOICES)
+    years, totals = [], {}
+    for row in timeline_queryset(today):
+        kind = row['experience_type']
+        totals[kind] = {
+            'experience_type': kind,
+            'label': labels.get(kind, kind),
+            'count': row['type_count'],
+            'total_months': row['type_months'],
+        }
+        if not years or years[-1]['year'] != row['year']:
+            years.append({'year': row['year'], 'types': []})
+        types = years[-1]['types']
+        if not types or types[-1]['experience_type'] != kind:
+            types.append({'experience_type': kind, 'label': labels.get(kind, kind), 'experiences': []})
+        types[-1]['experiences'].append(
+            {**{field: row[field] for field in ROW_FIELDS}, 'duration_months': row['duration_months']}
+        )
+    return {
+        'years': years,
+        'totals': sorted(totals.values(), key=lambda total: -total['total_months']),
+    }
+
+
+def get_timeline():
+    """The timeline for today, from cache when possible."""
+    today = timezone.localdate()
+    cached = cache.get(CACHE_KEY)
+    if cached is not None and cached['date'] == today:
+        return cached['timeline']
+    timeline = build_timeline(today)
+    cache.set(CACHE_KEY, {'date': today, 'timeline': timeline}, timeout=settings.EXPERIENCE_TIMELINE_CACHE_TIMEOUT)
+    return timeline
+
+
+def invalidate():
+    """Drop the cached timeline once the current transaction commits."""
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
@@ -2,18 +2,37 @@ from rest_framework import viewsets, permissions, filters, status
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.pagination import PageNumberPagination
 from django.shortcuts import get_object_or_404
-from .models import Experience, ExperienceLink
+from .models import Experience, ExperienceLink, ExperienceSkillRef
 from .serializers import ExperienceSerializer, ExperienceLinkSerializer
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from core.pagination import KeysetPagination
+from core.fieldsets import DynamicPrefetchMixin
+from core.conditional import ConditionalGetMixin
+from core.bulk import ReorderSerializer, get_parent_or_404, reorder, replace_children
+from skills.catalog import link_prefetch
+from . import timeline
 
-class ExperiencePagination(PageNumberPagination):
+class ExperiencePageNumberPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class ExperienceViewSet(viewsets.ModelViewSet):
+class ExperiencePagination(KeysetPagination):
+    # Page-number paging stays the default; ?pagination=cursor switches to keyset paging.
+    page_size = 10
+    ordering = ('-start_date', '-id')
+    fallback_class = ExperiencePageNumberPagination
+
+class ExperienceViewSet(ConditionalGetMixin, DynamicPrefetchMixin, viewsets.ModelViewSet):
     queryset = Experience.objects.all()
+    conditional_dependencies = ('skills.SkillReference',)
+    prefetch_map = {
+        # names and icons come from the in-process skill catalog, or from the
+        # references joined in the same query while it is cold or outdated
+        'skills': lambda: link_prefetch('experienceskillref_set', ExperienceSkillRef),
+        'links': 'links',
+    }
     serializer_class = ExperienceSerializer
     pagination_class = ExperiencePagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter, DjangoFilterBackend]
@@ -22,10 +41,15 @@ class ExperienceViewSet(viewsets.ModelViewSet):
     filterset_fields = ["is_current", "company"]
 
     def get_permissions(self):
-        if self.action in ["list", "retrieve"]:
+        if self.action in ["list", "retrieve", "timeline"]:
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated()]
 
+    @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
+    def timeline(self, request):
+        """Experiences grouped by start year and type, with durations and months per type."""
+        return Response(timeline.get_timeline())
+
     @action(detail=False, methods=['delete'], permission_classes=[permissions.IsAuthenticated])
     def delete_all(self, request):
         count, _ = Experience.objects.all().delete()
@@ -74,10 +98,30 @@ class ExperienceViewSet(viewsets.ModelViewSet):
             status=status.HTTP_204_NO_CONTENT
         )
     
+    @action(detail=True, methods=['post'], url_path='links/reorder',
+            permission_classes=[permissions.IsAuthenticated])
+    def reorder_links(self, request, pk=None):
+        """Set the display order of all links at once: {"ids": [3, 1, 2]}."""
+        experience = get_parent_or_404(self)
+        serializer = ReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        links = reorder(ExperienceLink.objects.filter(experience=experience), serializer.validated_data['ids'], owner=experience)
+        return Response(ExperienceLinkSerializer(links, many=True).data)
+
+    @action(detail=True, methods=['put'], url_path='links/replace',
+            permission_classes=[permissions.IsAuthenticated])
+    def replace_links(self, request, pk=None):
+        """Replace every link with the submitted list, kept in list order."""
+        experience = get_parent_or_404(self)
+        serializer = ExperienceLinkSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        links = replace_children(ExperienceLink, 'experience', experience, serializer.validated_data)
+        return Response(ExperienceLinkSerializer(links, many=True).data)
+
     @action(detail=True, methods=['get'], url_path='links', 
             permission_classes=[permissions.AllowAny])
     def list_links(self, request, pk=None):
-        experience = self.get_object()
-        links = experience.links.all().order_by('order')
+        experience = get_parent_or_404(self)
+        links = ExperienceLink.objects.filter(experience=experience).order_by('order')
         serializer = ExperienceLinkSerializer(links, many=True)
         return Response(serializer.data)
@@ -110,6 +110,40 @@ DATABASES = {
     )
 }
 
+# Shared cache. It holds the version tokens that tell every process to drop its copies,
+# and serves the cached documents (feeds, snapshot, posts) without touching the database,
+# so production must set an in-memory backend they all share, e.g.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and CACHE_LOCATION=redis://...
+# Per-process memory is only the development default: `check --deploy` rejects it (see core.checks).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Blog post detail cache (see blog.cache): shared cache TTL and per-process LRU size
+BLOG_POST_CACHE_TIMEOUT = config('BLOG_POST_CACHE_TIMEOUT', default=3600, cast=int)  # secondes
+BLOG_POST_CACHE_LRU_SIZE = config('BLOG_POST_CACHE_LRU_SIZE', default=128, cast=int)
+# Seconds a worker serves feeds and sitemap from cache before re-reading them (see core.feeds)
+FEEDS_CACHE_TIMEOUT = config('FEEDS_CACHE_TIMEOUT', default=300, cast=int)
+# Experience timeline cache TTL (see experiences.timeline); also dropped on every change
+EXPERIENCE_TIMELINE_CACHE_TIMEOUT = config('EXPERIENCE_TIMELINE_CACHE_TIMEOUT', default=3600, cast=int)
+# Seconds before every worker reloads its skill catalog copy, changed or not (see skills.catalog)
+SKILL_CATALOG_TIMEOUT = config('SKILL_CATALOG_TIMEOUT', default=300, cast=int)
+# Icon URL derived from a skill's id_icon by import_skill_catalog
+SKILL_ICON_URL = config('SKILL_ICON_URL', default='https://skillicons.dev/icons?i={id_icon}')
+# Neighbours stored per skill in the co-occurrence graph (see skills.graph)
+SKILL_GRAPH_NEIGHBOURS = config('SKILL_GRAPH_NEIGHBOURS', default=10, cast=int)
+# Skill autocomplete (see skills.autocomplete): default and maximum number of matches
+SKILL_AUTOCOMPLETE_LIMIT = config('SKILL_AUTOCOMPLETE_LIMIT', default=10, cast=int)
+SKILL_AUTOCOMPLETE_MAX_LIMIT = 50
+# Number of related posts precomputed per post (see blog.related)
+RELATED_POSTS_COUNT = config('RELATED_POSTS_COUNT', default=5, cast=int)
+
+# Text search configuration used for the PostgreSQL full-text indexes (see core.search)
+FULL_TEXT_SEARCH_CONFIG = config("FULL_TEXT_SEARCH_CONFIG", default="english")
+
 # Django REST Framework + Simple JWT settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -212,6 +246,24 @@ FILE_UPLOAD_HANDLERS = [
     'django.core.files.uploadhandler.TemporaryFileUploadHandler',
     'django.core.files.uploadhandler.MemoryFileUploadHandler',
 ]
+# Maximum number of concurrent Cloudinary uploads per request (see core.media).
+MEDIA_UPLOAD_WORKERS = config('MEDIA_UPLOAD_WORKERS', default=4, cast=int)
+# Cloudinary folder every upload goes to; collect_media_garbage only looks inside it by default.
+MEDIA_UPLOAD_FOLDER = config('MEDIA_UPLOAD_FOLDER', default='portfolio')
+
+# Asynchronous media ingestion (see core.ingest). Web and worker processes must share the spool dir:
+# a local path only works while they run on the same machine (separate dynos need a shared volume).
+MEDIA_INGEST_SPOOL_DIR = config('MEDIA_INGEST_SPOOL_DIR', default=os.path.join(BASE_DIR, 'var', 'media_spool'))
+MEDIA_INGEST_MAX_DIMENSION = config('MEDIA_INGEST_MAX_DIMENSION', default=2560, cast=int)
+MEDIA_INGEST_MAX_ATTEMPTS = config('MEDIA_INGEST_MAX_ATTEMPTS', default=3, cast=int)
+MEDIA_INGEST_STALE_AFTER = config('MEDIA_INGEST_STALE_AFTER', default=600, cast=int)  # secondes
+MEDIA_INGEST_POLL_INTERVAL = config('MEDIA_INGEST_POLL_INTERVAL', default=2, cast=float)  # secondes
+
+# Batched Cloudinary deletions (see core.deletion); retried by the same worker with exponential backoff.
+MEDIA_DELETION_BACKEND = config('MEDIA_DELETION_BACKEND', default='core.deletion.CloudinaryBackend')
+MEDIA_DELETION_BATCH_SIZE = config('MEDIA_DELETION_BATCH_SIZE', default=100, cast=int)  # API limit: 100
+MEDIA_DELETION_MAX_ATTEMPTS = config('MEDIA_DELETION_MAX_ATTEMPTS', default=8, cast=int)
+MEDIA_DELETION_RETRY_DELAY = config('MEDIA_DELETION_RETRY_DELAY', default=60, cast=int)  # secondes
 
 # Ensure DRF parsers include multipart/form-data for file uploads. Use setdefault to avoid
 # overwriting any existing user configuration earlier in the file.
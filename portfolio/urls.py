@@ -19,6 +19,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.views import PortfolioSnapshotView, FeedDocumentView
+
 urlpatterns = [
     path('api/users/', include('users.urls')),
     path('api/core/', include('core.urls')),
@@ -26,6 +28,11 @@ urlpatterns = [
     path('api/projects/', include('projects.urls')),
     path('api/blog/', include('blog.urls')),
     path('api/experiences/', include('experiences.urls')),
+    path('api/portfolio/snapshot/', PortfolioSnapshotView.as_view(), name='portfolio_snapshot'),
+    path('feeds/blog.rss', FeedDocumentView.as_view(document_key='blog.rss'), name='feed_blog_rss'),
+    path('feeds/blog.atom', FeedDocumentView.as_view(document_key='blog.atom'), name='feed_blog_atom'),
+    path('feeds/projects.rss', FeedDocumentView.as_view(document_key='projects.rss'), name='feed_projects_rss'),
+    path('sitemap.xml', FeedDocumentView.as_view(document_key='sitemap.xml'), name='sitemap'),
 ]
 
 if settings.DEBUG:
@@ -1,20 +1,32 @@
 import django_filters
-from .models import Project
-from skills.models import SkillReference
+from .models import Project, ProjectSkillRef
+from skills.filters import SkillReferenceMultipleFilter
+from skills.services import skill_ids_for_names, filter_by_skills
+from .search import project_search
 
 
 class ProjectFilter(django_filters.FilterSet):
+    search = django_filters.CharFilter(
+        method='filter_search',
+        label='Full-text search over title and description (ranked)'
+    )
+
     skill = django_filters.CharFilter(
-        field_name='skills__name',
-        lookup_expr='iexact',
-        label='Filter by skill name (case-insensitive)'
+        method='filter_skill_names',
+        label='Filter by skill name(s), comma-separated (case-insensitive)'
     )
-    
-    skills = django_filters.ModelMultipleChoiceFilter(
+
+    skills = SkillReferenceMultipleFilter(
         field_name='skills',
-        queryset=SkillReference.objects.all(),
+        method='filter_skills',
         label='Filter by multiple skills'
     )
+
+    skill_match = django_filters.ChoiceFilter(
+        choices=(('any', 'Any of the skills'), ('all', 'All of the skills')),
+        method='filter_noop',
+        label="How skill/skills combine: 'any' (OR) or 'all' (AND, default for skill)"
+    )
     
     created_after = django_filters.DateFilter(
         field_name='created_at',
@@ -30,8 +42,35 @@ class ProjectFilter(django_filters.FilterSet):
 
     class Meta:
         model = Project
+        # text lookups go through ?search= (the full-text index), not ILIKE scans
         fields = {
-            'title': ['icontains', 'iexact'],
-            'description': ['icontains'],
             'created_at': ['year', 'month', 'day'],
         }
+
+    def filter_search(self, queryset, name, value):
+        return project_search.search(queryset, value)
+
+    def _match_all(self, default):
+        match = self.form.cleaned_data.get('skill_match')
+        return default if not match else match == 'all'
+
+    def filter_skill_names(self, queryset, name, value):
+        names = [n for n in value.split(',') if n.strip()]
+        found = skill_ids_for_names(names)
+        match_all = self._match_all(default=True)
+        if match_all and len(found) < len({n.strip().lower() for n in names}):
+            # an unknown skill can never be matched
+            return queryset.none()
+        return filter_by_skills(queryset, ProjectSkillRef, 'project', found.values(), match_all=match_all)
+
+    def filter_skills(self, queryset, name, value):
+        if not value:
+            return queryset
+        return filter_by_skills(
+            queryset, ProjectSkillRef, 'project', value,
+            match_all=self._match_all(default=False),
+        )
+
+    def filter_noop(self, queryset, name, value):
+        # skill_match only changes how `skill` and `skills` combine
+        return queryset
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_project_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectmedia',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=20),
+        ),
+    ]
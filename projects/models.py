@@ -1,9 +1,11 @@
 from django.db import models
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
+from django.contrib.postgres.search import SearchVectorField
 from cloudinary.models import CloudinaryField
 
 from skills.models import Skill, SkillReference
+from core.models import MEDIA_STATUS_CHOICES, MEDIA_READY
 
 
 def project_media_upload_to(instance, filename):
@@ -17,6 +19,8 @@ class Project(models.Model):
 	created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="projects")
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
+	# weighted title/description tsvector maintained on save (see projects.search)
+	search_vector = SearchVectorField(null=True, editable=False)
 
 	# many-to-many relation to SkillReference via intermediate table ProjectSkillRef
 	# we reference the global SkillReference catalog; per-owner Skill entries
@@ -24,7 +28,11 @@ class Project(models.Model):
 	skills = models.ManyToManyField(SkillReference, through="ProjectSkillRef", related_name="projects", blank=True)
 
 	class Meta:
-		ordering = ["-created_at"]
+		ordering = ["-created_at", "-id"]
+		indexes = [
+			# matches the default ordering; backs keyset pagination
+			models.Index(fields=["-created_at", "-id"], name="project_created_id_idx"),
+		]
 
 	def __str__(self):
 		return self.title
@@ -32,8 +40,10 @@ class Project(models.Model):
 
 class ProjectMedia(models.Model):
 	project = models.ForeignKey(Project, related_name="media", on_delete=models.CASCADE)
-	image = CloudinaryField('image')  # Utilisation de CloudinaryField pour le stockage Cloudinary
+	image = CloudinaryField('image', folder=settings.MEDIA_UPLOAD_FOLDER)  # Utilisation de CloudinaryField pour le stockage Cloudinary
 	order = models.PositiveSmallIntegerField(default=0)
+	# pending rows have no image yet; they are hidden until the ingestion worker is done
+	status = models.CharField(max_length=20, choices=MEDIA_STATUS_CHOICES, default=MEDIA_READY)
 
 	class Meta:
 		ordering = ["order"]
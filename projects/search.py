@@ -0,0 +1,7 @@
+from core.search import FullTextIndex
+
+project_search = FullTextIndex(
+    'projects.Project',
+    fields=(('title', 'A'), ('description', 'B')),
+    snippet_field='description',
+)
@@ -1,8 +1,13 @@
 from rest_framework import serializers
 from .models import Project, ProjectMedia, ProjectSkillRef,ProjectLink
-from skills.models import Skill, SkillReference
+from skills.catalog import get_catalog
+from skills.serializers import SkillCatalogField
+from skills.services import attach_skills
+from core.media import upload_before_commit
 from django.db import transaction
 import cloudinary.uploader
+from core.serializers import ReadyMediaListSerializer
+from core.fieldsets import DynamicFieldsMixin
 from django.core.validators import URLValidator
 from django.core.exceptions import ValidationError as DjangoValidationError
 from .models import Project, ProjectMedia, ProjectSkillRef
@@ -15,6 +20,7 @@ class ProjectMediaSerializer(serializers.ModelSerializer):
         model = ProjectMedia
         fields = ("id", "image", "order", "project")
         read_only_fields = ("project",)
+        list_serializer_class = ReadyMediaListSerializer
 
     def get_image(self, obj):
         """Return a Cloudinary URL only if it looks safe. Avoid returning malformed public IDs that would
@@ -32,34 +38,14 @@ class ProjectMediaSerializer(serializers.ModelSerializer):
             return None
         
     def delete(self, instance):
-        # Delete the image from Cloudinary using public_id when available
-        try:
-            public_id = None
-            if hasattr(instance.image, 'public_id') and instance.image.public_id:
-                public_id = instance.image.public_id
-            if not public_id and isinstance(instance.image, str) and instance.image:
-                try:
-                    parts = instance.image.split('/upload/')
-                    if len(parts) > 1:
-                        tail = parts[1]
-                        tail = tail.split('/')[-1]
-                        public_id = tail.split('.')[0]
-                except Exception:
-                    public_id = None
-            if public_id:
-                try:
-                    import cloudinary.uploader
-                    cloudinary.uploader.destroy(public_id, invalidate=True)
-                except Exception:
-                    pass
-        finally:
-            instance.delete()
+        # The Cloudinary asset is destroyed in bulk once the deletion commits (see core.deletion)
+        instance.delete()
         return instance
 
 class ProjectSkillRefSerializer(serializers.ModelSerializer):
-    # On renvoie seulement les infos utiles de SkillReference
-    name = serializers.CharField(source="skill_reference.name", read_only=True)
-    icon = serializers.CharField(source="skill_reference.icon", read_only=True)
+    # On renvoie seulement les infos utiles de SkillReference (lues dans le catalogue en mémoire)
+    name = SkillCatalogField("name")
+    icon = SkillCatalogField("icon")
 
     class Meta:
         model = ProjectSkillRef
@@ -75,7 +61,7 @@ class ProjectLinkSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     media = ProjectMediaSerializer(many=True, read_only=True)
     links = ProjectLinkSerializer(many=True, read_only=True)
     media_files = serializers.ListField(
@@ -91,6 +77,9 @@ class ProjectSerializer(serializers.ModelSerializer):
     skills_list = ProjectSkillRefSerializer(source="projectskillref_set", many=True, read_only=True)
     # links data for creation/update (accepts JSON string via multipart/form-data)
     links_data = serializers.CharField(write_only=True, required=False)
+    # only present on ?search= results
+    search_rank = serializers.FloatField(read_only=True)
+    search_snippet = serializers.CharField(read_only=True)
 
     class Meta:
         model = Project
@@ -107,8 +96,11 @@ class ProjectSerializer(serializers.ModelSerializer):
             "skills_list",  # output (IDs + name + icon)
             "links",        # output (liens en lecture)
             "links_data",   # input (liens en écriture)
+            "search_rank",
+            "search_snippet",
         )
         read_only_fields = ("created_by", "created_at", "updated_at")
+        expandable_fields = ("media", "skills_list", "links")
 
 
     def validate_title(self, value):
@@ -133,8 +125,6 @@ class ProjectSerializer(serializers.ModelSerializer):
         - Comma-separated string: "1,2,3" or "React,Python"
         - Multiple fields with same name: skills=1&skills=React
         """
-        from skills.models import SkillReference
-        
         # If it's already a list, use it as is
         if not isinstance(value, (list, tuple)):
             # If it's a string, try to parse as JSON or comma-separated
@@ -166,14 +156,10 @@ class ProjectSerializer(serializers.ModelSerializer):
         if len(skill_names) != len(set(skill_names)):
             raise serializers.ValidationError("Duplicate skill names are not allowed")
 
-        # Check if all skill IDs exist
+        # Check if all skill IDs exist (one query, see skills.catalog)
         skill_ids = [s['value'] for s in skill_data if s['type'] == 'id']
         if skill_ids:
-            existing_skills = set(SkillReference.objects.filter(
-                id__in=skill_ids
-            ).values_list('id', flat=True))
-            
-            missing_skills = [sid for sid in skill_ids if sid not in existing_skills]
+            missing_skills = get_catalog().missing(skill_ids)
             if missing_skills:
                 raise serializers.ValidationError(
                     f"The following skill IDs do not exist: {', '.join(map(str, missing_skills))}"
@@ -234,37 +220,23 @@ class ProjectSerializer(serializers.ModelSerializer):
         return [sr.name for sr in obj.skills.all()]
 
     def create(self, validated_data):
-        from skills.models import SkillReference
-        
         media_files = validated_data.pop("media_files", [])
         skills_data = validated_data.pop("skills", [])
         links_data = validated_data.pop("links_data", [])
-        
-        with transaction.atomic():
+
+        # Upload every file concurrently first, then write all rows in one short transaction
+        with upload_before_commit(media_files) as media_resources, transaction.atomic():
             project = Project.objects.create(**validated_data)
-            
+
             # Handle media files
-            for media_file in media_files:
-                ProjectMedia.objects.create(project=project, image=media_file)
+            ProjectMedia.objects.bulk_create([
+                ProjectMedia(project=project, image=resource, order=i)
+                for i, resource in enumerate(media_resources)
+            ])
             
-            # Handle skills
-            for skill_item in skills_data:
-                if skill_item['type'] == 'id':
-                    # Existing skill reference
-                    ProjectSkillRef.objects.create(
-                        project=project, 
-                        skill_reference_id=skill_item['value']
-                    )
-                else:
-                    # New skill - create SkillReference first
-                    skill_ref = SkillReference.objects.create(
-                        name=skill_item['value'],
-                        icon=''  # You might want to handle this differently
-                    )
-                    ProjectSkillRef.objects.create(
-                        project=project,
-                        skill_reference=skill_ref
-                    )
+            # Handle skills (resolved and linked in bulk)
+            if skills_data:
+                attach_skills(project, skills_data, ProjectSkillRef, 'project', created=True)
             
             # Handle links
             for link_data in links_data:
@@ -277,50 +249,30 @@ class ProjectSerializer(serializers.ModelSerializer):
         skills_data = validated_data.pop("skills", None)
         links_data = validated_data.pop("links_data", None)
         
-        # Update project fields
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-        
-        # Handle media files if provided
-        if media_files is not None:
-            # Add new media without deleting existing ones. The frontend is expected to
-            # call DELETE on any media the user removed prior to submitting the form.
-            for media_file in media_files:
-                ProjectMedia.objects.create(project=instance, image=media_file)
-        
-        # Handle skills if provided
-        if skills_data is not None:
-            from skills.models import SkillReference
-            
-            # Clear existing skills
-            instance.skills.clear()
-            
-            # Add new skills
-            for skill_item in skills_data:
-                if skill_item['type'] == 'id':
-                    # Existing skill reference
-                    ProjectSkillRef.objects.create(
-                        project=instance,
-                        skill_reference_id=skill_item['value']
-                    )
-                else:
-                    # New skill - create SkillReference first
-                    skill_ref = SkillReference.objects.create(
-                        name=skill_item['value'],
-                        icon=''  # You might want to handle this differently
-                    )
-                    ProjectSkillRef.objects.create(
-                        project=instance,
-                        skill_reference=skill_ref
-                    )
-        
-        # Handle links if provided
-        if links_data is not None:
-            # Clear existing links
-            instance.links.all().delete()
-            # Add new links
-            for link_data in links_data:
-                ProjectLink.objects.create(project=instance, **link_data)
-                
+        with upload_before_commit(media_files or []) as media_resources, transaction.atomic():
+            # Update project fields
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
+
+            # Handle media files if provided
+            if media_resources:
+                # Add new media without deleting existing ones. The frontend is expected to
+                # call DELETE on any media the user removed prior to submitting the form.
+                ProjectMedia.objects.bulk_create([
+                    ProjectMedia(project=instance, image=resource) for resource in media_resources
+                ])
+
+            # Handle skills if provided: only the difference with the current links is written
+            if skills_data is not None:
+                attach_skills(instance, skills_data, ProjectSkillRef, 'project')
+
+            # Handle links if provided
+            if links_data is not None:
+                # Clear existing links
+                instance.links.all().delete()
+                # Add new links
+                for link_data in links_data:
+                    ProjectLink.objects.create(project=instance, **link_data)
+
         return instance
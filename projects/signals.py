@@ -0,0 +1,31 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.conditional import touch_parent_on_change
+from core.deletion import delete_media_on_delete
+from core import feeds
+from .models import Project, ProjectMedia, ProjectLink, ProjectSkillRef
+from .search import project_search
+
+
+@receiver(post_save, sender=Project)
+def index_project(sender, instance, raw=False, **kwargs):
+    if not raw:
+        project_search.refresh(instance)
+
+
+@receiver(post_delete, sender=Project)
+def unindex_project(sender, instance, **kwargs):
+    project_search.remove(instance.pk)
+
+
+# media, links and skill links have no updated_at of their own
+touch_parent_on_change(ProjectMedia, 'project')
+touch_parent_on_change(ProjectLink, 'project')
+# skill links are only written in bulk by skills.services
+touch_parent_on_change(ProjectSkillRef, 'project', per_row=False)
+
+# cascaded deletes included: the assets go in one bulk call after commit
+delete_media_on_delete(ProjectMedia)
+
+feeds.track(Project)
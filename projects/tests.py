@@ -3,7 +3,10 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 from django.core.files.uploadedfile import SimpleUploadedFile
-from .models import Project, ProjectMedia
+from .models import Project, ProjectMedia, ProjectLink, ProjectSkillRef
+from skills import catalog
+from skills.models import SkillReference
+from core.testing import QueryBudgetMixin
 import base64
 
 
@@ -75,3 +78,100 @@ class ProjectsAPITest(APITestCase):
 		url = reverse('project-detail', args=[self.project.id])
 		resp = self.client.delete(url)
 		self.assertIn(resp.status_code, (status.HTTP_204_NO_CONTENT, status.HTTP_200_OK))
+
+	def test_search_projects_full_text(self):
+		Project.objects.create(title='Weather dashboard', description='Charts built with React.')
+		resp = self.client.get(reverse('project-list'), {'search': 'react'})
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		self.assertEqual([p['title'] for p in resp.data], ['Weather dashboard'])
+		self.assertIn('search_rank', resp.data[0])
+
+	def test_filter_by_skills_and_or(self):
+		python, react = SkillReference.objects.bulk_create([SkillReference(name='Python'), SkillReference(name='React')])
+		both = Project.objects.create(title='Both')
+		only_python = Project.objects.create(title='Only Python')
+		ProjectSkillRef.objects.bulk_create([
+			ProjectSkillRef(project=both, skill_reference=python),
+			ProjectSkillRef(project=both, skill_reference=react),
+			ProjectSkillRef(project=only_python, skill_reference=python),
+		])
+		url = reverse('project-list')
+
+		resp = self.client.get(url, {'skill': 'python,REACT'})
+		self.assertEqual([p['title'] for p in resp.data], ['Both'])
+
+		resp = self.client.get(url, {'skill': 'python,react', 'skill_match': 'any'})
+		self.assertEqual(sorted(p['title'] for p in resp.data), ['Both', 'Only Python'])
+
+		resp = self.client.get(url, {'skills': [python.id, react.id]})
+		self.assertEqual(sorted(p['title'] for p in resp.data), ['Both', 'Only Python'])
+
+		resp = self.client.get(url, {'skill': 'python,cobol'})
+		self.assertEqual(resp.data, [])
+
+
+class ProjectsQueryCountTest(QueryBudgetMixin, APITestCase):
+	def setUp(self):
+		self.skills = SkillReference.objects.bulk_create(
+			[SkillReference(name=f'Skill {i}', icon=f'https://example.com/{i}.svg') for i in range(3)]
+		)
+		# a warm worker: names and icons are rendered from its skill catalog
+		catalog.reload()
+
+	def seed(self, count):
+		projects = Project.objects.bulk_create([Project(title=f'Project {i}') for i in range(count)])
+		ProjectMedia.objects.bulk_create(
+			[ProjectMedia(project=p, image=f'projects/sample_{p.id}_{i}', order=i) for p in projects for i in range(2)]
+		)
+		ProjectLink.objects.bulk_create(
+			[ProjectLink(project=p, url='https://example.com', text='Demo') for p in projects]
+		)
+		ProjectSkillRef.objects.bulk_create(
+			[ProjectSkillRef(project=p, skill_reference=s) for p in projects for s in self.skills]
+		)
+		return projects
+
+	def test_list_query_count_is_constant(self):
+		self.assertConstantQueries(reverse('project-list'), self.seed)
+
+	def test_detail_query_count_is_bounded(self):
+		project = self.seed(1)[0]
+		url = reverse('project-detail', args=[project.id])
+		# 2 conditional GET validators (project, skill references) + 4 to render
+		with self.assertNumQueries(6):
+			resp = self.client.get(url)
+		self.assertEqual(len(resp.data['skills_list']), 3)
+		self.assertEqual(len(resp.data['media']), 2)
+
+	def test_list_sparse_fields_skip_relations(self):
+		self.seed(3)
+		url = reverse('project-list')
+		with self.assertNumQueries(3):
+			resp = self.client.get(url, {'fields': 'id,title'})
+		self.assertEqual(set(resp.data[0]), {'id', 'title'})
+
+		with self.assertNumQueries(4):
+			resp = self.client.get(url, {'expand': 'media'})
+		self.assertIn('description', resp.data[0])
+		self.assertEqual(len(resp.data[0]['media']), 2)
+		self.assertNotIn('links', resp.data[0])
+		self.assertNotIn('skills_list', resp.data[0])
+
+	def test_conditional_get(self):
+		project = self.seed(2)[0]
+		url = reverse('project-list')
+		resp = self.client.get(url)
+		etag = resp['ETag']
+		self.assertTrue(resp.has_header('Last-Modified'))
+
+		# answered from the validator queries alone
+		with self.assertNumQueries(2):
+			resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(resp.status_code, 304)
+
+		# a new link touches its project and changes the collection ETag
+		ProjectLink.objects.create(project=project, url='https://example.com/new', text='New')
+		resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(resp.status_code, 200)
+		self.assertNotEqual(resp['ETag'], etag)
+
@@ -1,12 +1,21 @@
-from rest_framework import viewsets, status, filters, permissions
+from rest_framework import viewsets, status, permissions, serializers
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Project, ProjectMedia, ProjectSkillRef, ProjectLink
+from .models import Project, ProjectMedia, ProjectLink, ProjectSkillRef
 from .serializers import ProjectSerializer, ProjectMediaSerializer, ProjectLinkSerializer
 from .filters import ProjectFilter
+from skills.catalog import link_prefetch
 from skills.models import SkillReference
 from core.permissions import IsSuperUser
+from core.pagination import CreatedAtKeysetPagination
+from core.models import MEDIA_PENDING, MEDIA_READY
+from core.serializers import MediaIngestJobSerializer
+from core import ingest
+from core.fieldsets import DynamicPrefetchMixin
+from core.conditional import ConditionalGetMixin
+from core.bulk import ReorderSerializer, get_parent_or_404, reorder, replace_children
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 import cloudinary.uploader
 
@@ -18,25 +27,29 @@ class IsAuthenticatedForWrite(permissions.BasePermission):
         return request.user and request.user.is_authenticated
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
-    # skills is a ManyToMany to SkillReference, so prefetch the skills relation directly
-    queryset = Project.objects.all().prefetch_related('skills', 'media')
+class ProjectViewSet(ConditionalGetMixin, DynamicPrefetchMixin, viewsets.ModelViewSet):
+    queryset = Project.objects.all()
+    # skill names and icons are rendered inside each project
+    conditional_dependencies = ('skills.SkillReference',)
+    # only the requested relations, so listing N projects costs a fixed number of queries;
+    # skill links alone, or joined to their references while the skill catalog is cold
+    prefetch_map = {
+        'skills_list': lambda: link_prefetch('projectskillref_set', ProjectSkillRef),
+        'media': 'media',
+        'links': 'links',
+    }
     serializer_class = ProjectSerializer
     permission_classes = (IsAuthenticatedForWrite,)
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
-    search_fields = ['title', 'description']
+    pagination_class = CreatedAtKeysetPagination
+    # ?search= is a ranked full-text search handled by ProjectFilter
+    filter_backends = [DjangoFilterBackend]
     filterset_class = ProjectFilter
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        skill = self.request.query_params.get('skill')
-        if skill:
-            qs = qs.filter(skills__reference__name__iexact=skill)
-        return qs
-
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def add_media(self, request, pk=None):
         project = self.get_object()
+        if ingest.wants_async(request):
+            return self._add_media_async(request, project)
         serializer = ProjectMediaSerializer(data=request.data, many=True)
         if serializer.is_valid():
             media_items = []
@@ -53,6 +66,27 @@ class ProjectViewSet(viewsets.ModelViewSet):
             )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def _add_media_async(self, request, project):
+        """Spool the files, create pending media rows and let the worker upload them."""
+        files = request.FILES.getlist('media_files') or request.FILES.getlist('image')
+        if not files:
+            return Response({"media_files": ["No file was submitted."]}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            files = ProjectSerializer().validate_media_files(files)
+        except serializers.ValidationError as exc:
+            return Response({"media_files": exc.detail}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            offset = project.media.count()
+            media_items = ProjectMedia.objects.bulk_create([
+                ProjectMedia(project=project, image='', status=MEDIA_PENDING, order=offset + i)
+                for i, _ in enumerate(files)
+            ])
+            jobs = ingest.enqueue(zip(media_items, files))
+        return Response(
+            {"jobs": MediaIngestJobSerializer(jobs, many=True).data},
+            status=status.HTTP_202_ACCEPTED
+        )
+
     @action(detail=True, methods=['put', 'patch'], url_path=r'media/(?P<media_id>\\d+)',
             permission_classes=[permissions.IsAuthenticated])
     def update_media(self, request, pk=None, media_id=None):
@@ -76,6 +110,20 @@ class ProjectViewSet(viewsets.ModelViewSet):
             status=status.HTTP_204_NO_CONTENT
         )
 
+    @action(detail=True, methods=['post'], url_path='media/reorder',
+            permission_classes=[permissions.IsAuthenticated])
+    def reorder_media(self, request, pk=None):
+        """Set the display order of all media at once: {"ids": [3, 1, 2]}.
+
+        Only the media shown are listed; those still being uploaded stay after them.
+        """
+        project = get_parent_or_404(self)
+        serializer = ReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        shown = ProjectMedia.objects.filter(project=project, status=MEDIA_READY)
+        media = reorder(shown, serializer.validated_data['ids'], owner=project)
+        return Response({"ids": [m.pk for m in media]})
+
     @action(detail=True, methods=['get'], url_path='media', 
             permission_classes=[permissions.AllowAny])
     def list_media(self, request, pk=None):
@@ -119,6 +167,26 @@ class ProjectViewSet(viewsets.ModelViewSet):
         link.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=True, methods=['post'], url_path='links/reorder',
+            permission_classes=[permissions.IsAuthenticated])
+    def reorder_links(self, request, pk=None):
+        """Set the display order of all links at once: {"ids": [3, 1, 2]}."""
+        project = get_parent_or_404(self)
+        serializer = ReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        links = reorder(ProjectLink.objects.filter(project=project), serializer.validated_data['ids'], owner=project)
+        return Response(ProjectLinkSerializer(links, many=True).data)
+
+    @action(detail=True, methods=['put'], url_path='links/replace',
+            permission_classes=[permissions.IsAuthenticated])
+    def replace_links(self, request, pk=None):
+        """Replace every link with the submitted list, kept in list order."""
+        project = get_parent_or_404(self)
+        serializer = ProjectLinkSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        links = replace_children(ProjectLink, 'project', project, serializer.validated_data)
+        return Response(ProjectLinkSerializer(links, many=True).data)
+
     @action(detail=True, methods=['get'], url_path='links', 
             permission_classes=[permissions.AllowAny])
     def list_links(self, request, pk=None):
@@ -0,0 +1,132 @@
+"""In-process autocomplete over the SkillReference catalog.
+
+Each worker indexes its copy of the catalog (skills.catalog):
+- a sorted list of lowercased names, so prefix matches are a bisect away;
+- a sorted list of the names' other words ("cloud" in "Google Cloud");
+- a trigram -> ids map for fuzzy matches ("pythn" finds "Python").
+
+The index is attached to the catalog: it is rebuilt when the catalog
+reloads and updated one entry at a time when the catalog is.
+"""
+import heapq
+import threading
+from bisect import bisect_left, insort
+
+from .catalog import get_catalog, normalize, skill_catalog
+
+# fuzzy matches below this trigram similarity are dropped
+MIN_SIMILARITY = 0.3
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AutocompleteIndex:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {}  # id -> (name, icon, normalized name, number of trigrams)
+        self._names = []    # sorted (normalized name, id)
+        self._words = []    # sorted (word, id) for every word but the first
+        self._trigrams = {}
+        self.version = None
+        self.loaded = False
+
+    # -- maintenance --------------------------------------------------------
+
+    def _add(self, pk, name, icon):
+        key = normalize(name)
+        grams = trigrams(key)
+        self._entries[pk] = (name, icon, key, len(grams))
+        insort(self._names, (key, pk))
+        for word in key.split()[1:]:
+            insort(self._words, (word, pk))
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(pk)
+
+    def _remove(self, pk):
+        entry = self._entries.pop(pk, None)
+        if entry is None:
+            return
+        key = entry[2]
+        self._names.remove((key, pk))
+        for word in key.split()[1:]:
+            self._words.remove((word, pk))
+        for gram in trigrams(key):
+            ids = self._trigrams.get(gram)
+            ids.discard(pk)
+            if not ids:
+                del self._trigrams[gram]
+
+    def load(self, rows, version=None):
+        """Replace the index with `rows` of (id, name, icon)."""
+        with self._lock:
+            self._entries, self._names, self._words, self._trigrams = {}, [], [], {}
+            for pk, name, icon in rows:
+                self._add(pk, name, icon)
+            self.version = version
+            self.loaded = True
+
+    def upsert(self, pk, name, icon):
+        with self._lock:
+            self._remove(pk)
+            self._add(pk, name, icon)
+
+    def remove(self, pk):
+        with self._lock:
+            self._remove(pk)
+
+    def __len__(self):
+        return len(self._entries)
+
+    # -- search ---------------------------------------------------------------
+
+    def _prefixed(self, entries, prefix):
+        start = bisect_left(entries, (prefix,))
+        for key, pk in entries[start:]:
+            if not key.startswith(prefix):
+                return
+            yield pk
+
+    def search(self, query, limit=10):
+        """Up to `limit` (id, name, icon): exact, name prefix, word prefix, then fuzzy matches."""
+        query = normalize(query)
+        if not query or limit <= 0:
+            return []
+        with self._lock:
+            entries = self._entries
+            ranked = {}
+            for pk in self._prefixed(self._names, query):
+                ranked[pk] = (0 if entries[pk][2] == query else 1, len(entries[pk][2]))
+            for pk in self._prefixed(self._words, query):
+                ranked.setdefault(pk, (2, len(entries[pk][2])))
+            if len(ranked) < limit and len(query) > 1:
+                wanted = trigrams(query)
+                shared = {}
+                for gram in wanted:
+                    for pk in self._trigrams.get(gram, ()):
+                        shared[pk] = shared.get(pk, 0) + 1
+                for pk, count in shared.items():
+                    if pk in ranked:
+                        continue
+                    similarity = count / (len(wanted) + entries[pk][3] - count)
+                    if similarity >= MIN_SIMILARITY:
+                        ranked[pk] = (3, -similarity)
+            best = heapq.nsmallest(limit, ranked, key=lambda pk: (ranked[pk], entries[pk][2]))
+            return [(pk, entries[pk][0], entries[pk][1]) for pk in best]
+
+
+skill_index = AutocompleteIndex()
+skill_catalog.attach(skill_index)
+
+
+def get_index():
+    """This worker's index, kept in step with its catalog (see skills.catalog)."""
+    get_catalog()
+    return skill_index
+
+
+def search(query, limit=10):
+    return [{'id': pk, 'name': name, 'icon': icon} for pk, name, icon in get_index().search(query, limit)]
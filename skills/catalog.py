@@ -0,0 +1,188 @@
+"""Per-worker, versioned copy of the SkillReference catalog.
+
+Maps id -> (name, icon) and lowercased name -> id. Skill validation, skill
+filters and skill link serializers read it instead of querying
+SkillReference. The catalog is small and rarely changes.
+
+A version token in the shared cache says which catalog is current. Each
+worker compares it with the version it loaded and reloads on mismatch.
+Changes made by the worker itself are applied in place after commit, and the
+token is replaced so the other workers reload.
+
+A copy can still lag behind the database: until another worker's token
+reaches the cache, or when rows are written behind the signals' back. The
+token expires after SKILL_CATALOG_TIMEOUT seconds, which bounds how long a
+copy can serve a renamed skill. Writes never trust the copy: `missing`
+checks the ids against the database, and reloads the copy when they
+disagree. Views kept in step with the catalog (the autocomplete index) are
+`attach`ed to it.
+
+Reads do not reload a cold or outdated copy in the middle of a request:
+`link_prefetch` joins the skill links to their references instead.
+"""
+import threading
+import uuid
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+
+from .models import SkillReference
+
+VERSION_KEY = 'skills:references:version'
+
+CatalogEntry = namedtuple('CatalogEntry', 'id name icon')
+
+
+def normalize(name):
+    return ' '.join((name or '').lower().split())
+
+
+class SkillCatalog:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_id = {}
+        self._by_name = {}
+        self._views = []
+        self.version = None
+        self.loaded = False
+
+    def attach(self, view):
+        """Keep `view` (with load(rows, version), upsert(pk, name, icon), remove(pk)) in step."""
+        self._views.append(view)
+        if self.loaded:
+            view.load(self.rows(), self.version)
+
+    # -- maintenance --------------------------------------------------------
+
+    def load(self, rows, version=None):
+        rows = [tuple(row) for row in rows]
+        with self._lock:
+            self._by_id = {pk: CatalogEntry(pk, name, icon) for pk, name, icon in rows}
+            self._by_name = {}
+            for pk, name, _icon in rows:
+                self._by_name.setdefault(normalize(name), pk)
+            self.version = version
+            self.loaded = True
+            for view in self._views:
+                view.load(rows, version)
+
+    def upsert(self, pk, name, icon):
+        with self._lock:
+            self._discard(pk)
+            self._by_id[pk] = CatalogEntry(pk, name, icon)
+            self._by_name.setdefault(normalize(name), pk)
+            for view in self._views:
+                view.upsert(pk, name, icon)
+
+    def remove(self, pk):
+        with self._lock:
+            self._discard(pk)
+            for view in self._views:
+                view.remove(pk)
+
+    def _discard(self, pk):
+        entry = self._by_id.pop(pk, None)
+        if entry is not None and self._by_name.get(normalize(entry.name)) == pk:
+            del self._by_name[normalize(entry.name)]
+
+    def rows(self):
+        with self._lock:
+            return [tuple(entry) for entry in self._by_id.values()]
+
+    def __len__(self):
+        return len(self._by_id)
+
+    # -- lookups --------------------------------------------------------------
+
+    def get(self, pk):
+        return self._by_id.get(pk)
+
+    def id_for_name(self, name):
+        return self._by_name.get(normalize(name))
+
+    def missing(self, ids):
+        """The ids among `ids` that do not exist, read from the database (one indexed query).
+
+        For writes: this copy may not know yet that another worker deleted a
+        reference. It is reloaded when it disagrees with the database.
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return []
+        found = set(SkillReference.objects.filter(pk__in=ids).values_list('pk', flat=True))
+        if any((pk in found) != (pk in self._by_id) for pk in ids):
+            reload()
+        return [pk for pk in ids if pk not in found]
+
+    def entry(self, pk):
+        """The entry for an id known to exist (e.g. a skill link's), reloading once if this copy is behind."""
+        entry = self._by_id.get(pk)
+        if entry is None:
+            entry = reload().get(pk)
+        return entry
+
+
+skill_catalog = SkillCatalog()
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=settings.SKILL_CATALOG_TIMEOUT)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def reload():
+    skill_catalog.load(SkillReference.objects.values_list('pk', 'name', 'icon'), current_version())
+    return skill_catalog
+
+
+def get_catalog():
+    """This worker's catalog, (re)loaded when missing or outdated by another worker."""
+    if not skill_catalog.loaded or skill_catalog.version != current_version():
+        reload()
+    return skill_catalog
+
+
+def link_prefetch(lookup, link_model):
+    """Prefetch for the skill links at `lookup` (rows of `link_model`) of a read.
+
+    With a current copy the bare link rows are enough. Otherwise the links are
+    fetched joined to their references, still one query, and the serializers
+    render those (see SkillCatalogField).
+    """
+    if skill_catalog.loaded and skill_catalog.version == current_version():
+        return lookup
+    return Prefetch(lookup, queryset=link_model.objects.select_related('skill_reference'))
+
+
+def _publish(apply=None):
+    """After commit: apply the change to this worker's catalog and tell the others to reload."""
+    def on_commit():
+        previous = cache.get(VERSION_KEY)
+        version = uuid.uuid4().hex
+        cache.set(VERSION_KEY, version, timeout=settings.SKILL_CATALOG_TIMEOUT)
+        with skill_catalog._lock:
+            # a copy that missed another worker's change reloads instead
+            if apply is not None and skill_catalog.loaded and skill_catalog.version == previous:
+                apply()
+                skill_catalog.version = version
+    transaction.on_commit(on_commit)
+
+
+def reference_saved(reference):
+    _publish(lambda: skill_catalog.upsert(reference.pk, reference.name, reference.icon))
+
+
+def reference_deleted(pk):
+    _publish(lambda: skill_catalog.remove(pk))
+
+
+def references_changed():
+    """Bulk writes: this worker reloads on its next read too."""
+    _publish()
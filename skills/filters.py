@@ -0,0 +1,95 @@
+import django_filters
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.filters import OrderingFilter
+
+from .catalog import get_catalog
+from .models import SkillUsageStats
+
+
+class SkillUsageStatsFilter(django_filters.FilterSet):
+    min_count = django_filters.NumberFilter(
+        field_name='total_count',
+        lookup_expr='gte',
+        label='Used at least this many times'
+    )
+
+    used_in = django_filters.ChoiceFilter(
+        choices=(('projects', 'Projects'), ('experiences', 'Experiences')),
+        method='filter_used_in',
+        label="Only skills used in 'projects' or 'experiences'"
+    )
+
+    used_since = django_filters.DateFilter(
+        method='filter_used_since',
+        label='Last used on or after this date (YYYY-MM-DD)'
+    )
+
+    class Meta:
+        model = SkillUsageStats
+        fields = ['is_current']
+
+    def filter_used_in(self, queryset, name, value):
+        return queryset.filter(**{f"{value[:-1]}_count__gt": 0})
+
+    def filter_used_since(self, queryset, name, value):
+        # current skills are used until today, whatever their stored last_used
+        used = Q(last_used__gte=value)
+        if value <= timezone.localdate():
+            used |= Q(is_current=True)
+        return queryset.filter(used)
+
+
+class SkillUsageOrderingFilter(OrderingFilter):
+    """OrderingFilter where `last_used` ranks current skills (used until today) as the most recent."""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        expanded = []
+        for field in ordering:
+            if field.lstrip('-') == 'last_used':
+                expanded.append(field.replace('last_used', 'is_current'))
+            expanded.append(field)
+        return expanded
+
+
+class SkillReferenceMultipleField(forms.TypedMultipleChoiceField):
+    """Skill reference ids, validated against the in-process catalog (no query).
+
+    Only reads use it, so the copy is trusted; writes check their ids against
+    the database (`SkillCatalog.missing`).
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('coerce', int)
+        super().__init__(*args, **kwargs)
+
+    def validate(self, value):
+        if self.required and not value:
+            raise ValidationError(self.error_messages['required'], code='required')
+        ids = []
+        for val in value:
+            try:
+                ids.append(int(val))
+            except (TypeError, ValueError):
+                raise ValidationError(
+                    self.error_messages['invalid_choice'], code='invalid_choice', params={'value': val}
+                )
+        catalog = get_catalog()
+        for pk in ids:
+            if catalog.get(pk) is None:
+                raise ValidationError(
+                    self.error_messages['invalid_choice'], code='invalid_choice', params={'value': pk}
+                )
+
+
+class SkillReferenceMultipleFilter(django_filters.MultipleChoiceFilter):
+    """Like ModelMultipleChoiceFilter over SkillReference, without querying the table.
+
+    The filter method receives the ids.
+    """
+    field_class = SkillReferenceMultipleField
@@ -0,0 +1,144 @@
+"""Skills used together: a co-occurrence graph over projects and experiences.
+
+Projects and experiences are the rows and skills the columns of a sparse 0/1
+incidence matrix A, given as the (owner, skill) index arrays of the skill
+links. The co-occurrence counts are the off-diagonal entries of AᵀA. They
+are computed with NumPy by pairing every link with the other links of its
+owner, then counting identical (skill, skill) pairs. The diagonal is the
+number of uses of each skill. Nothing bigger than the number of pairs is
+ever allocated.
+
+Only the top SKILL_GRAPH_NEIGHBOURS neighbours of each skill are stored
+(`SkillNeighbour`), ranked by count. A row only depends on the owners using
+its skill. After links change, only the rows of the skills of the owners
+involved are recomputed, from the links of the owners sharing one of those
+skills. `rebuild_skill_graph` recomputes everything.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from core.batching import on_commit_batch
+from experiences.models import ExperienceSkillRef
+from projects.models import ProjectSkillRef
+
+from .models import SkillNeighbour
+
+# through model -> owner field; owners of both kinds share one row index
+OWNERS = ((ProjectSkillRef, 'project'), (ExperienceSkillRef, 'experience'))
+
+
+def _links(skill_ids=None):
+    """(owner, skill) index arrays of the links of the owners using one of `skill_ids` (None: all)."""
+    owners, skills = [], []
+    for kind, (through_model, owner_field) in enumerate(OWNERS):
+        links = through_model.objects.all()
+        if skill_ids is not None:
+            users = through_model.objects.filter(skill_reference_id__in=skill_ids).values(owner_field)
+            links = links.filter(**{f'{owner_field}__in': users})
+        for owner_id, skill_id in links.order_by().values_list(f'{owner_field}_id', 'skill_reference_id'):
+            owners.append(owner_id * len(OWNERS) + kind)
+            skills.append(skill_id)
+    return np.array(owners, dtype=np.int64), np.array(skills, dtype=np.int64)
+
+
+def cooccurrence(owners, skills, rows=None):
+    """Sparse AᵀA for the incidence matrix given by `owners` and `skills`.
+
+    Returns (left, right, count) arrays, one entry per pair of distinct skills
+    used together, restricted to `left` in `rows` when given, and a
+    {skill: number of uses} dict (exact for the skills whose owners are all
+    included).
+    """
+    empty = np.array([], dtype=np.int64)
+    if not len(owners):
+        return empty, empty, empty, {}
+    order = np.lexsort((skills, owners))
+    owners, skills = owners[order], skills[order]
+    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+    sizes = np.diff(np.r_[starts, len(owners)])
+    # every link is paired with each link of its owner, itself included
+    fanout = np.repeat(sizes, sizes)
+    first = np.repeat(starts, sizes)
+    left = np.repeat(skills, fanout)
+    offsets = np.arange(len(left)) - np.repeat(np.cumsum(fanout) - fanout, fanout)
+    right = skills[np.repeat(first, fanout) + offsets]
+
+    used, uses = np.unique(skills, return_counts=True)
+    keep = left != right
+    if rows is not None:
+        keep &= np.isin(left, np.fromiter(rows, dtype=np.int64))
+    width = int(skills.max()) + 1
+    keys, counts = np.unique(left[keep] * width + right[keep], return_counts=True)
+    return keys // width, keys % width, counts, dict(zip(used.tolist(), uses.tolist()))
+
+
+def top_neighbours(left, right, counts, uses, k):
+    """{skill: [(neighbour, count, score)]}, best first: highest count, then lowest id."""
+    order = np.lexsort((right, -counts, left))
+    left, right, counts = left[order], right[order], counts[order]
+    starts = np.flatnonzero(np.r_[True, left[1:] != left[:-1]]) if len(left) else np.array([], dtype=np.int64)
+    rank = np.arange(len(left)) - np.repeat(starts, np.diff(np.r_[starts, len(left)]))
+    neighbours = {}
+    for skill, neighbour, count in zip(*(column[rank < k].tolist() for column in (left, right, counts))):
+        neighbours.setdefault(skill, []).append((neighbour, count, count / uses[skill]))
+    return neighbours
+
+
+def compute(skill_ids=None):
+    """Top neighbours of `skill_ids` (None: every skill); unused skills are absent."""
+    owners, skills = _links(skill_ids)
+    left, right, counts, uses = cooccurrence(owners, skills, rows=skill_ids)
+    return top_neighbours(left, right, counts, uses, settings.SKILL_GRAPH_NEIGHBOURS)
+
+
+def _write_rows(skill_ids, neighbours):
+    with transaction.atomic():
+        stale = SkillNeighbour.objects.all()
+        if skill_ids is not None:
+            stale = stale.filter(skill_id__in=skill_ids)
+        stale.delete()
+        SkillNeighbour.objects.bulk_create([
+            SkillNeighbour(skill_id=skill_id, neighbour_id=neighbour_id, rank=rank, count=count, score=score)
+            for skill_id, rows in neighbours.items()
+            for rank, (neighbour_id, count, score) in enumerate(rows)
+        ])
+
+
+def rebuild():
+    """Recompute the whole graph. Returns the number of skills with neighbours."""
+    neighbours = compute()
+    _write_rows(None, neighbours)
+    return len(neighbours)
+
+
+def refresh(skill_ids):
+    """Recompute the rows of `skill_ids`, e.g. every skill of an owner whose links changed."""
+    skill_ids = set(skill_ids)
+    if not skill_ids:
+        return 0
+    neighbours = compute(skill_ids)
+    _write_rows(skill_ids, neighbours)
+    return len(neighbours)
+
+
+def _refresh_batch(items):
+    skill_ids = set()
+    owners = [set() for _ in OWNERS]
+    for kind, owner_id, skills in items:
+        skill_ids.update(skills)
+        owners[kind].add(owner_id)
+    for (through_model, owner_field), owner_ids in zip(OWNERS, owners):
+        if owner_ids:
+            # the owners' current skills; the removed ones come in `skills`
+            skill_ids.update(
+                through_model.objects.filter(**{f'{owner_field}_id__in': owner_ids})
+                .values_list('skill_reference_id', flat=True)
+            )
+    refresh(skill_ids)
+
+
+def schedule_refresh(through_model, owner_id, skill_ids=()):
+    """After commit, refresh the skills of an owner whose links changed, plus `skill_ids`."""
+    kind = [model for model, _ in OWNERS].index(through_model)
+    on_commit_batch(_refresh_batch, [(kind, owner_id, tuple(skill_ids))])
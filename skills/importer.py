@@ -0,0 +1,158 @@
+"""Streaming import of SkillReference rows (see the import_skill_catalog command).
+
+Readers yield one dict per entry from CSV, JSON (a top-level array) or NDJSON
+without loading the file. `import_rows` upserts them in batches. A batch is
+de-duplicated case-insensitively, both within itself and against the
+catalog's existing names, so "react" updates an existing "React" instead of
+adding a second skill.
+"""
+import csv
+import json
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from core.signals import bulk_changed
+
+from . import stats
+from .models import SkillReference
+
+FORMATS = ('csv', 'json', 'ndjson')
+
+_NAME_MAX = SkillReference._meta.get_field('name').max_length
+_ID_ICON_MAX = SkillReference._meta.get_field('id_icon').max_length
+
+
+def detect_format(path):
+    suffix = path.rsplit('.', 1)[-1].lower()
+    if suffix in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    return suffix if suffix in FORMATS else None
+
+
+def read_csv(fp):
+    yield from csv.DictReader(fp)
+
+
+def read_ndjson(fp):
+    for line in fp:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def read_json(fp, chunk_size=64 * 1024):
+    """Yield the items of a top-level JSON array, holding one chunk and one item at a time."""
+    decoder = json.JSONDecoder()
+    buffer, pos, started, eof = '', 0, False, False
+    while True:
+        # skip whitespace and separators up to the next value
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = fp.read(chunk_size), 0
+            eof = not buffer
+        if pos >= len(buffer):
+            raise ValueError("Unexpected end of JSON input.")
+        if not started:
+            if buffer[pos] != '[':
+                raise ValueError("Expected a JSON array of skills.")
+            started, pos = True, pos + 1
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # the item runs past the end of the buffer: read on
+            more = fp.read(chunk_size)
+            eof = not more
+            buffer, pos = buffer[pos:] + more, 0
+            continue
+        if end == len(buffer) and not eof:
+            # a number could go on in the next chunk
+            more = fp.read(chunk_size)
+            if more:
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            eof = True
+        yield item
+        pos = end
+
+
+READERS = {'csv': read_csv, 'json': read_json, 'ndjson': read_ndjson}
+
+
+def clean(row):
+    """(name, id_icon, icon) for a raw entry, or None when it has no usable name."""
+    if not isinstance(row, dict):
+        return None
+    name = ' '.join(str(row.get('name') or '').split())
+    if not name or len(name) > _NAME_MAX:
+        return None
+    id_icon = str(row.get('id_icon') or '').strip()[:_ID_ICON_MAX] or None
+    icon = str(row.get('icon') or '').strip() or None
+    if icon is None and id_icon:
+        icon = settings.SKILL_ICON_URL.format(id_icon=id_icon)
+    return name, id_icon, icon
+
+
+def _upsert(batch):
+    """Write one batch of {lowercased name: (name, id_icon, icon)}."""
+    existing = dict(
+        SkillReference.objects.annotate(lname=Lower('name')).filter(lname__in=list(batch)).values_list('lname', 'name')
+    )
+    with_icon, without_icon = [], []
+    for lname, (name, id_icon, icon) in batch.items():
+        # the stored spelling is the conflict key
+        reference = SkillReference(name=existing.get(lname, name), id_icon=id_icon, icon=icon)
+        (with_icon if id_icon or icon else without_icon).append(reference)
+    with transaction.atomic():
+        if with_icon:
+            SkillReference.objects.bulk_create(
+                with_icon, update_conflicts=True, unique_fields=['name'],
+                update_fields=['id_icon', 'icon', 'updated_at'],
+            )
+        if without_icon:
+            # nothing to update: keep the icons already known
+            SkillReference.objects.bulk_create(without_icon, ignore_conflicts=True)
+
+
+def import_rows(rows, batch_size=1000, progress=None):
+    """Upsert `rows` (raw dicts) in batches. Returns (imported, skipped, seconds).
+
+    `progress(imported, seconds)` is called after every batch.
+    """
+    started = time.monotonic()
+    imported = skipped = 0
+    batch = {}
+    try:
+        for row in rows:
+            cleaned = clean(row)
+            if cleaned is None:
+                skipped += 1
+                continue
+            # later duplicates win
+            batch[cleaned[0].lower()] = cleaned
+            if len(batch) >= batch_size:
+                _upsert(batch)
+                imported += len(batch)
+                batch = {}
+                if progress:
+                    progress(imported, time.monotonic() - started)
+        if batch:
+            _upsert(batch)
+            imported += len(batch)
+    finally:
+        if imported:
+            # bulk writes skip post_save: let catalog copies and caches reload,
+            # also for the batches written before a failure
+            bulk_changed.send(sender=SkillReference)
+            stats.sync_references()
+    return imported, skipped, time.monotonic() - started
@@ -0,0 +1,43 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from skills import importer
+
+
+class Command(BaseCommand):
+    help = (
+        "Import skill references (name, id_icon, icon) from a CSV, JSON or NDJSON file. "
+        "Names are matched case-insensitively; existing skills get their icons updated."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import.")
+        parser.add_argument('--format', choices=importer.FORMATS, default=None,
+                            help="File format; guessed from the extension by default.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows upserted per query.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or importer.detect_format(path)
+        if fmt is None:
+            raise CommandError("Unknown file format; pass --format csv, json or ndjson.")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        def progress(imported, seconds):
+            self.stdout.write(f"{imported} rows ({imported / max(seconds, 1e-6):.0f} rows/s)")
+
+        try:
+            with open(path, newline='', encoding='utf-8') as fp:
+                imported, skipped, seconds = importer.import_rows(
+                    importer.READERS[fmt](fp), batch_size=options['batch_size'], progress=progress
+                )
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+        except (csv.Error, ValueError) as exc:
+            raise CommandError(f"Invalid {fmt} in {path}: {exc}")
+        rate = imported / max(seconds, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f"{imported} skills imported, {skipped} rows skipped in {seconds:.2f}s ({rate:.0f} rows/s)."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from skills import graph
+
+
+class Command(BaseCommand):
+    help = "Recompute the skills used together (co-occurrence graph) from every project and experience."
+
+    def handle(self, *args, **options):
+        count = graph.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Neighbours computed for {count} skills."))
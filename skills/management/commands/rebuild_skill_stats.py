@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from skills import stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the usage statistics of every skill."
+
+    def handle(self, *args, **options):
+        count = stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Usage statistics computed for {count} skills."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:19
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0006_skill_unique_reference_in_skill'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='skillreference',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='skillref_name_lower_idx'),
+        ),
+    ]
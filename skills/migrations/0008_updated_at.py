@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0007_skillreference_name_lower_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='skillreference',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0008_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillUsageStats',
+            fields=[
+                ('skill_reference', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='usage', serialize=False, to='skills.skillreference')),
+                ('name', models.CharField(max_length=100)),
+                ('icon', models.URLField(blank=True, null=True)),
+                ('project_count', models.PositiveIntegerField(default=0)),
+                ('experience_count', models.PositiveIntegerField(default=0)),
+                ('total_count', models.PositiveIntegerField(default=0)),
+                ('first_used', models.DateField(blank=True, null=True)),
+                ('last_used', models.DateField(blank=True, null=True)),
+                ('is_current', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Skill usage statistics',
+                'verbose_name_plural': 'Skill usage statistics',
+                'ordering': ['-total_count', 'name'],
+                'indexes': [models.Index(fields=['-total_count', 'name'], name='skillusage_total_idx'), models.Index(fields=['-last_used'], name='skillusage_last_used_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0009_skillusagestats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillNeighbour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField()),
+                ('score', models.FloatField()),
+                ('neighbour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='skills.skillreference')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='skills.skillreference')),
+            ],
+            options={
+                'ordering': ['rank'],
+                'constraints': [models.UniqueConstraint(fields=('skill', 'rank'), name='skillneighbour_skill_rank_uniq')],
+            },
+        ),
+    ]
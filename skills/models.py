@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 
 
 class SkillReference(models.Model):
@@ -11,11 +13,16 @@ class SkillReference(models.Model):
 	id_icon = models.CharField(max_length=100, blank=True, null=True)
 	# URL to the icon service (constructed from `id_icon` when available)
 	icon = models.URLField(blank=True, null=True)
+	updated_at = models.DateTimeField(auto_now=True)
 
 	class Meta:
 		ordering = ["name"]
 		verbose_name = "Skill Reference"
 		verbose_name_plural = "Skill References"
+		indexes = [
+			# case-insensitive lookups by name (skill filters, name resolution)
+			models.Index(Lower("name"), name="skillref_name_lower_idx"),
+		]
 
 	def __str__(self):
 		return self.name
@@ -23,6 +30,7 @@ class SkillReference(models.Model):
 
 class Skill(models.Model):
     reference = models.ForeignKey(SkillReference, on_delete=models.CASCADE, related_name="skills")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Skill"
@@ -33,3 +41,63 @@ class Skill(models.Model):
 
     def __str__(self):
         return f"{self.reference.name}"
+
+
+class SkillUsageStats(models.Model):
+    """How often a skill is used by projects and experiences (see skills.stats).
+
+    Maintained from the through tables' signals; name and icon are copied so the
+    stats endpoint reads this table alone.
+    """
+    skill_reference = models.OneToOneField(
+        SkillReference, on_delete=models.CASCADE, primary_key=True, related_name="usage"
+    )
+    name = models.CharField(max_length=100)
+    icon = models.URLField(blank=True, null=True)
+    project_count = models.PositiveIntegerField(default=0)
+    experience_count = models.PositiveIntegerField(default=0)
+    total_count = models.PositiveIntegerField(default=0)
+    # projects count from their creation date, experiences from start to end date
+    first_used = models.DateField(blank=True, null=True)
+    last_used = models.DateField(blank=True, null=True)
+    # used by an ongoing experience
+    is_current = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-total_count", "name"]
+        verbose_name = "Skill usage statistics"
+        verbose_name_plural = "Skill usage statistics"
+        indexes = [
+            models.Index(fields=["-total_count", "name"], name="skillusage_total_idx"),
+            models.Index(fields=["-last_used"], name="skillusage_last_used_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name}: {self.total_count}"
+
+    @property
+    def used_until(self):
+        """`last_used`, or today while an ongoing experience uses the skill."""
+        return timezone.localdate() if self.is_current else self.last_used
+
+
+class SkillNeighbour(models.Model):
+    """One of the top-k skills most often used together with `skill`, precomputed by skills.graph."""
+    skill = models.ForeignKey(SkillReference, on_delete=models.CASCADE, related_name="neighbours")
+    neighbour = models.ForeignKey(SkillReference, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    # projects and experiences using both skills
+    count = models.PositiveIntegerField()
+    # share of the uses of `skill` that also use `neighbour`
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ["rank"]
+        constraints = [
+            # also the index serving the graph endpoint
+            models.UniqueConstraint(fields=["skill", "rank"], name="skillneighbour_skill_rank_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.skill_id} -> {self.neighbour_id} ({self.count})"
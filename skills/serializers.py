@@ -1,6 +1,29 @@
 from rest_framework import serializers
 
-from .models import Skill, SkillReference
+from .catalog import get_catalog
+from .models import Skill, SkillReference, SkillUsageStats
+
+
+class SkillCatalogField(serializers.ReadOnlyField):
+    """A skill link's reference `name` or `icon`, read from the in-process catalog.
+
+    Links fetched with their reference (see catalog.link_prefetch) use it instead.
+    """
+
+    def __init__(self, attribute, **kwargs):
+        self.attribute = attribute
+        super().__init__(source="*", **kwargs)
+
+    def to_representation(self, link):
+        if type(link).skill_reference.is_cached(link):
+            return getattr(link.skill_reference, self.attribute)
+        # one version check per serialization, not per row
+        root = self.root
+        catalog = getattr(root, "_skill_catalog", None)
+        if catalog is None:
+            catalog = root._skill_catalog = get_catalog()
+        entry = catalog.entry(link.skill_reference_id)
+        return getattr(entry, self.attribute) if entry is not None else None
 
 
 class SkillReferenceSerializer(serializers.ModelSerializer):
@@ -33,3 +56,37 @@ class SkillSerializer(serializers.ModelSerializer):
             )
 
         return attrs
+
+
+class SkillUsageStatsSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="skill_reference_id", read_only=True)
+    last_used = serializers.DateField(source="used_until", read_only=True)
+
+    class Meta:
+        model = SkillUsageStats
+        fields = (
+            "id", "name", "icon", "project_count", "experience_count", "total_count",
+            "first_used", "last_used", "is_current",
+        )
+
+
+class SkillBulkSerializer(serializers.Serializer):
+    """A list of SkillReference ids for the bulk add/remove/replace actions.
+
+    Context flags: `allow_empty` (replace may clear everything) and `check_exists`
+    (ids to add must exist; ids to remove need not).
+    """
+    reference_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=True)
+
+    def validate_reference_ids(self, value):
+        if not value and not self.context.get("allow_empty", False):
+            raise serializers.ValidationError("Cette liste ne peut pas être vide.")
+        value = list(dict.fromkeys(value))
+        if not self.context.get("check_exists", True):
+            return value
+        missing = get_catalog().missing(value)
+        if missing:
+            raise serializers.ValidationError(
+                f"Ces références n'existent pas : {', '.join(map(str, missing))}."
+            )
+        return value
@@ -0,0 +1,141 @@
+"""Set-based helpers to attach SkillReference entries to projects and experiences and filter by them."""
+from core.signals import bulk_changed
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Lower
+
+from .catalog import get_catalog
+from .models import Skill, SkillReference
+
+
+def resolve_skill_references(skill_items):
+    """Return the SkillReference ids for validated skill items, in input order.
+
+    `skill_items` is the output of the serializers' skill validation: a list of
+    {'type': 'id' | 'name', 'value': ...}, whose ids are known to exist. Names are
+    matched case-insensitively against the in-process catalog, the matches confirmed
+    in one query, and missing ones are created in bulk with one insert and one re-read.
+    """
+    catalog = get_catalog()
+    names = {}
+    for item in skill_items:
+        if item['type'] == 'name':
+            names.setdefault(item['value'].lower(), item['value'])
+
+    by_name = {}
+    for lname in names:
+        pk = catalog.id_for_name(lname)
+        if pk is not None:
+            by_name[lname] = pk
+    if by_name:
+        # the copy may still list a reference another worker deleted: recreate it
+        gone = set(catalog.missing(by_name.values()))
+        by_name = {lname: pk for lname, pk in by_name.items() if pk not in gone}
+
+    missing = [lname for lname in names if lname not in by_name]
+    if missing:
+        SkillReference.objects.bulk_create(
+            [SkillReference(name=names[lname], icon='') for lname in missing],
+            ignore_conflicts=True,
+        )
+        bulk_changed.send(sender=SkillReference)
+        rows = SkillReference.objects.annotate(lname=Lower('name')).filter(
+            lname__in=missing
+        ).values_list('id', 'lname')
+        for pk, lname in rows:
+            by_name.setdefault(lname, pk)
+
+    resolved = []
+    for item in skill_items:
+        pk = item['value'] if item['type'] == 'id' else by_name[item['value'].lower()]
+        if pk not in resolved:
+            resolved.append(pk)
+    return resolved
+
+
+def set_skill_references(owner, through_model, owner_field, skill_ids, created=False):
+    """Make the owner's links to SkillReference exactly `skill_ids`.
+
+    Only the difference with the current links is applied: one filtered delete for
+    the removed skills and one bulk insert for the added ones. Pass created=True for
+    a freshly created owner to skip reading its (empty) current links.
+    Sends `bulk_changed` (with the added and removed `skill_ids`) when anything
+    changed, as bulk writes skip post_save.
+    """
+    links = through_model.objects.filter(**{owner_field: owner})
+    current = set() if created else set(links.values_list('skill_reference_id', flat=True))
+    removed = current.difference(skill_ids)
+    if removed:
+        links.filter(skill_reference_id__in=removed).delete()
+    added = [pk for pk in skill_ids if pk not in current]
+    if added:
+        through_model.objects.bulk_create(
+            [through_model(**{owner_field: owner, 'skill_reference_id': pk}) for pk in added]
+        )
+    if added or removed:
+        bulk_changed.send(sender=through_model, owner=owner, skill_ids=set(added) | removed)
+    return added, removed
+
+
+def attach_skills(owner, skill_items, through_model, owner_field, created=False):
+    """Resolve validated skill items and sync the owner's links to them."""
+    skill_ids = resolve_skill_references(skill_items)
+    return set_skill_references(owner, through_model, owner_field, skill_ids, created=created)
+
+
+def skill_ids_for_names(names):
+    """Map skill names (any case) to SkillReference ids.
+
+    Returns {lowercased name: id} for the names found in the catalog. Names the
+    in-process catalog does not know are looked up through the lower(name) index.
+    """
+    lnames = {name.strip().lower() for name in names if name and name.strip()}
+    if not lnames:
+        return {}
+    catalog = get_catalog()
+    found = {}
+    for lname in lnames:
+        pk = catalog.id_for_name(lname)
+        if pk is not None:
+            found[lname] = pk
+    unknown = lnames - found.keys()
+    if unknown:
+        found.update(
+            SkillReference.objects.annotate(lname=Lower('name')).filter(lname__in=unknown).values_list('lname', 'id')
+        )
+    return found
+
+
+def filter_by_skills(queryset, through_model, owner_field, skill_ids, match_all=False):
+    """Keep owners linked to any (or, with match_all, every) skill in `skill_ids`.
+
+    Each condition is an EXISTS subquery on the through table's
+    (owner, skill_reference) unique index instead of a join, so no row is
+    duplicated and no DISTINCT is needed.
+    """
+    skill_ids = list(dict.fromkeys(skill_ids))
+    if not skill_ids:
+        return queryset.none()
+    links = through_model.objects.filter(**{owner_field: OuterRef('pk')})
+    if not match_all:
+        return queryset.filter(Exists(links.filter(skill_reference_id__in=skill_ids)))
+    for skill_id in skill_ids:
+        queryset = queryset.filter(Exists(links.filter(skill_reference_id=skill_id)))
+    return queryset
+
+
+def change_portfolio_skills(add=(), remove=(), replace=False):
+    """Add and remove portfolio `Skill` entries by SkillReference id in bulk.
+
+    Adding relies on the unique_reference_in_skill constraint: one insert that
+    skips the references already present. Removing is one filtered delete; with
+    replace=True it removes every entry not in `add`. Sends `bulk_changed`, as
+    bulk inserts skip post_save.
+    """
+    add = list(dict.fromkeys(add))
+    if replace:
+        Skill.objects.exclude(reference_id__in=add).delete()
+    elif remove:
+        Skill.objects.filter(reference_id__in=set(remove)).delete()
+    if add:
+        Skill.objects.bulk_create([Skill(reference_id=pk) for pk in add], ignore_conflicts=True)
+        bulk_changed.send(sender=Skill)
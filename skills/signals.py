@@ -0,0 +1,77 @@
+from django.db.models.signals import post_save, post_delete
+
+from core.signals import bulk_changed
+from experiences.models import Experience, ExperienceSkillRef
+from projects.models import ProjectSkillRef
+from . import catalog, graph, stats
+from .models import SkillReference
+
+# through model -> owner field
+SKILL_LINKS = {ProjectSkillRef: 'project', ExperienceSkillRef: 'experience'}
+
+
+def refresh_link_stats(sender, instance, raw=False, **kwargs):
+    if not raw:
+        stats.schedule_refresh([instance.skill_reference_id])
+
+
+def refresh_bulk_stats(sender, owner=None, skill_ids=None, **kwargs):
+    if skill_ids is None and owner is not None:
+        # the sender did not say which skills changed: refresh every skill the owner still uses
+        skill_ids = sender.objects.filter(**{SKILL_LINKS[sender]: owner}).values_list('skill_reference_id', flat=True)
+    stats.schedule_refresh(skill_ids or [])
+
+
+def refresh_link_graph(sender, instance, raw=False, **kwargs):
+    if not raw:
+        graph.schedule_refresh(sender, getattr(instance, f'{SKILL_LINKS[sender]}_id'), [instance.skill_reference_id])
+
+
+def refresh_bulk_graph(sender, owner=None, skill_ids=None, **kwargs):
+    if owner is not None:
+        graph.schedule_refresh(sender, owner.pk, skill_ids or ())
+
+
+for _model in SKILL_LINKS:
+    post_save.connect(refresh_link_stats, sender=_model, dispatch_uid=f'skill_stats_save_{_model.__name__}')
+    post_delete.connect(refresh_link_stats, sender=_model, dispatch_uid=f'skill_stats_delete_{_model.__name__}')
+    bulk_changed.connect(refresh_bulk_stats, sender=_model, dispatch_uid=f'skill_stats_bulk_{_model.__name__}')
+    post_save.connect(refresh_link_graph, sender=_model, dispatch_uid=f'skill_graph_save_{_model.__name__}')
+    post_delete.connect(refresh_link_graph, sender=_model, dispatch_uid=f'skill_graph_delete_{_model.__name__}')
+    bulk_changed.connect(refresh_bulk_graph, sender=_model, dispatch_uid=f'skill_graph_bulk_{_model.__name__}')
+
+
+def refresh_experience_stats(sender, instance, created=False, raw=False, **kwargs):
+    # dates and is_current feed first/last use; a new experience has no skill links yet
+    if not created and not raw:
+        stats.schedule_refresh(
+            ExperienceSkillRef.objects.filter(experience=instance).values_list('skill_reference_id', flat=True)
+        )
+
+
+def refresh_reference_stats(sender, instance, created=False, raw=False, **kwargs):
+    # name and icon are copied into the stats row
+    if not created and not raw:
+        stats.schedule_refresh([instance.pk])
+
+
+post_save.connect(refresh_experience_stats, sender=Experience, dispatch_uid='skill_stats_experience')
+post_save.connect(refresh_reference_stats, sender=SkillReference, dispatch_uid='skill_stats_reference')
+
+
+def catalog_saved_reference(sender, instance, raw=False, **kwargs):
+    if not raw:
+        catalog.reference_saved(instance)
+
+
+def catalog_deleted_reference(sender, instance, **kwargs):
+    catalog.reference_deleted(instance.pk)
+
+
+def catalog_references_changed(sender, **kwargs):
+    catalog.references_changed()
+
+
+post_save.connect(catalog_saved_reference, sender=SkillReference, dispatch_uid='skill_catalog_save')
+post_delete.connect(catalog_deleted_reference, sender=SkillReference, dispatch_uid='skill_catalog_delete')
+bulk_changed.connect(catalog_references_changed, sender=SkillReference, dispatch_uid='skill_catalog_bulk')
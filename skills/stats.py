@@ -0,0 +1,129 @@
+"""Materialized skill usage statistics.
+
+`SkillUsageStats` holds, per skill, how many projects and experiences use it
+and when it was first and last used. Rows are recomputed only for the skills
+whose links changed, once per transaction (see skills.signals).
+`rebuild_skill_stats` recomputes the whole table.
+
+As in experiences.timeline, an open experience (`is_current` or no
+`end_date`) is used until today. The stored `last_used` of a current skill is
+the day of its last refresh: reads use `SkillUsageStats.used_until`, and the
+filters and ordering of skills.filters, instead.
+"""
+from django.db import transaction
+from django.db.models import Case, Count, DateField, IntegerField, Max, Min, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from core.batching import on_commit_batch
+from experiences.models import ExperienceSkillRef
+from projects.models import ProjectSkillRef
+
+from .models import SkillReference, SkillUsageStats
+
+STAT_FIELDS = [
+    'name', 'icon', 'project_count', 'experience_count', 'total_count',
+    'first_used', 'last_used', 'is_current', 'updated_at',
+]
+
+
+def _project_usage(skill_ids):
+    links = ProjectSkillRef.objects.all()
+    if skill_ids is not None:
+        links = links.filter(skill_reference_id__in=skill_ids)
+    return {
+        row['skill_reference_id']: row
+        for row in links.order_by().values('skill_reference_id').annotate(
+            count=Count('pk'),
+            first=Min(TruncDate('project__created_at')),
+            last=Max(TruncDate('project__created_at')),
+        )
+    }
+
+
+def _experience_usage(skill_ids, today):
+    links = ExperienceSkillRef.objects.all()
+    if skill_ids is not None:
+        links = links.filter(skill_reference_id__in=skill_ids)
+    ongoing = Q(experience__is_current=True) | Q(experience__end_date__isnull=True)
+    return {
+        row['skill_reference_id']: row
+        for row in links.order_by().values('skill_reference_id').annotate(
+            count=Count('pk'),
+            first=Min('experience__start_date'),
+            last=Max(Case(
+                When(experience__is_current=True, then=Value(today)),
+                default=Coalesce('experience__end_date', Value(today)),
+                output_field=DateField(),
+            )),
+            current=Max(Case(When(ongoing, then=Value(1)), default=Value(0), output_field=IntegerField())),
+        )
+    }
+
+
+def compute(skill_ids=None, today=None):
+    """Unsaved `SkillUsageStats` for the used skills among `skill_ids` (None: every skill)."""
+    today = today or timezone.localdate()
+    projects = _project_usage(skill_ids)
+    experiences = _experience_usage(skill_ids, today)
+    used = projects.keys() | experiences.keys()
+    references = SkillReference.objects.filter(pk__in=used).values_list('pk', 'name', 'icon')
+    rows = []
+    for pk, name, icon in references:
+        project = projects.get(pk, {})
+        experience = experiences.get(pk, {})
+        firsts = [d for d in (project.get('first'), experience.get('first')) if d]
+        lasts = [d for d in (project.get('last'), experience.get('last')) if d]
+        rows.append(SkillUsageStats(
+            skill_reference_id=pk, name=name, icon=icon,
+            project_count=project.get('count', 0),
+            experience_count=experience.get('count', 0),
+            total_count=project.get('count', 0) + experience.get('count', 0),
+            first_used=min(firsts, default=None),
+            last_used=max(lasts, default=None),
+            is_current=bool(experience.get('current')),
+        ))
+    return rows
+
+
+def _save(rows):
+    SkillUsageStats.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=['skill_reference'], update_fields=STAT_FIELDS,
+    )
+
+
+def refresh(skill_ids):
+    """Recompute the rows of `skill_ids`; skills no longer used lose theirs."""
+    skill_ids = set(skill_ids)
+    if not skill_ids:
+        return 0
+    rows = compute(skill_ids)
+    with transaction.atomic():
+        SkillUsageStats.objects.filter(
+            skill_reference_id__in=skill_ids - {row.skill_reference_id for row in rows}
+        ).delete()
+        _save(rows)
+    return len(rows)
+
+
+def rebuild():
+    """Recompute the whole table. Returns the number of skills in use."""
+    rows = compute()
+    with transaction.atomic():
+        SkillUsageStats.objects.exclude(skill_reference_id__in=[row.skill_reference_id for row in rows]).delete()
+        _save(rows)
+    return len(rows)
+
+
+def schedule_refresh(skill_ids):
+    """Refresh `skill_ids` after commit, once per transaction."""
+    on_commit_batch(refresh, [pk for pk in skill_ids if pk is not None])
+
+
+def sync_references():
+    """Copy names and icons again, after bulk writes to SkillReference."""
+    references = SkillReference.objects.filter(pk=OuterRef('skill_reference_id'))
+    SkillUsageStats.objects.update(
+        name=Subquery(references.values('name')[:1]), icon=Subquery(references.values('icon')[:1]),
+    )
+
@@ -1,3 +1,409 @@
+from datetime import date
+import json
+import os
+import tempfile
+from io import StringIO
+
+import numpy as np
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import transaction
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.signals import bulk_changed
+from experiences.models import Experience, ExperienceSkillRef
+from projects.models import Project, ProjectSkillRef
+from projects.serializers import ProjectSerializer
+from . import catalog, graph, importer
+from .filters import SkillReferenceMultipleField
+from .models import Skill, SkillReference, SkillUsageStats, SkillNeighbour
+from .services import attach_skills
+
+
+class AttachSkillsTests(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(title='Portfolio')
+        self.refs = SkillReference.objects.bulk_create(
+            [SkillReference(name=f'Skill {i}') for i in range(40)]
+        )
+
+    def linked_ids(self):
+        return set(ProjectSkillRef.objects.filter(project=self.project).values_list('skill_reference_id', flat=True))
+
+    def test_names_are_matched_case_insensitively_and_created_in_bulk(self):
+        items = [{'type': 'name', 'value': 'skill 1'}, {'type': 'name', 'value': 'Rust'}]
+        attach_skills(self.project, items, ProjectSkillRef, 'project', created=True)
+        rust = SkillReference.objects.get(name='Rust')
+        self.assertEqual(self.linked_ids(), {self.refs[1].id, rust.id})
+        self.assertEqual(SkillReference.objects.count(), 41)
+
+    def test_update_applies_only_the_diff(self):
+        attach_skills(self.project, [{'type': 'id', 'value': r.id} for r in self.refs[:30]],
+                      ProjectSkillRef, 'project', created=True)
+        kept = ProjectSkillRef.objects.get(project=self.project, skill_reference=self.refs[10])
+
+        wanted = [{'type': 'id', 'value': r.id} for r in self.refs[10:40]]
+        # current links + (select + delete) removed + bulk insert added + touch project;
+        # ids are resolved against the in-process catalog
+        with self.assertNumQueries(5):
+            added, removed = attach_skills(self.project, wanted, ProjectSkillRef, 'project')
+
+        self.assertEqual(len(added), 10)
+        self.assertEqual(len(removed), 10)
+        self.assertEqual(self.linked_ids(), {r.id for r in self.refs[10:40]})
+        self.assertTrue(ProjectSkillRef.objects.filter(pk=kept.pk).exists())
+
+
+class SkillUsageStatsTests(APITestCase):
+    def setUp(self):
+        self.python, self.react, self.go = SkillReference.objects.bulk_create(
+            [SkillReference(name='Python'), SkillReference(name='React'), SkillReference(name='Go')]
+        )
+        self.project = Project.objects.create(title='Portfolio')
+        self.experience = Experience.objects.create(title='Dev', start_date=date(2020, 5, 1), end_date=date(2022, 1, 1))
+
+    def link(self, owner, through_model, owner_field, refs):
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            attach_skills(owner, [{'type': 'id', 'value': r.id} for r in refs], through_model, owner_field)
+
+    def test_stats_follow_links(self):
+        self.link(self.project, ProjectSkillRef, 'project', [self.python, self.react])
+        self.link(self.experience, ExperienceSkillRef, 'experience', [self.python])
+        python = SkillUsageStats.objects.get(skill_reference=self.python)
+        self.assertEqual((python.project_count, python.experience_count, python.total_count), (1, 1, 2))
+        self.assertEqual(python.first_used, date(2020, 5, 1))
+        self.assertEqual(python.last_used, self.project.created_at.date())
+        self.assertFalse(python.is_current)
+        self.assertFalse(SkillUsageStats.objects.filter(skill_reference=self.go).exists())
+
+        self.link(self.project, ProjectSkillRef, 'project', [self.python])
+        self.assertFalse(SkillUsageStats.objects.filter(skill_reference=self.react).exists())
+
+    def test_experience_dates_and_deletes_refresh_stats(self):
+        self.link(self.experience, ExperienceSkillRef, 'experience', [self.go])
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            self.experience.is_current = True
+            self.experience.save()
+        go = SkillUsageStats.objects.get(skill_reference=self.go)
+        self.assertTrue(go.is_current)
+        self.assertEqual(go.last_used, timezone.localdate())
+
+        # read as used until today, whatever day the row was last refreshed
+        self.link(self.project, ProjectSkillRef, 'project', [self.python])
+        SkillUsageStats.objects.filter(skill_reference=self.go).update(last_used=date(2024, 1, 1))
+        url = reverse('skillusage-list')
+        response = self.client.get(url, {'ordering': '-last_used'})
+        self.assertEqual([row['name'] for row in response.data], ['Go', 'Python'])
+        self.assertEqual(response.data[0]['last_used'], timezone.localdate().isoformat())
+        response = self.client.get(url, {'used_since': timezone.localdate().isoformat()})
+        self.assertIn('Go', [row['name'] for row in response.data])
+
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            self.experience.delete()
+        self.assertFalse(SkillUsageStats.objects.filter(skill_reference=self.go).exists())
+
+    def test_rebuild_command_matches_incremental_stats(self):
+        self.link(self.project, ProjectSkillRef, 'project', [self.python, self.react])
+        self.link(self.experience, ExperienceSkillRef, 'experience', [self.python, self.go])
+        incremental = list(SkillUsageStats.objects.values_list('name', 'total_count', 'first_used', 'last_used'))
+        SkillUsageStats.objects.all().delete()
+        call_command('rebuild_skill_stats', stdout=StringIO())
+        rebuilt = list(SkillUsageStats.objects.values_list('name', 'total_count', 'first_used', 'last_used'))
+        self.assertEqual(rebuilt, incremental)
+
+    def test_stats_endpoint_sorted_and_filtered(self):
+        self.link(self.project, ProjectSkillRef, 'project', [self.python, self.react])
+        self.link(self.experience, ExperienceSkillRef, 'experience', [self.python, self.go])
+        url = reverse('skillusage-list')
+        # conditional GET validator + the rows
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual([row['name'] for row in response.data], ['Python', 'Go', 'React'])
+        self.assertEqual(response.data[0]['total_count'], 2)
+
+        response = self.client.get(url, {'used_in': 'projects', 'ordering': 'name'})
+        self.assertEqual([row['name'] for row in response.data], ['Python', 'React'])
+        response = self.client.get(url, {'min_count': 2})
+        self.assertEqual([row['name'] for row in response.data], ['Python'])
+
+
+class SkillAutocompleteTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        SkillReference.objects.bulk_create([
+            SkillReference(name=name) for name in
+            ('Python', 'PyTorch', 'Google Cloud', 'Cloudflare', 'React', 'React Native', 'Go')
+        ])
+        self.client.force_authenticate(user=get_user_model().objects.create_user(username='u', password='pw'))
+        self.url = reverse('skillreference-autocomplete')
+
+    def names(self, q, **params):
+        return [row['name'] for row in self.client.get(self.url, {'q': q, **params}).data]
+
+    def test_prefix_then_word_then_fuzzy_matches(self):
+        self.assertEqual(self.names('react'), ['React', 'React Native'])
+        self.assertEqual(self.names('py', limit=1), ['Python'])
+        self.assertEqual(self.names('clo')[:2], ['Cloudflare', 'Google Cloud'])
+        self.assertEqual(self.names('pythn')[0], 'Python')
+        self.assertEqual(self.names(''), [])
+
+    def test_loaded_once_per_worker(self):
+        self.names('py')
+        with self.assertNumQueries(0):
+            self.client.get(self.url, {'q': 'go'})
+
+    def test_index_follows_changes(self):
+        self.names('py')
+        with self.captureOnCommitCallbacks(execute=True):
+            SkillReference.objects.create(name='Pydantic')
+            SkillReference.objects.filter(name='PyTorch').delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names('py'), ['Python', 'Pydantic'])
+
+    def test_other_worker_change_triggers_reload(self):
+        self.names('py')
+        SkillReference.objects.create(name='Pyramid')
+        cache.set(catalog.VERSION_KEY, 'changed elsewhere', timeout=None)
+        self.assertIn('Pyramid', self.names('py'))
+
+
+class SkillCatalogTests(APITestCase):
+    def setUp(self):
+        self.python, self.react = SkillReference.objects.bulk_create(
+            [SkillReference(name='Python', icon='https://example.com/py.svg'), SkillReference(name='React')]
+        )
+        catalog.reload()
+
+    def test_lookups_run_no_query(self):
+        with self.assertNumQueries(0):
+            current = catalog.get_catalog()
+            self.assertEqual(current.id_for_name(' python '), self.python.id)
+            self.assertEqual(current.get(self.python.id).icon, 'https://example.com/py.svg')
+            # read filters validate ids against this copy
+            field = SkillReferenceMultipleField()
+            self.assertEqual(field.clean([str(self.python.id)]), [self.python.id])
+            with self.assertRaises(ValidationError):
+                field.clean(['999999'])
+
+    def test_missing_ids_are_read_from_the_database(self):
+        # written behind the signals' back: this copy is behind
+        go = SkillReference.objects.bulk_create([SkillReference(name='Go')])[0]
+        self.assertEqual(catalog.get_catalog().missing([go.id, 999999]), [999999])
+        self.assertEqual(catalog.get_catalog().id_for_name('go'), go.id)
+
+        # deleted by another worker, whose token has not arrived yet
+        react_id = self.react.id
+        self.react.delete()
+        self.assertIsNotNone(catalog.get_catalog().get(react_id))
+        serializer = ProjectSerializer(data={'title': 'Portfolio', 'skills': [react_id]})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('skills', serializer.errors)
+        self.assertIsNone(catalog.get_catalog().get(react_id))
+
+    def test_changes_reach_the_catalog(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.react.name = 'React.js'
+            self.react.save()
+        self.assertEqual(catalog.get_catalog().id_for_name('react.js'), self.react.id)
+        self.assertIsNone(catalog.get_catalog().id_for_name('react'))
+
+        SkillReference.objects.create(name='Rust')
+        cache.set(catalog.VERSION_KEY, 'changed elsewhere', timeout=None)
+        self.assertIsNotNone(catalog.get_catalog().id_for_name('rust'))
+
+        # renamed behind the signals' back: seen once the token expires
+        SkillReference.objects.filter(pk=self.python.pk).update(name='Python 3')
+        cache.delete(catalog.VERSION_KEY)
+        self.assertEqual(catalog.get_catalog().get(self.python.id).name, 'Python 3')
+
+    def test_project_skills_filter_reads_the_catalog(self):
+        project = Project.objects.create(title='Portfolio')
+        ProjectSkillRef.objects.create(project=project, skill_reference=self.python)
+        url = reverse('project-list')
+        response = self.client.get(url, {'skills': [self.python.id], 'fields': 'id,title'})
+        self.assertEqual([row['title'] for row in response.data], ['Portfolio'])
+        self.assertEqual(self.client.get(url, {'skills': [999999]}).status_code, 400)
+
+
+class ImportSkillCatalogTests(TestCase):
+    def setUp(self):
+        SkillReference.objects.create(name='React', icon='https://example.com/react.svg')
+
+    def write(self, suffix, content):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+            fp.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_json_array_is_streamed_in_chunks(self):
+        items = [{'name': f'Skill {i}', 'id_icon': f's{i}'} for i in range(50)] + [12345, 'x']
+        rows = list(importer.read_json(StringIO(json.dumps(items, indent=1)), chunk_size=7))
+        self.assertEqual(rows, items)
+        with self.assertRaises(ValueError):
+            list(importer.read_json(StringIO('[{"name": "Go"}'), chunk_size=4))
+
+    def test_csv_import_upserts_case_insensitively(self):
+        path = self.write('.csv', 'name,id_icon,icon\npython,py,\nPython,python,\nreact,,\nrust,rust,https://cdn/rust.svg\n,,\n')
+        out = StringIO()
+        call_command('import_skill_catalog', path, '--batch-size', '2', stdout=out)
+        self.assertIn('3 skills imported, 1 rows skipped', out.getvalue())
+        self.assertEqual(
+            sorted(SkillReference.objects.values_list('name', 'id_icon', 'icon')),
+            [
+                ('Python', 'python', 'https://skillicons.dev/icons?i=python'),
+                ('React', None, 'https://example.com/react.svg'),
+                ('rust', 'rust', 'https://cdn/rust.svg'),
+            ],
+        )
+
+    def test_ndjson_import_updates_existing_icons(self):
+        path = self.write('.ndjson', '{"name": "REACT", "id_icon": "react"}\n\n{"name": "Go", "id_icon": "go"}\n')
+        call_command('import_skill_catalog', path, stdout=StringIO())
+        react = SkillReference.objects.get(name='React')
+        self.assertEqual(react.icon, 'https://skillicons.dev/icons?i=react')
+        self.assertEqual(SkillReference.objects.count(), 2)
+
+    def test_malformed_csv_fails_cleanly_after_publishing_written_batches(self):
+        # a field over csv.field_size_limit() raises csv.Error on the third row
+        path = self.write('.csv', 'name\nGo\nRust\n' + 'x' * 200000 + '\n')
+        changed = []
+        bulk_changed.connect(lambda sender, **kwargs: changed.append(sender), sender=SkillReference, weak=False,
+                             dispatch_uid='test_import_changed')
+        self.addCleanup(bulk_changed.disconnect, sender=SkillReference, dispatch_uid='test_import_changed')
+        with self.assertRaises(CommandError):
+            call_command('import_skill_catalog', path, '--batch-size', '1', stdout=StringIO())
+        self.assertTrue(SkillReference.objects.filter(name='Rust').exists())
+        self.assertEqual(changed, [SkillReference])
+
+
+class SkillGraphTests(APITestCase):
+    def setUp(self):
+        self.refs = SkillReference.objects.bulk_create([SkillReference(name=f'Skill {i}') for i in range(6)])
+        catalog.reload()
+        self.projects = [Project.objects.create(title=f'Project {i}') for i in range(3)]
+        self.experience = Experience.objects.create(title='Dev', start_date=date(2020, 1, 1))
+
+    def link(self, owner, through_model, owner_field, indexes):
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            attach_skills(owner, [{'type': 'id', 'value': self.refs[i].id} for i in indexes],
+                          through_model, owner_field)
+
+    def stored(self):
+        return {
+            (skill, neighbour): (rank, count, round(score, 6))
+            for skill, neighbour, rank, count, score in
+            SkillNeighbour.objects.values_list('skill_id', 'neighbour_id', 'rank', 'count', 'score')
+        }
+
+    def test_incremental_refresh_matches_rebuild(self):
+        self.link(self.projects[0], ProjectSkillRef, 'project', [0, 1, 2])
+        self.link(self.projects[1], ProjectSkillRef, 'project', [0, 1])
+        self.link(self.projects[2], ProjectSkillRef, 'project', [3, 4])
+        self.link(self.experience, ExperienceSkillRef, 'experience', [0, 2, 5])
+        self.link(self.projects[1], ProjectSkillRef, 'project', [0, 5])
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            self.projects[2].delete()
+        incremental = self.stored()
+        call_command('rebuild_skill_graph', stdout=StringIO())
+        self.assertEqual(self.stored(), incremental)
+
+        s0, s1, s2, s5 = (self.refs[i].id for i in (0, 1, 2, 5))
+        # skill 0: with 2 (project 0, experience), 5 (project 1, experience), 1 (project 0); 3 uses
+        self.assertEqual(incremental[(s0, s2)], (0, 2, round(2 / 3, 6)))
+        self.assertEqual(incremental[(s0, s5)], (1, 2, round(2 / 3, 6)))
+        self.assertEqual(incremental[(s0, s1)][:2], (2, 1))
+        self.assertFalse(any(self.refs[3].id in pair for pair in incremental))
+
+    def test_graph_endpoint(self):
+        self.link(self.projects[0], ProjectSkillRef, 'project', [0, 1, 2])
+        self.link(self.experience, ExperienceSkillRef, 'experience', [0, 1])
+        url = reverse('skillgraph-list')
+        response = self.client.get(url, {'skill': self.refs[0].id, 'limit': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [{
+            'id': self.refs[0].id, 'name': 'Skill 0', 'icon': None,
+            'neighbours': [{'id': self.refs[1].id, 'name': 'Skill 1', 'count': 2, 'score': 1.0}],
+        }])
+        self.assertEqual(len(self.client.get(url).data), 3)
+
+    def test_cooccurrence_is_the_off_diagonal_of_ata(self):
+        owners = np.array([0, 0, 0, 1, 1, 2], dtype=np.int64)
+        skills = np.array([1, 2, 3, 1, 2, 3], dtype=np.int64)
+        left, right, counts, uses = graph.cooccurrence(owners, skills)
+        incidence = np.zeros((3, 4), dtype=np.int64)
+        incidence[owners, skills] = 1
+        expected = incidence.T @ incidence
+        self.assertEqual(uses, {1: 2, 2: 2, 3: 2})
+        for l, r, c in zip(left, right, counts):
+            self.assertEqual(c, expected[l, r])
+        self.assertEqual(int(counts.sum()), int(expected.sum() - np.trace(expected)))
+
+
+
+class PortfolioSkillBulkTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='admin', password='pass')
+        self.client.force_authenticate(self.user)
+        self.refs = SkillReference.objects.bulk_create([SkillReference(name=f'Skill {i}') for i in range(5)])
+        catalog.reload()
+        Skill.objects.create(reference=self.refs[0])
+
+    def ids(self, *indexes):
+        return [self.refs[i].id for i in indexes]
+
+    def portfolio(self):
+        return set(Skill.objects.values_list('reference_id', flat=True))
+
+    def test_bulk_add_skips_duplicates_and_existing(self):
+        # existence check, savepoint, one insert, release, the list
+        with self.assertNumQueries(5):
+            response = self.client.post(
+                reverse('skill-bulk-add'), {'reference_ids': self.ids(0, 1, 2, 1)}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(self.portfolio(), set(self.ids(0, 1, 2)))
+
+    def test_bulk_add_unknown_reference(self):
+        response = self.client.post(reverse('skill-bulk-add'), {'reference_ids': [999999]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reference_ids', response.data)
+        self.assertEqual(self.portfolio(), set(self.ids(0)))
+
+    def test_bulk_add_reference_deleted_by_another_worker(self):
+        # this worker's catalog copy still lists the reference
+        gone = self.refs[4].id
+        self.refs[4].delete()
+        self.assertIsNotNone(catalog.get_catalog().get(gone))
+        response = self.client.post(reverse('skill-bulk-add'), {'reference_ids': [gone]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.portfolio(), set(self.ids(0)))
+
+    def test_bulk_remove_and_replace(self):
+        self.client.post(reverse('skill-bulk-add'), {'reference_ids': self.ids(1, 2, 3)}, format='json')
+        response = self.client.post(
+            reverse('skill-bulk-remove'), {'reference_ids': self.ids(1, 3) + [999999]}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.portfolio(), set(self.ids(0, 2)))
+
+        response = self.client.put(reverse('skill-bulk-replace'), {'reference_ids': self.ids(2, 4)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.portfolio(), set(self.ids(2, 4)))
+
+        self.assertEqual(self.client.post(reverse('skill-bulk-remove'), {'reference_ids': []}, format='json').status_code, 400)
+        response = self.client.put(reverse('skill-bulk-replace'), {'reference_ids': []}, format='json')
+        self.assertEqual(response.data, [])
+        self.assertEqual(self.portfolio(), set())
 
-# Create your tests here.
+    def test_bulk_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.post(reverse('skill-bulk-add'), {'reference_ids': self.ids(1)}, format='json')
+        self.assertIn(response.status_code, (401, 403))
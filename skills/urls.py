@@ -1,9 +1,12 @@
 from rest_framework.routers import DefaultRouter
 
-from .views import SkillReferenceViewSet, SkillViewSet
+from .views import SkillReferenceViewSet, SkillViewSet, SkillUsageStatsViewSet, SkillGraphViewSet
 
 router = DefaultRouter()
 router.register(r"references", SkillReferenceViewSet, basename="skillreference")
+# before the root SkillViewSet, whose detail route would otherwise match "stats/" and "graph/"
+router.register(r"stats", SkillUsageStatsViewSet, basename="skillusage")
+router.register(r"graph", SkillGraphViewSet, basename="skillgraph")
 # Mount SkillViewSet at the router root so when included at 'api/skills/' it becomes '/api/skills/'
 router.register(r"", SkillViewSet, basename="skill")
 
@@ -1,11 +1,22 @@
+from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from rest_framework import viewsets, filters
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
-from .models import Skill, SkillReference
-from .serializers import SkillSerializer, SkillReferenceSerializer
+from core.conditional import ConditionalGetMixin
+from . import autocomplete
+from .filters import SkillUsageOrderingFilter, SkillUsageStatsFilter
+from .catalog import get_catalog
+from .models import Skill, SkillReference, SkillUsageStats, SkillNeighbour
+from .serializers import SkillSerializer, SkillReferenceSerializer, SkillUsageStatsSerializer, SkillBulkSerializer
+from .services import change_portfolio_skills
 
 
-class SkillReferenceViewSet(viewsets.ReadOnlyModelViewSet):
+class SkillReferenceViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
 	"""Read-only endpoint for the canonical skill catalog.
 
 	Supports searching by name via DRF SearchFilter: ?search=python
@@ -15,13 +26,107 @@ class SkillReferenceViewSet(viewsets.ReadOnlyModelViewSet):
 	filter_backends = [filters.SearchFilter]
 	search_fields = ["name"]
 
+	@action(detail=False, methods=["get"])
+	def autocomplete(self, request):
+		"""Best matches for ?q= from the in-process index: ?q=pyt&limit=5"""
+		try:
+			limit = int(request.query_params.get("limit", settings.SKILL_AUTOCOMPLETE_LIMIT))
+		except ValueError:
+			limit = settings.SKILL_AUTOCOMPLETE_LIMIT
+		limit = max(1, min(limit, settings.SKILL_AUTOCOMPLETE_MAX_LIMIT))
+		return Response(autocomplete.search(request.query_params.get("q", ""), limit))
 
-class SkillViewSet(viewsets.ModelViewSet):
+
+class SkillViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
 	"""Full CRUD for Skill entries attached to the portfolio."""
 	queryset = Skill.objects.select_related("reference").all()
 	serializer_class = SkillSerializer
+	conditional_dependencies = ("skills.SkillReference",)
 
 	def get_permissions(self):
 		if self.action in ["list", "retrieve"]:
 			return [AllowAny()]
 		return [IsAuthenticated()]
+
+	def _reference_ids(self, request, **context):
+		serializer = SkillBulkSerializer(data=request.data, context=context)
+		serializer.is_valid(raise_exception=True)
+		return serializer.validated_data["reference_ids"]
+
+	def _change(self, **change):
+		"""Apply `change_portfolio_skills(**change)` in one transaction and return every skill."""
+		try:
+			with transaction.atomic():
+				change_portfolio_skills(**change)
+		except IntegrityError:
+			# a reference deleted after validation: ON CONFLICT does not cover foreign keys
+			raise ValidationError({"reference_ids": "Certaines références n'existent plus."})
+		return Response(SkillSerializer(self.get_queryset(), many=True).data)
+
+	@action(detail=False, methods=["post"], url_path="bulk/add")
+	def bulk_add(self, request):
+		"""Add every reference of {"reference_ids": [...]}; those already present are kept."""
+		ids = self._reference_ids(request)
+		return self._change(add=ids)
+
+	@action(detail=False, methods=["post"], url_path="bulk/remove")
+	def bulk_remove(self, request):
+		"""Remove the entries of {"reference_ids": [...]}."""
+		ids = self._reference_ids(request, check_exists=False)
+		return self._change(remove=ids)
+
+	@action(detail=False, methods=["put"], url_path="bulk/replace")
+	def bulk_replace(self, request):
+		"""Make the portfolio skills exactly {"reference_ids": [...]}; an empty list clears them."""
+		ids = self._reference_ids(request, allow_empty=True)
+		return self._change(add=ids, replace=True)
+
+
+class SkillUsageStatsViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+	"""How often each skill is used, read from the materialized stats table.
+
+	?ordering=-last_used, ?search=py, ?min_count=2, ?used_in=projects, ?is_current=true
+	"""
+	queryset = SkillUsageStats.objects.all()
+	serializer_class = SkillUsageStatsSerializer
+	permission_classes = [AllowAny]
+	filter_backends = [filters.SearchFilter, SkillUsageOrderingFilter, DjangoFilterBackend]
+	filterset_class = SkillUsageStatsFilter
+	search_fields = ["name"]
+	ordering_fields = ["total_count", "project_count", "experience_count", "first_used", "last_used", "name"]
+	ordering = ["-total_count", "name"]
+
+
+class SkillGraphViewSet(viewsets.GenericViewSet):
+	"""Skills most often used together, precomputed by skills.graph.
+
+	?skill=<id> limits the graph to one skill, ?limit=<k> the neighbours per skill.
+	"""
+	queryset = SkillNeighbour.objects.all()
+	permission_classes = [AllowAny]
+
+	def list(self, request):
+		rows = self.get_queryset().order_by("skill_id", "rank")
+		skill = request.query_params.get("skill")
+		if skill:
+			if not skill.isdigit():
+				raise ValidationError({"skill": "Identifiant de skill invalide."})
+			rows = rows.filter(skill_id=int(skill))
+		try:
+			limit = int(request.query_params.get("limit", settings.SKILL_GRAPH_NEIGHBOURS))
+		except ValueError:
+			limit = settings.SKILL_GRAPH_NEIGHBOURS
+		rows = rows.filter(rank__lt=max(1, limit))
+
+		catalog = get_catalog()
+		graph = []
+		for skill_id, neighbour_id, count, score in rows.values_list("skill_id", "neighbour_id", "count", "score"):
+			if not graph or graph[-1]["id"] != skill_id:
+				entry = catalog.entry(skill_id)
+				graph.append({"id": skill_id, "name": entry and entry.name, "icon": entry and entry.icon, "neighbours": []})
+			entry = catalog.entry(neighbour_id)
+			graph[-1]["neighbours"].append(
+				{"id": neighbour_id, "name": entry and entry.name, "count": count, "score": round(score, 4)}
+			)
+		return Response(graph)
+